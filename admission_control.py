@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Admission Control - Démarrage des étapes selon les ressources disponibles
+Estime l'empreinte mémoire (pic RSS) et CPU de chaque étape à partir des
+exécutions précédentes (data/.stage_footprints.json) et ne démarre une étape
+que si la mémoire disponible et les cœurs libres le permettent; les autres
+attendent la fin d'une étape en cours.
+
+Mesures: psutil s'il est installé, /proc sinon (Linux). Sur une plateforme
+sans l'un ni l'autre, seul le budget statique du pipeline s'applique.
+
+Usage:
+    python admission_control.py        # Empreintes connues et marge actuelle
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from pathlib import Path
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+FOOTPRINT_FILE = Path("data/.stage_footprints.json")
+
+# Nombre de mesures conservées par étape
+HISTORY_RUNS = 5
+# Empreinte supposée sans historique, par type de ressource de l'étape
+# (un scraper attend surtout le réseau: un demi-cœur)
+DEFAULT_FOOTPRINTS = {
+    'browser': {'rss_mb': 700.0, 'cpu': 0.5},
+    'cpu': {'rss_mb': 250.0, 'cpu': 1.0}
+}
+# Mémoire laissée libre pour le système
+MEMORY_MARGIN_MB = 512
+# Période d'échantillonnage des processus suivis
+SAMPLE_INTERVAL = 1.0
+
+
+def available_memory_mb():
+    """Mémoire disponible (Mo), None si inconnue."""
+    if psutil:
+        return psutil.virtual_memory().available / 1024 ** 2
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def system_load():
+    """Cœurs occupés (charge moyenne sur 1 minute), None si inconnue."""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+def _children_map():
+    """{ppid: [pid, ...]} de tous les processus (/proc)."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Le nom du processus (entre parenthèses) peut contenir des espaces
+        ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree(pid):
+    """pid et tous ses descendants (navigateur et driver compris)."""
+    if psutil:
+        try:
+            parent = psutil.Process(pid)
+            return [pid] + [child.pid for child in parent.children(recursive=True)]
+        except psutil.Error:
+            return []
+    children = _children_map()
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+
+def _process_usage(pid):
+    """(RSS en Mo, temps CPU en secondes) d'un processus, None s'il a disparu."""
+    if psutil:
+        try:
+            process = psutil.Process(pid)
+            cpu = process.cpu_times()
+            return process.memory_info().rss / 1024 ** 2, cpu.user + cpu.system
+        except psutil.Error:
+            return None
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            rss_pages = int(f.read().split()[1])
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except (OSError, IndexError, ValueError):
+        return None
+    ticks = os.sysconf('SC_CLK_TCK')
+    return rss_pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2, (int(fields[11]) + int(fields[12])) / ticks
+
+
+def tree_usage(pid):
+    """(RSS total en Mo, temps CPU total en secondes) d'un arbre de processus."""
+    rss, cpu = 0.0, 0.0
+    for member in process_tree(pid):
+        usage = _process_usage(member)
+        if usage:
+            rss += usage[0]
+            cpu += usage[1]
+    return rss, cpu
+
+
+def measurable():
+    """Indique si les mesures mémoire sont disponibles sur cette plateforme."""
+    return available_memory_mb() is not None
+
+
+class AdmissionController:
+    """Admet les étapes selon leur empreinte estimée et la marge mesurée, et mesure leur pic RSS."""
+
+    def __init__(self, footprint_file=FOOTPRINT_FILE, margin_mb=MEMORY_MARGIN_MB, cpu_count=None):
+        self.footprint_file = Path(footprint_file)
+        self.margin_mb = margin_mb
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.history = self._load()
+        self.resources = {}
+        self.current = {}
+        self.peaks = {}
+        self.cpu_time = {}
+        self.started = {}
+        self.watched = {}
+        self.deferred = set()
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop = None
+
+    def _load(self):
+        """Charge l'historique des empreintes (vide s'il est absent ou illisible)."""
+        try:
+            with open(self.footprint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Écrit l'historique de manière atomique."""
+        self.footprint_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.footprint_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.history, f, indent=2, ensure_ascii=False)
+        tmp_file.replace(self.footprint_file)
+
+    def footprint(self, name, resources=None):
+        """Empreinte estimée d'une étape: médiane des dernières mesures, défaut par type sinon."""
+        runs = self.history.get(name, [])
+        if runs:
+            return {
+                'rss_mb': statistics.median(run['rss_mb'] for run in runs),
+                'cpu': statistics.median(run['cpu'] for run in runs)
+            }
+        resources = resources if resources is not None else self.resources.get(name, {})
+        kind = 'browser' if 'browser' in resources else 'cpu'
+        return dict(DEFAULT_FOOTPRINTS[kind])
+
+    def admit(self, stage, running):
+        """Indique si l'étape peut démarrer à côté des étapes en cours (noms).
+
+        Une étape est toujours admise si rien ne tourne, pour que le pipeline avance.
+        """
+        self.resources[stage.name] = stage.resources
+        if not running:
+            return self._admitted(stage)
+
+        needed = self.footprint(stage.name, stage.resources)
+        available = available_memory_mb()
+        if available is not None:
+            with self._lock:
+                # Mémoire que les étapes en cours n'ont pas encore atteinte
+                reserved = sum(max(0.0, self.footprint(name)['rss_mb'] - self.current.get(name, 0.0))
+                               for name in running)
+            if needed['rss_mb'] + reserved + self.margin_mb > available:
+                return self._defer(stage, f"~{needed['rss_mb']:.0f} MB needed, "
+                                          f"{max(0.0, available - reserved):.0f} MB available")
+
+        committed = sum(self.footprint(name)['cpu'] for name in running)
+        load = system_load()
+        busy = max(committed, load) if load is not None else committed
+        if needed['cpu'] > self.cpu_count - busy:
+            return self._defer(stage, f"~{needed['cpu']:.1f} cores needed, "
+                                      f"{max(0.0, self.cpu_count - busy):.1f} free")
+        return self._admitted(stage)
+
+    def _defer(self, stage, reason):
+        if stage.name not in self.deferred:
+            self.deferred.add(stage.name)
+            print(f"⏸️ {stage.description} queued ({reason})")
+        return False
+
+    def _admitted(self, stage):
+        if stage.name in self.deferred:
+            self.deferred.discard(stage.name)
+            print(f"▶️ {stage.description} admitted")
+        return True
+
+    def watch(self, name, pid):
+        """Suit la mémoire et le CPU d'un processus (et de ses descendants) lancé par une étape."""
+        with self._lock:
+            self.watched.setdefault(name, []).append(pid)
+            if self._sampler is None:
+                self._stop = threading.Event()
+                self._sampler = threading.Thread(target=self._sample_loop, args=(self._stop,),
+                                                 name="admission-sampler", daemon=True)
+                self._sampler.start()
+
+    def _sample_loop(self, stop):
+        while not stop.wait(SAMPLE_INTERVAL):
+            with self._lock:
+                watched = {name: list(pids) for name, pids in self.watched.items()}
+            for name, pids in watched.items():
+                rss, cpu = 0.0, 0.0
+                for pid in pids:
+                    usage = tree_usage(pid)
+                    rss += usage[0]
+                    cpu += usage[1]
+                with self._lock:
+                    self.current[name] = rss
+                    self.peaks[name] = max(self.peaks.get(name, 0.0), rss)
+                    self.cpu_time[name] = max(self.cpu_time.get(name, 0.0), cpu)
+
+    def track(self, run_stage):
+        """Enveloppe un exécuteur d'étape: mesure et enregistre le pic RSS et la charge CPU."""
+        def tracked_run_stage(spec):
+            name = spec['name']
+            self.resources[name] = spec.get('resources', {})
+            with self._lock:
+                self.started[name] = time.time()
+                self.peaks.pop(name, None)
+                self.cpu_time.pop(name, None)
+            result = run_stage(spec)
+            self._finish(name, result)
+            return result
+        return tracked_run_stage
+
+    def _finish(self, name, result):
+        """Arrête le suivi d'une étape et enregistre son empreinte si elle a été mesurée."""
+        with self._lock:
+            elapsed = time.time() - self.started.pop(name, time.time())
+            self.watched.pop(name, None)
+            self.current.pop(name, None)
+            peak = self.peaks.get(name)
+            cpu_time = self.cpu_time.get(name)
+        if result is None:
+            return
+
+        # Mesure rapportée par l'étape elle-même (exécution in-process)
+        peak = result.get('peak_rss_mb', peak)
+        if peak is None or result.get('cached') or not result.get('success'):
+            return
+        result['peak_rss_mb'] = peak
+        cpu = cpu_time / elapsed if cpu_time and elapsed > 0 else self.footprint(name)['cpu']
+        with self._lock:
+            runs = self.history.setdefault(name, [])
+            runs.append({'rss_mb': round(peak, 1), 'cpu': round(cpu, 2)})
+            del runs[:-HISTORY_RUNS]
+            self._save()
+
+    def close(self):
+        """Arrête l'échantillonnage (un watch() ultérieur le relance: le contrôleur reste utilisable)."""
+        with self._lock:
+            sampler, stop = self._sampler, self._stop
+            self._sampler = self._stop = None
+        if sampler:
+            stop.set()
+            sampler.join(timeout=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    from pipeline_dag import PIPELINE_STAGES, SCRAPER_STAGES
+
+    parser = argparse.ArgumentParser(description="Empreintes des étapes et marge disponible")
+    parser.parse_args()
+
+    controller = AdmissionController()
+    available = available_memory_mb()
+    load = system_load()
+    print(f"🖥️ {controller.cpu_count} cœurs (charge {load if load is not None else '?'}), "
+          f"{f'{available:.0f} MB' if available is not None else '?'} disponibles "
+          f"(mesures: {'psutil' if psutil else '/proc' if measurable() else 'indisponibles'})")
+
+    for spec in PIPELINE_STAGES:
+        footprint = controller.footprint(spec['name'], spec['resources'])
+        origin = f"{len(controller.history[spec['name']])} mesures" if spec['name'] in controller.history else "défaut"
+        print(f"{spec['emoji']} {spec['name']:<15} {footprint['rss_mb']:>7.0f} MB  {footprint['cpu']:>4.1f} cœurs  ({origin})")
+
+    if available is not None:
+        largest = max(controller.footprint(name, {'browser': 1})['rss_mb'] for name in SCRAPER_STAGES)
+        fit = int(max(0, available - MEMORY_MARGIN_MB) // largest)
+        print(f"🚦 Scrapers simultanés possibles maintenant: ~{max(1, fit)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,13 @@ Utilitaire d'analyse des données techniques Auto-Data
 Analyse et structure les spécifications pour intégration site web
 """
 
-import json
 import csv
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import argparse
+from data_storage import load_json, save_json
+from snapshot_manifest import latest_path
 
 class TechnicalDataAnalyzer:
     """Analyseur pour données techniques Auto-Data."""
@@ -23,8 +24,7 @@ class TechnicalDataAnalyzer:
     def load_technical_data(self):
         """Charge les données techniques depuis le fichier JSON."""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(self.data_file)
             print(f"✅ Données chargées: {len(data.get('brands_technical_data', {}))} marques")
             return data
         except Exception as e:
@@ -209,9 +209,9 @@ class TechnicalDataAnalyzer:
         print(f"✅ {total_models} modèles avec spécifications")
         
         # Sauvegarder
+        # Fichier publié: JSON compact, jamais compressé
         output_file = Path("data/autodata_web_ready.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(web_data, f, indent=2, ensure_ascii=False)
+        save_json(output_file, web_data, compression='none')
         
         print(f"💾 Fichier web-ready sauvegardé: {output_file}")
         
@@ -460,13 +460,11 @@ def main():
     
     args = parser.parse_args()
     
-    # Chercher le fichier le plus récent si non spécifié
+    # Chercher le fichier le plus récent si non spécifié (sortie de l'étape "technical" du pipeline)
     if not args.data_file:
-        data_dir = Path("data")
-        tech_files = list(data_dir.glob("autodata_technical_specs_*.json"))
+        latest_file = latest_path("autonomous", "technical_specs") or latest_path("autodata", "technical_specs")
         
-        if tech_files:
-            latest_file = max(tech_files, key=lambda x: x.stat().st_mtime)
+        if latest_file:
             args.data_file = str(latest_file)
             print(f"📁 Fichier détecté: {latest_file}")
         else:
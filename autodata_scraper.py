@@ -14,6 +14,7 @@ Usage:
 
 import argparse
 import json
+import threading
 import time
 import random
 import logging
@@ -27,6 +28,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from tracing import traced, span
+from result_writer import ScrapeResult, brand_statistics
+from brand_timings import BrandTimer
+from brand_scheduler import scheduler_for_source
+from progress_channel import ProgressEmitter
 
 # Configuration logging avec emojis
 logging.basicConfig(
@@ -42,15 +48,28 @@ logger = logging.getLogger(__name__)
 class AutoDataScraper:
     """Scraper Auto-Data.net intégré au système de consolidation."""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, brand_mapping=None):
         self.base_url = "https://www.auto-data.net"
         self.language = "/bg"  # Bulgarian version (plus complète)
         self.full_base_url = f"{self.base_url}{self.language}"
+        self.headless = headless
         self.brand_models_data = {}
-        self.setup_driver(headless)
-        self.brand_mapping = self.get_brand_mapping()
-        self.load_brands_from_json()
+        self.brand_timer = BrandTimer()
+        self.progress = ProgressEmitter("autodata")
+        self._driver = None
+        if brand_mapping is None:
+            self.brand_mapping = self.get_brand_mapping()
+            self.load_brands_from_json()
+        else:
+            self.brand_mapping = brand_mapping
         
+    @property
+    def driver(self):
+        """Driver Selenium démarré au premier usage (le parent en mode --workers n'en ouvre aucun)."""
+        if self._driver is None:
+            self.setup_driver(self.headless)
+        return self._driver
+    
     def setup_driver(self, headless=True):
         """Configure le driver Selenium avec des options optimisées."""
         try:
@@ -66,9 +85,9 @@ class AutoDataScraper:
             chrome_options.add_experimental_option('useAutomationExtension', False)
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
             
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.implicitly_wait(10)
+            self._driver = webdriver.Chrome(options=chrome_options)
+            self._driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self._driver.implicitly_wait(10)
             logger.info("✅ Auto-Data driver configuré")
             
         except Exception as e:
@@ -233,6 +252,7 @@ class AutoDataScraper:
             "mitsubishi": {"name": "Mitsubishi", "id": "267"}
         }
     
+    @traced("autodata.extract_model_links_from_brand_page")
     def extract_model_links_from_brand_page(self, brand_slug, brand_name):
         """Extrait les liens vers les modèles d'une page de marque."""
         try:
@@ -258,11 +278,12 @@ class AutoDataScraper:
             self.driver.get(brand_url)
             
             # Attendre que la page se charge
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            time.sleep(3)
+            with self.brand_timer.waiting():
+                WebDriverWait(self.driver, 20).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+                
+                time.sleep(3)
             
             models = []
             
@@ -305,6 +326,7 @@ class AutoDataScraper:
                                 continue
                         
                         if models:  # Si on a trouvé des modèles, on s'arrête
+                            self.brand_timer.set_selector(selector)
                             break
                             
                 except Exception as e:
@@ -353,44 +375,47 @@ class AutoDataScraper:
             logger.error(f"❌ Erreur scraping {brand_name}: {e}")
             return []
     
+    def build_result_data(self):
+        """Construit les données du snapshot (métadonnées, modèles par marque, timings)."""
+        return {
+            "metadata": {
+                "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "scraper_version": "autodata_scraper_v1.1",
+                "source": "Auto-Data.net",
+                "method": "link_extraction_from_brand_pages",
+                "url_pattern": "/bg/{brand-name}-brand-{brand-id}",
+                **brand_statistics(self.brand_models_data),
+                "file_prefix": "autodata_",
+                "integration_ready": True
+            },
+            "brands_models": self.brand_models_data,
+            "brand_timings": self.brand_timer.to_side_table()
+        }
+    
     def save_results(self, output_file=None):
         """Sauvegarde les résultats avec le préfixe as24_."""
+        return self.write_results(self.build_result_data(), output_file)
+    
+    @traced("autodata.save_results")
+    def write_results(self, result_data, output_file=None):
+        """Écrit un snapshot Auto-Data."""
         try:
+            result = ScrapeResult("autodata", result_data)
             if not output_file:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = f"data/autodata_scraped_models_{timestamp}.json"
+                existing = result.unchanged()
+                if existing:
+                    logger.info(f"♻️ Aucun changement depuis {existing}: snapshot Auto-Data non réécrit")
+                    return existing
             
-            result_data = {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "scraper_version": "autodata_scraper_v1.1",
-                    "source": "Auto-Data.net",
-                    "method": "link_extraction_from_brand_pages",
-                    "url_pattern": "/bg/{brand-name}-brand-{brand-id}",
-                    "total_brands": len(self.brand_models_data),
-                    "total_models": sum(len(models) for models in self.brand_models_data.values()),
-                    "brands_with_models": len([b for b, models in self.brand_models_data.items() if models]),
-                    "brands_without_models": len([b for b, models in self.brand_models_data.items() if not models]),
-                    "file_prefix": "autodata_",
-                    "integration_ready": True
-                },
-                "brands_models": self.brand_models_data
-            }
-            
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result_data, f, indent=2, ensure_ascii=False)
+            output_file = result.write(output_file)
             
             logger.info(f"💾 Résultats Auto-Data sauvegardés: {output_file}")
             
             # Résumé
-            total_models = result_data["metadata"]["total_models"]
-            brands_with_models = result_data["metadata"]["brands_with_models"]
-            
             logger.info("📊 RÉSUMÉ AUTO-DATA:")
-            logger.info(f"   • Marques traitées: {len(self.brand_models_data)}")
-            logger.info(f"   • Marques avec modèles: {brands_with_models}")
-            logger.info(f"   • Total modèles: {total_models}")
+            logger.info(f"   • Marques traitées: {result.metadata['total_brands']}")
+            logger.info(f"   • Marques avec modèles: {result.metadata['brands_with_models']}")
+            logger.info(f"   • Total modèles: {result.metadata['total_models']}")
             logger.info(f"   • Fichier autodata_: {Path(output_file).name}")
             
             return output_file
@@ -399,7 +424,80 @@ class AutoDataScraper:
             logger.error(f"❌ Erreur sauvegarde Auto-Data: {e}")
             return None
     
-    def scrape_all_brands(self, max_brands=None):
+    def scrape_single_brand(self, brand_slug, brand_info, index, total, worker=None):
+        """Scrape une marque (timing, progression) suivie de la pause."""
+        brand_name = brand_info["name"]
+        models = []
+        
+        logger.info(f"🏷️ [{index}/{total}]{f' (W{worker})' if worker else ''} {brand_name}")
+        self.progress.emit("brand_started", brand=brand_name, index=index, total=total)
+        self.brand_timer.start(brand_name)
+        
+        try:
+            with span("autodata.scrape_brand", brand=brand_name):
+                models = self.scrape_brand_models(brand_slug, brand_name)
+            self.brand_models_data[brand_name] = models
+            
+            if models:
+                logger.info(f"   ✅ {len(models)} modèles")
+            else:
+                logger.warning(f"   ⚠️ Aucun modèle")
+            
+        except Exception as e:
+            logger.error(f"   ❌ Erreur: {e}")
+            self.brand_models_data[brand_name] = []
+        
+        duration, _, wait, _ = self.brand_timer.finish()
+        self.progress.emit("brand_done", brand=brand_name, models=len(models),
+                           duration_s=duration, wait_s=wait)
+        
+        # Pause entre les marques
+        with span("autodata.politeness_sleep"):
+            time.sleep(random.uniform(2, 4))
+    
+    def scrape_brands_parallel(self, brands_items, workers):
+        """Scrape les marques avec plusieurs navigateurs (ordonnancement LPT + vol de travail)."""
+        scheduler = scheduler_for_source("autodata", brands_items, workers, key=lambda item: item[1]["name"])
+        logger.info(f"🗂️ {scheduler.plan_summary()}")
+        
+        lock = threading.Lock()
+        processed = [0]
+        
+        def worker_loop(worker_id):
+            worker = None
+            try:
+                worker = AutoDataScraper(headless=self.headless, brand_mapping=self.brand_mapping)
+                while True:
+                    item = scheduler.next(worker_id)
+                    if item is None:
+                        break
+                    with lock:
+                        processed[0] += 1
+                        index = processed[0]
+                    worker.scrape_single_brand(item[0], item[1], index, len(brands_items), worker_id + 1)
+            except Exception as e:
+                logger.error(f"❌ Worker {worker_id + 1}: {e}")
+            finally:
+                if worker:
+                    with lock:
+                        self.brand_models_data.update(worker.brand_models_data)
+                        self.brand_timer.rows.update(worker.brand_timer.rows)
+                    worker.close()
+        
+        threads = [threading.Thread(target=worker_loop, args=(w,), name=f"autodata-worker-{w + 1}")
+                   for w in range(scheduler.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # Restaurer l'ordre du mapping (un worker défaillant laisse ses marques vides)
+        self.brand_models_data = {
+            info["name"]: self.brand_models_data.get(info["name"], []) for _, info in brands_items
+        }
+        logger.info(f"🔀 Vols de travail entre workers: {scheduler.steals}")
+    
+    def scrape_all_brands(self, max_brands=None, workers=1):
         """Scrape toutes les marques."""
         try:
             # Gérer les différents formats possibles du brand_mapping
@@ -411,27 +509,17 @@ class AutoDataScraper:
                 brands_items = [(b["slug"], b) for b in (self.brand_mapping[:max_brands] if max_brands else self.brand_mapping)]
             
             logger.info(f"🚀 Début du scraping Auto-Data pour {len(brands_items)} marques")
+            self.progress.emit("plan", brands=[info["name"] for _, info in brands_items], workers=workers)
+            
+            if workers > 1:
+                self.scrape_brands_parallel(brands_items, workers)
+                logger.info(f"🎉 Scraping Auto-Data terminé! {len(self.brand_models_data)} marques traitées")
+                self.progress.emit("finished", brands=len(self.brand_models_data),
+                                   models=sum(len(models) for models in self.brand_models_data.values()))
+                return True
             
             for i, (brand_slug, brand_info) in enumerate(brands_items, 1):
-                brand_name = brand_info["name"]
-                
-                logger.info(f"🏷️ [{i}/{len(brands_items)}] {brand_name}")
-                
-                try:
-                    models = self.scrape_brand_models(brand_slug, brand_name)
-                    self.brand_models_data[brand_name] = models
-                    
-                    if models:
-                        logger.info(f"   ✅ {len(models)} modèles")
-                    else:
-                        logger.warning(f"   ⚠️ Aucun modèle")
-                    
-                except Exception as e:
-                    logger.error(f"   ❌ Erreur: {e}")
-                    self.brand_models_data[brand_name] = []
-                
-                # Pause entre les marques
-                time.sleep(random.uniform(2, 4))
+                self.scrape_single_brand(brand_slug, brand_info, i, len(brands_items))
                 
                 # Afficher le progrès
                 if i % 5 == 0:
@@ -439,17 +527,28 @@ class AutoDataScraper:
                     logger.info(f"📊 Progrès: {i}/{len(brands_items)} marques, {brands_with_models} avec modèles")
             
             logger.info(f"🎉 Scraping Auto-Data terminé! {len(self.brand_models_data)} marques traitées")
+            self.progress.emit("finished", brands=len(self.brand_models_data),
+                               models=sum(len(models) for models in self.brand_models_data.values()))
             return True
             
         except Exception as e:
             logger.error(f"❌ Erreur lors du scraping: {e}")
             return False
     
+    def scrape_queue_item(self, item):
+        """Scrape une marque reçue de la file de travail (work_queue.py); retourne (modèles, timing)."""
+        brand_name = item["brand_info"]["name"]
+        self.scrape_single_brand(item["slug"], item["brand_info"], item["index"], item["total"])
+        return self.brand_models_data.get(brand_name, []), self.brand_timer.rows.get(brand_name)
+    
     def close(self):
         """Ferme le driver proprement."""
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        if getattr(self, '_driver', None) is not None:
+            self._driver.quit()
+            self._driver = None
             logger.info("🔒 Auto-Data driver fermé")
+        if hasattr(self, 'progress'):
+            self.progress.close()
 
 def main():
     """Fonction principale avec gestion d'arguments."""
@@ -461,6 +560,7 @@ Exemples d'utilisation:
   python autodata_scraper.py                 # Toutes les marques
   python autodata_scraper.py --test          # Test rapide (5 marques)
   python autodata_scraper.py --max-brands 10 # 10 marques maximum
+  python autodata_scraper.py --workers 4     # 4 navigateurs en parallèle
   python autodata_scraper.py --headless=False # Voir le navigateur
 
 Ce scraper génère des fichiers avec préfixe as24_ pour identification dans le système.
@@ -471,6 +571,8 @@ Ce scraper génère des fichiers avec préfixe as24_ pour identification dans le
                        help='Mode test (5 marques seulement)')
     parser.add_argument('--max-brands', type=int, metavar='N',
                        help='Limiter le nombre de marques à scraper')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                       help='Nombre de navigateurs en parallèle (défaut: 1)')
     parser.add_argument('--headless', action='store_true', default=True,
                        help='Mode headless (défaut: True)')
     parser.add_argument('--no-headless', dest='headless', action='store_false',
@@ -485,6 +587,7 @@ Ce scraper génère des fichiers avec préfixe as24_ pour identification dans le
     logger.info(f"   • Mode: {'Test' if args.test else 'Complet'}")
     logger.info(f"   • Headless: {args.headless}")
     logger.info(f"   • Marques max: {max_brands or 'Toutes'}")
+    logger.info(f"   • Workers: {args.workers}")
     logger.info(f"   • Source: Auto-Data.net (intégrée)")
     logger.info(f"   • Pattern: /bg/{{brand-name}}-brand-{{brand-id}}")
     logger.info(f"   • Préfixe fichiers: autodata_")
@@ -493,7 +596,7 @@ Ce scraper génère des fichiers avec préfixe as24_ pour identification dans le
         scraper = AutoDataScraper(headless=args.headless)
         
         # Lancer le scraping
-        success = scraper.scrape_all_brands(max_brands=max_brands)
+        success = scraper.scrape_all_brands(max_brands=max_brands, workers=args.workers)
         
         if success:
             output_file = scraper.save_results()
@@ -514,5 +617,44 @@ Ce scraper génère des fichiers avec préfixe as24_ pour identification dans le
         if 'scraper' in locals():
             scraper.close()
 
+def run(max_brands=None, headless=True, workers=1):
+    """Point d'entrée in-process: scrape et retourne les données du snapshot sans les écrire."""
+    scraper = AutoDataScraper(headless=headless)
+    try:
+        if not scraper.scrape_all_brands(max_brands=max_brands, workers=workers):
+            return None
+        return scraper.build_result_data()
+    finally:
+        scraper.close()
+
+def save(result_data, output_file=None):
+    """Écrit un snapshot retourné par run() (sans navigateur: l'écriture n'utilise pas le driver)."""
+    writer = AutoDataScraper.__new__(AutoDataScraper)
+    return writer.write_results(result_data, output_file)
+
+def queue_items(max_brands=None):
+    """Tâches de la file de travail (work_queue.py): une par marque (liste JSON, mapping intégré sinon)."""
+    brands_file = Path("data/autodata_brands_for_scraping.json")
+    if brands_file.exists():
+        with open(brands_file, 'r', encoding='utf-8') as f:
+            items = [(b["slug"], b) for b in json.load(f)["brands"]]
+    else:
+        items = list(AutoDataScraper.__new__(AutoDataScraper).get_brand_mapping().items())
+    items = items[:max_brands] if max_brands else items
+    return [(info["name"], {"slug": slug, "brand_info": info, "index": i, "total": len(items)})
+            for i, (slug, info) in enumerate(items, 1)]
+
+def queue_worker(headless=True):
+    """Scraper d'un worker de la file de travail (un navigateur)."""
+    return AutoDataScraper(headless=headless, brand_mapping={})
+
+def assemble(brands_models, timing_rows):
+    """Données du snapshot à partir des résultats de la file de travail."""
+    builder = AutoDataScraper.__new__(AutoDataScraper)
+    builder.brand_models_data = brands_models
+    builder.brand_timer = BrandTimer()
+    builder.brand_timer.rows = timing_rows
+    return builder.build_result_data()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -13,11 +13,11 @@ Usage:
 
 import argparse
 import json
+import threading
 import time
 import random
 import logging
 import sys
-import re
 from datetime import datetime, timezone
 from pathlib import Path
 from selenium import webdriver
@@ -26,6 +26,13 @@ from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from tracing import traced, span
+from result_writer import ScrapeResult, brand_statistics
+from snapshot_db import SnapshotStore, previous_snapshot
+from snapshot_diff import latest_changes
+from brand_timings import BrandTimer
+from brand_scheduler import scheduler_for_source
+from progress_channel import ProgressEmitter
 
 # Configuration logging avec emojis
 logging.basicConfig(
@@ -41,12 +48,26 @@ logger = logging.getLogger(__name__)
 class AutoScout24Scraper:
     """Scraper AutoScout24 autonome et robuste."""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, brands_list=None):
         self.base_url = "https://www.autoscout24.fr"
+        self.headless = headless
         self.brand_models_data = {}
-        self.setup_driver(headless)
-        self.load_brands_from_json()
+        self.brand_timer = BrandTimer()
+        self.progress = ProgressEmitter("as24")
+        self._driver = None
+        self._snapshot_store = None
+        if brands_list is None:
+            self.load_brands_from_json()
+        else:
+            self.brands_list = brands_list
         
+    @property
+    def driver(self):
+        """Driver Selenium démarré au premier usage (le parent en mode --workers n'en ouvre aucun)."""
+        if self._driver is None:
+            self.setup_driver(self.headless)
+        return self._driver
+    
     def setup_driver(self, headless=True):
         """Configure le driver Selenium avec des options optimisées."""
         try:
@@ -62,9 +83,9 @@ class AutoScout24Scraper:
             chrome_options.add_experimental_option('useAutomationExtension', False)
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36")
             
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.implicitly_wait(10)
+            self._driver = webdriver.Chrome(options=chrome_options)
+            self._driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self._driver.implicitly_wait(10)
             logger.info("✅ Driver Selenium configuré")
             
         except Exception as e:
@@ -101,7 +122,9 @@ class AutoScout24Scraper:
             return False
     
     def write_progress(self, message):
-        """Write progress message to progress file (no encoding issues)."""
+        """Send progress message to the orchestrator, or to the progress file when run standalone."""
+        if self.progress.emit("message", text=message):
+            return
         try:
             progress_file = "progress_autoscout24_eu_market.txt"
             with open(progress_file, 'a', encoding='utf-8', errors='ignore') as f:
@@ -205,30 +228,14 @@ class AutoScout24Scraper:
     def compare_with_previous_version(self):
         """Compare avec la version précédente et affiche les changements."""
         try:
-            # Chercher le fichier de données le plus récent
-            data_dir = Path("data")
-            version_pattern = r"as24_scraped_models_(\d{8}_\d{6})\.json"
-            
-            versions = []
-            for file in data_dir.glob("as24_scraped_models_*.json"):
-                match = re.search(version_pattern, file.name)
-                if match:
-                    timestamp = match.group(1)
-                    versions.append((timestamp, file))
-            
-            if not versions:
+            # Dernier snapshot indexé (data/snapshots.db)
+            previous_file, previous_brands_models = previous_snapshot("as24")
+            if previous_file is None:
                 logger.info("ℹ️ Aucune version précédente trouvée")
                 return
             
-            # Trouver la version la plus récente
-            versions.sort(key=lambda x: x[0])
-            previous_file = versions[-1][1]
-            
-            logger.info(f"🔄 Comparaison avec la version précédente: {previous_file.name}")
-            
-            # Charger la version précédente
-            with open(previous_file, 'r', encoding='utf-8') as f:
-                previous_data = json.load(f)
+            logger.info(f"🔄 Comparaison avec la version précédente: {Path(previous_file).name}")
+            previous_data = {"brands_models": previous_brands_models}
             
             # Comparer les marques
             previous_brands = set(previous_data["brands_models"].keys())
@@ -259,6 +266,7 @@ class AutoScout24Scraper:
         except Exception as e:
             logger.debug(f"Erreur lors de la comparaison: {e}")
     
+    @traced("as24.navigate_to_homepage")
     def navigate_to_homepage(self):
         """Navigue vers la page d'accueil et attend le chargement complet."""
         try:
@@ -283,6 +291,7 @@ class AutoScout24Scraper:
             logger.error(f"❌ Erreur navigation homepage: {e}")
             return False
     
+    @traced("as24.select_brand_in_menu")
     def select_brand_in_menu(self, brand_name, brand_id):
         """Sélectionne une marque dans le menu déroulant."""
         try:
@@ -309,7 +318,8 @@ class AutoScout24Scraper:
             select.select_by_value(brand_id)
             
             # Attendre que la page se mette à jour
-            time.sleep(2)
+            with self.brand_timer.waiting():
+                time.sleep(2)
             logger.debug(f"✅ Marque '{brand_name}' sélectionnée (ID: {brand_id})")
             return True
             
@@ -317,6 +327,7 @@ class AutoScout24Scraper:
             logger.error(f"❌ Erreur sélection marque {brand_name}: {e}")
             return False
     
+    @traced("as24.get_model_menu_options")
     def get_model_menu_options(self):
         """Récupère les options du menu déroulant des modèles."""
         try:
@@ -333,9 +344,10 @@ class AutoScout24Scraper:
                 try:
                     model_select = self.driver.find_element(By.CSS_SELECTOR, selector)
                     
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, f"{selector} option"))
-                    )
+                    with self.brand_timer.waiting():
+                        WebDriverWait(self.driver, 10).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, f"{selector} option"))
+                        )
                     
                     options = model_select.find_elements(By.TAG_NAME, "option")
                     models = []
@@ -349,6 +361,7 @@ class AutoScout24Scraper:
                     
                     if models:
                         logger.debug(f"✅ {len(models)} modèles trouvés")
+                        self.brand_timer.set_selector(selector)
                         return models
                     
                 except (NoSuchElementException, TimeoutException):
@@ -380,30 +393,23 @@ class AutoScout24Scraper:
             logger.error(f"❌ Erreur scraping {brand_name}: {e}")
             return []
     
+    def previous_models_store(self):
+        """(base des snapshots, dernier snapshot indexé): ouverte et synchronisée une fois par exécution."""
+        if self._snapshot_store is None:
+            self._snapshot_store = SnapshotStore()
+            self._snapshot_store.sync("as24")
+            self._previous_snapshot = self._snapshot_store.latest("as24")
+        return self._snapshot_store, self._previous_snapshot
+    
+    @traced("as24.compare_model_changes_with_previous")
     def compare_model_changes_with_previous(self, brand_name, new_models):
         """Compare les modèles d'une marque avec la version précédente."""
         try:
-            # Chercher le fichier de données le plus récent
-            data_dir = Path("data")
-            version_pattern = r"as24_scraped_models_(\d{8}_\d{6})\.json"
-            
-            versions = []
-            for file in data_dir.glob("as24_scraped_models_*.json"):
-                match = re.search(version_pattern, file.name)
-                if match:
-                    timestamp = match.group(1)
-                    versions.append((timestamp, file))
-            
-            if not versions:
+            # Modèles de la marque dans le dernier snapshot indexé (requête sur une seule marque)
+            store, previous = self.previous_models_store()
+            if previous is None:
                 return None
-            
-            # Trouver la version la plus récente
-            versions.sort(key=lambda x: x[0])
-            previous_file = versions[-1][1]
-            
-            # Charger la version précédente
-            with open(previous_file, 'r', encoding='utf-8') as f:
-                previous_data = json.load(f)
+            previous_data = {"brands_models": store.brands_models(previous['id'], [brand_name])}
             
             # Comparer les modèles de cette marque
             previous_models = set(previous_data["brands_models"].get(brand_name, []))
@@ -429,14 +435,15 @@ class AutoScout24Scraper:
             logger.debug(f"Erreur lors de la comparaison des modèles pour {brand_name}: {e}")
             return None
     
-    def update_execution_history(self, output_file, versioning_data=None):
+    @traced("as24.update_execution_history")
+    def update_execution_history(self, result, versioning_data=None):
         """Met à jour l'historique des exécutions en format Markdown."""
         try:
             history_file = Path("docs/execution_history.md")
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
             # Générer les données de versioning pour l'historique
-            execution_data = self.generate_execution_data(output_file, versioning_data)
+            execution_data = self.generate_execution_data(result, versioning_data)
             
             # Lire l'historique existant ou créer un nouveau
             if history_file.exists():
@@ -493,18 +500,14 @@ Ce fichier contient l'historique complet des exécutions du scraper avec les inf
 
 """
     
-    def generate_execution_data(self, output_file, versioning_data):
-        """Génère les données de l'exécution pour l'historique."""
-        # Charger le fichier de données pour récupérer les métadonnées
-        with open(output_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        metadata = data["metadata"]
+    def generate_execution_data(self, result, versioning_data):
+        """Génère les données de l'exécution pour l'historique (document en mémoire, sans relire le fichier)."""
+        metadata = result.metadata
         
         execution_data = {
             "timestamp": metadata["scraped_at"],
-            "file": output_file,
-            "file_name": Path(output_file).name,
+            "file": result.output_file,
+            "file_name": Path(result.output_file).name,
             "total_brands": metadata["total_brands"],
             "total_models": metadata["total_models"],
             "brands_with_models": metadata["brands_with_models"],
@@ -512,7 +515,7 @@ Ce fichier contient l'historique complet des exécutions du scraper avec les inf
             "scraper_version": metadata["scraper_version"],
             "method": metadata["method"],
             "versioning": versioning_data or {},
-            "brands_data": data["brands_models"]
+            "brands_data": result.brands_models
         }
         
         return execution_data
@@ -603,54 +606,47 @@ Ce fichier contient l'historique complet des exécutions du scraper avec les inf
         
         return entry
     
+    def build_result_data(self):
+        """Construit les données du snapshot (métadonnées, modèles par marque, timings)."""
+        return {
+            "metadata": {
+                "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "scraper_version": "v3.3_autonomous_with_history_and_markdown",
+                "source": "AutoScout24.fr Auto Scraping",
+                "method": "selenium_dynamic_dropdown_interaction",
+                **brand_statistics(self.brand_models_data)
+            },
+            "brands_models": self.brand_models_data,
+            "brand_timings": self.brand_timer.to_side_table()
+        }
+    
     def save_results(self, output_file=None):
         """Sauvegarde les résultats avec versioning automatique et version Markdown."""
+        return self.write_results(self.build_result_data(), output_file)
+    
+    @traced("as24.save_results")
+    def write_results(self, result_data, output_file=None):
+        """Écrit un snapshot (JSON, Markdown, rapport de versioning, historique)."""
         try:
+            result = ScrapeResult("as24", result_data)
             if not output_file:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = f"data/as24_scraped_models_{timestamp}.json"
-            
-            # Préparer les données
-            result_data = {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "scraper_version": "v3.3_autonomous_with_history_and_markdown",
-                    "source": "AutoScout24.fr Auto Scraping",
-                    "method": "selenium_dynamic_dropdown_interaction",
-                    "total_brands": len(self.brand_models_data),
-                    "total_models": sum(len(models) for models in self.brand_models_data.values()),
-                    "brands_with_models": len([b for b, models in self.brand_models_data.items() if models]),
-                    "brands_without_models": len([b for b, models in self.brand_models_data.items() if not models])
-                },
-                "brands_models": self.brand_models_data
-            }
+                existing = result.unchanged()
+                if existing:
+                    logger.info(f"♻️ Aucun changement depuis {existing}: snapshot non réécrit")
+                    return existing
             
-            # Sauvegarder le fichier JSON
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result_data, f, indent=2, ensure_ascii=False)
-            
-            # Générer la version Markdown
-            md_file = self.generate_markdown_version(result_data, output_file)
+            # JSON, Markdown, index et historique écrits en parallèle depuis le même document
+            output_file = result.write(output_file, markdown=self.generate_markdown_version,
+                                       report=self.record_execution)
             
             logger.info(f"💾 Résultats sauvegardés:")
             logger.info(f"   📄 JSON: {output_file}")
-            logger.info(f"   📝 MD: {md_file}")
-            
-            # Résumé final avec versioning
-            total_models = result_data["metadata"]["total_models"]
-            brands_with_models = result_data["metadata"]["brands_with_models"]
-            
-            # Rapport de versioning final
-            versioning_data = self.generate_versioning_report(result_data)
-            
-            # Mettre à jour l'historique Markdown
-            self.update_execution_history(output_file, versioning_data)
+            logger.info(f"   📝 MD: {result.md_file}")
             
             logger.info("📊 RÉSUMÉ FINAL:")
-            logger.info(f"   • Marques traitées: {len(self.brand_models_data)}")
-            logger.info(f"   • Marques avec modèles: {brands_with_models}")
-            logger.info(f"   • Total modèles: {total_models}")
+            logger.info(f"   • Marques traitées: {result.metadata['total_brands']}")
+            logger.info(f"   • Marques avec modèles: {result.metadata['brands_with_models']}")
+            logger.info(f"   • Total modèles: {result.metadata['total_models']}")
             
             return output_file
             
@@ -658,6 +654,12 @@ Ce fichier contient l'historique complet des exécutions du scraper avec les inf
             logger.error(f"❌ Erreur sauvegarde: {e}")
             return None
     
+    def record_execution(self, result):
+        """Rapport de versioning puis entrée de l'historique des exécutions (snapshot indexé)."""
+        versioning_data = self.generate_versioning_report(result.document)
+        self.update_execution_history(result, versioning_data)
+        return versioning_data
+    
     def generate_markdown_version(self, result_data, json_file_path):
         """Génère une version Markdown lisible des données."""
         try:
@@ -866,80 +868,37 @@ Ce fichier contient l'historique complet des exécutions du scraper avec les inf
             logger.error(f"❌ Erreur lors du formatage Markdown des marques: {e}")
             return f"# 🚗 AutoScout24 - Liste des Marques\n\n**Erreur lors du formatage :** {e}\n"
     
+    @traced("as24.generate_versioning_report")
     def generate_versioning_report(self, current_data):
         """Génère un rapport détaillé de versioning et retourne les données pour l'historique."""
         try:
-            # Chercher le fichier de données le plus récent (sauf le fichier actuel)
-            data_dir = Path("data")
-            version_pattern = r"as24_scraped_models_(\d{8}_\d{6})\.json"
-            
-            versions = []
-            for file in data_dir.glob("as24_scraped_models_*.json"):
-                match = re.search(version_pattern, file.name)
-                if match:
-                    timestamp = match.group(1)
-                    versions.append((timestamp, file))
-            
-            if len(versions) < 2:
+            # Différence entre l'avant-dernier snapshot indexé et celui qui vient d'être écrit
+            previous, changes, totals = latest_changes("as24")
+            if previous is None:
                 logger.info("ℹ️ Première exécution - aucun rapport de versioning")
                 return {}
             
-            # Trouver la version précédente (pas la plus récente, mais l'avant-dernière)
-            versions.sort(key=lambda x: x[0])
-            previous_file = versions[-2][1]  # L'avant-dernière version
-            
-            logger.info(f"🔄 Rapport de versioning vs {previous_file.name}")
-            
-            # Charger la version précédente
-            with open(previous_file, 'r', encoding='utf-8') as f:
-                previous_data = json.load(f)
-            
-            # Comparaisons globales
-            previous_brands_count = len(previous_data["brands_models"])
-            current_brands_count = len(current_data["brands_models"])
-            brand_change = current_brands_count - previous_brands_count
-            
-            previous_models_count = sum(len(models) for models in previous_data["brands_models"].values())
-            current_models_count = sum(len(models) for models in current_data["brands_models"].values())
-            models_change = current_models_count - previous_models_count
+            logger.info(f"🔄 Rapport de versioning vs {Path(previous['file'] or previous['version']).name}")
             
             logger.info("📊 COMPARAISON GLOBALE:")
-            logger.info(f"   • Marques: {previous_brands_count} → {current_brands_count} ({brand_change:+d})")
-            logger.info(f"   • Modèles: {previous_models_count} → {current_models_count} ({models_change:+d})")
-            
-            # Détail des marques
-            previous_brands = set(previous_data["brands_models"].keys())
-            current_brands = set(current_data["brands_models"].keys())
+            logger.info(f"   • Marques: {totals['previous_brands']} → {totals['current_brands']} ({totals['brand_changes']:+d})")
+            logger.info(f"   • Modèles: {totals['previous_models']} → {totals['current_models']} ({totals['model_changes']:+d})")
             
-            new_brands = current_brands - previous_brands
-            removed_brands = previous_brands - current_brands
+            new_brands = totals["new_brands"]
+            removed_brands = totals["removed_brands"]
             
             if new_brands:
                 logger.info(f"   • NOUVELLES MARQUES ({len(new_brands)}):")
-                for brand in sorted(new_brands):
-                    model_count = len(current_data["brands_models"][brand])
-                    logger.info(f"     + {brand} ({model_count} modèles)")
+                for brand in new_brands:
+                    logger.info(f"     + {brand} ({changes[brand]['new_count']} modèles)")
             
             if removed_brands:
                 logger.info(f"   • MARQUES SUPPRIMÉES ({len(removed_brands)}):")
-                for brand in sorted(removed_brands):
+                for brand in removed_brands:
                     logger.info(f"     - {brand}")
             
-            # Marques avec changements de modèles significatifs
-            significant_changes = []
-            for brand in previous_brands & current_brands:
-                previous_models = set(previous_data["brands_models"][brand])
-                current_models = set(current_data["brands_models"][brand])
-                
-                if len(previous_models ^ current_models) >= 3:  # Au moins 3 changements
-                    previous_count = len(previous_models)
-                    current_count = len(current_models)
-                    significant_changes.append({
-                        "brand": brand,
-                        "previous_count": previous_count,
-                        "current_count": current_count,
-                        "change": current_count - previous_count
-                    })
+            # Marques avec changements de modèles significatifs (au moins 3 modèles ajoutés ou supprimés)
+            significant_changes = totals["significant_changes"]
             
             if significant_changes:
                 logger.info(f"   • MARQUES AVEC CHANGEMENTS SIGNIFICATIFS ({len(significant_changes)}):")
@@ -948,71 +907,131 @@ Ce fichier contient l'historique complet des exécutions du scraper avec les inf
                 if len(significant_changes) > 5:
                     logger.info(f"     ... et {len(significant_changes) - 5} autres")
             
-            logger.info("📁 Fichier de comparaison disponible pour analyse détaillée")
+            logger.info("📁 Détail complet: python snapshot_diff.py as24 --format markdown")
             
             # Préparer les données pour l'historique
-            return {
-                "previous_brands": previous_brands_count,
-                "current_brands": current_brands_count,
-                "brand_changes": brand_change,
-                "previous_models": previous_models_count,
-                "current_models": current_models_count,
-                "model_changes": models_change,
-                "new_brands": list(new_brands),
-                "removed_brands": list(removed_brands),
-                "significant_changes": significant_changes
-            }
+            return {key: totals[key] for key in (
+                "previous_brands", "current_brands", "brand_changes",
+                "previous_models", "current_models", "model_changes",
+                "new_brands", "removed_brands", "significant_changes"
+            )}
             
         except Exception as e:
             logger.debug(f"Erreur lors de la génération du rapport de versioning: {e}")
             return {}
     
-    def scrape_all_brands(self, max_brands=None):
-        """Scrape toutes les marques de la liste JSON."""
+    def scrape_single_brand(self, brand_info, index, total, worker=None):
+        """Scrape une marque (timing, comparaison, progression) suivie de la pause."""
+        brand_name = brand_info["name"]
+        brand_id = brand_info["id"]
+        models = []
+        
+        progress_msg = f"[{index}/{total}]{f' (W{worker})' if worker else ''} {brand_name}"
+        logger.info(f"🏷️ {progress_msg}")
+        self.write_progress(progress_msg)
+        self.progress.emit("brand_started", brand=brand_name, index=index, total=total)
+        self.brand_timer.start(brand_name)
+        
         try:
-            if not self.navigate_to_homepage():
-                return False
+            with span("as24.scrape_brand", brand=brand_name):
+                models = self.scrape_brand_models(brand_name, brand_id)
+            self.brand_models_data[brand_name] = models
             
+            # Comparer avec la version précédente pour cette marque
+            model_changes = self.compare_model_changes_with_previous(brand_name, models)
+            
+            if models:
+                success_msg = f"✅ {len(models)} modèles"
+                logger.info(f"   {success_msg}")
+                self.write_progress(success_msg)
+                if model_changes and model_changes["total_changes"] > 0:
+                    change_msg = f"Changements: +{len(model_changes['new_models'])} -{len(model_changes['removed_models'])}"
+                    logger.info(f"   🔄 {change_msg}")
+                    self.write_progress(change_msg)
+            else:
+                warning_msg = "⚠️ Aucun modèle"
+                logger.warning(f"   {warning_msg}")
+                self.write_progress(warning_msg)
+            
+        except Exception as e:
+            error_msg = f"❌ Erreur: {e}"
+            logger.error(f"   {error_msg}")
+            self.write_progress(error_msg)
+            self.brand_models_data[brand_name] = []
+        
+        duration, _, wait, _ = self.brand_timer.finish()
+        self.progress.emit("brand_done", brand=brand_name, models=len(models),
+                           duration_s=duration, wait_s=wait)
+        
+        # Pause entre les marques (2-4 secondes)
+        with span("as24.politeness_sleep"):
+            time.sleep(random.uniform(2, 4))
+    
+    def scrape_brands_parallel(self, brands_to_process, workers):
+        """Scrape les marques avec plusieurs navigateurs (ordonnancement LPT + vol de travail)."""
+        scheduler = scheduler_for_source("as24", brands_to_process, workers, key=lambda b: b["name"])
+        logger.info(f"🗂️ {scheduler.plan_summary()}")
+        self.write_progress(f"🗂️ {scheduler.plan_summary()}")
+        
+        lock = threading.Lock()
+        processed = [0]
+        
+        def worker_loop(worker_id):
+            worker = None
+            try:
+                worker = AutoScout24Scraper(headless=self.headless, brands_list=self.brands_list)
+                if not worker.navigate_to_homepage():
+                    return
+                while True:
+                    brand_info = scheduler.next(worker_id)
+                    if brand_info is None:
+                        break
+                    with lock:
+                        processed[0] += 1
+                        index = processed[0]
+                    worker.scrape_single_brand(brand_info, index, len(brands_to_process), worker_id + 1)
+            except Exception as e:
+                logger.error(f"❌ Worker {worker_id + 1}: {e}")
+            finally:
+                if worker:
+                    with lock:
+                        self.brand_models_data.update(worker.brand_models_data)
+                        self.brand_timer.rows.update(worker.brand_timer.rows)
+                    worker.close()
+        
+        threads = [threading.Thread(target=worker_loop, args=(w,), name=f"as24-worker-{w + 1}")
+                   for w in range(scheduler.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # Restaurer l'ordre de la liste des marques (un worker défaillant laisse ses marques vides)
+        self.brand_models_data = {
+            b["name"]: self.brand_models_data.get(b["name"], []) for b in brands_to_process
+        }
+        logger.info(f"🔀 Vols de travail entre workers: {scheduler.steals}")
+    
+    def scrape_all_brands(self, max_brands=None, workers=1):
+        """Scrape toutes les marques de la liste JSON."""
+        try:
             # Déterminer les marques à traiter
             brands_to_process = self.brands_list[:max_brands] if max_brands else self.brands_list
             logger.info(f"🚀 Début du scraping pour {len(brands_to_process)} marques")
+            self.progress.emit("plan", brands=[b["name"] for b in brands_to_process], workers=workers)
+            
+            if workers > 1:
+                self.scrape_brands_parallel(brands_to_process, workers)
+                logger.info(f"🎉 Scraping terminé! {len(self.brand_models_data)} marques traitées")
+                self.progress.emit("finished", brands=len(self.brand_models_data),
+                                   models=sum(len(models) for models in self.brand_models_data.values()))
+                return True
+            
+            if not self.navigate_to_homepage():
+                return False
             
             for i, brand_info in enumerate(brands_to_process, 1):
-                brand_name = brand_info["name"]
-                brand_id = brand_info["id"]
-                
-                progress_msg = f"[{i}/{len(brands_to_process)}] {brand_name}"
-                logger.info(f"🏷️ {progress_msg}")
-                self.write_progress(progress_msg)
-                
-                try:
-                    models = self.scrape_brand_models(brand_name, brand_id)
-                    self.brand_models_data[brand_name] = models
-                    
-                    # Comparer avec la version précédente pour cette marque
-                    model_changes = self.compare_model_changes_with_previous(brand_name, models)
-                    
-                    if models:
-                        success_msg = f"✅ {len(models)} modèles"
-                        logger.info(f"   {success_msg}")
-                        self.write_progress(success_msg)
-                        if model_changes and model_changes["total_changes"] > 0:
-                            change_msg = f"Changements: +{len(model_changes['new_models'])} -{len(model_changes['removed_models'])}"
-                            logger.info(f"   🔄 {change_msg}")
-                            self.write_progress(change_msg)
-                    else:
-                        warning_msg = "⚠️ Aucun modèle"
-                        logger.warning(f"   {warning_msg}")
-                        self.write_progress(warning_msg)
-                    
-                except Exception as e:
-                    error_msg = f"❌ Erreur: {e}"
-                    logger.error(f"   {error_msg}")
-                    self.write_progress(error_msg)
-                    self.brand_models_data[brand_name] = []
-                
-                # Pause entre les marques (2-4 secondes)
-                time.sleep(random.uniform(2, 4))
+                self.scrape_single_brand(brand_info, i, len(brands_to_process))
                 
                 # Afficher le progrès tous les 10 marques
                 if i % 10 == 0:
@@ -1022,17 +1041,33 @@ Ce fichier contient l'historique complet des exécutions du scraper avec les inf
                     self.write_progress(progress_msg)
             
             logger.info(f"🎉 Scraping terminé! {len(self.brand_models_data)} marques traitées")
+            self.progress.emit("finished", brands=len(self.brand_models_data),
+                               models=sum(len(models) for models in self.brand_models_data.values()))
             return True
             
         except Exception as e:
             logger.error(f"❌ Erreur lors du scraping: {e}")
             return False
     
+    def scrape_queue_item(self, item):
+        """Scrape une marque reçue de la file de travail (work_queue.py); retourne (modèles, timing)."""
+        if not getattr(self, 'on_homepage', False):
+            self.on_homepage = self.navigate_to_homepage()
+        brand_name = item["brand_info"]["name"]
+        self.scrape_single_brand(item["brand_info"], item["index"], item["total"])
+        return self.brand_models_data.get(brand_name, []), self.brand_timer.rows.get(brand_name)
+    
     def close(self):
         """Ferme le driver proprement."""
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        if getattr(self, '_driver', None) is not None:
+            self._driver.quit()
+            self._driver = None
             logger.info("🔒 Driver fermé")
+        if getattr(self, '_snapshot_store', None) is not None:
+            self._snapshot_store.close()
+            self._snapshot_store = None
+        if hasattr(self, 'progress'):
+            self.progress.close()
 
 def main():
     """Fonction principale avec gestion d'arguments."""
@@ -1044,6 +1079,7 @@ Exemples d'utilisation:
   python autoscout24_scraper.py                 # Toutes les marques (extraction auto si nécessaire)
   python autoscout24_scraper.py --test          # Test rapide (20 marques)
   python autoscout24_scraper.py --max-brands 50 # 50 marques maximum
+  python autoscout24_scraper.py --workers 4     # 4 navigateurs en parallèle
   python autoscout24_scraper.py --headless=False # Voir le navigateur
         """
     )
@@ -1052,6 +1088,8 @@ Exemples d'utilisation:
                        help='Mode test (20 marques seulement)')
     parser.add_argument('--max-brands', type=int, metavar='N',
                        help='Limiter le nombre de marques à scraper')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                       help='Nombre de navigateurs en parallèle (défaut: 1)')
     parser.add_argument('--headless', action='store_true', default=True,
                        help='Mode headless (défaut: True)')
     parser.add_argument('--no-headless', dest='headless', action='store_false',
@@ -1066,6 +1104,7 @@ Exemples d'utilisation:
     logger.info(f"   • Mode: {'Test' if args.test else 'Complet'}")
     logger.info(f"   • Headless: {args.headless}")
     logger.info(f"   • Marques max: {max_brands or 'Toutes'}")
+    logger.info(f"   • Workers: {args.workers}")
     logger.info("   • 🚀 Extraction automatique des marques si nécessaire")
     logger.info("   • 📊 Rapport de versioning automatique")
     logger.info("   • 📝 Historique Markdown automatique")
@@ -1074,7 +1113,7 @@ Exemples d'utilisation:
         scraper = AutoScout24Scraper(headless=args.headless)
         
         # Lancer le scraping
-        success = scraper.scrape_all_brands(max_brands=max_brands)
+        success = scraper.scrape_all_brands(max_brands=max_brands, workers=args.workers)
         
         if success:
             output_file = scraper.save_results()
@@ -1096,5 +1135,39 @@ Exemples d'utilisation:
         if 'scraper' in locals():
             scraper.close()
 
+def run(max_brands=None, headless=True, workers=1):
+    """Point d'entrée in-process: scrape et retourne les données du snapshot sans les écrire."""
+    scraper = AutoScout24Scraper(headless=headless)
+    try:
+        if not scraper.scrape_all_brands(max_brands=max_brands, workers=workers):
+            return None
+        return scraper.build_result_data()
+    finally:
+        scraper.close()
+
+def save(result_data, output_file=None):
+    """Écrit un snapshot retourné par run() (sans navigateur: l'écriture n'utilise pas le driver)."""
+    writer = AutoScout24Scraper.__new__(AutoScout24Scraper)
+    return writer.write_results(result_data, output_file)
+
+def queue_items(max_brands=None):
+    """Tâches de la file de travail (work_queue.py): une par marque de as24_brands_for_scraping.json."""
+    with open("data/as24_brands_for_scraping.json", 'r', encoding='utf-8') as f:
+        brands = json.load(f)["brands"]
+    brands = brands[:max_brands] if max_brands else brands
+    return [(b["name"], {"brand_info": b, "index": i, "total": len(brands)}) for i, b in enumerate(brands, 1)]
+
+def queue_worker(headless=True):
+    """Scraper d'un worker de la file de travail (un navigateur)."""
+    return AutoScout24Scraper(headless=headless, brands_list=[])
+
+def assemble(brands_models, timing_rows):
+    """Données du snapshot à partir des résultats de la file de travail."""
+    builder = AutoScout24Scraper.__new__(AutoScout24Scraper)
+    builder.brand_models_data = brands_models
+    builder.brand_timer = BrandTimer()
+    builder.brand_timer.rows = timing_rows
+    return builder.build_result_data()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Brand Scheduler - Répartition des marques entre workers parallèles
+Ordonne les marques par durée attendue (Longest Processing Time first) à partir
+des timings des exécutions précédentes (voir brand_timings.py), les répartit
+entre les workers puis équilibre la fin d'exécution par vol de travail.
+
+Usage:
+    python brand_scheduler.py as24 --workers 4      # Plan de répartition prévu
+"""
+
+import argparse
+import heapq
+import statistics
+import threading
+from collections import deque
+
+from brand_timings import expected_durations
+
+# Durée supposée (secondes) d'une marque sans historique ni référence
+DEFAULT_BRAND_DURATION = 6.0
+
+
+class BrandScheduler:
+    """File de marques par worker, ordonnancement LPT et vol de travail."""
+
+    def __init__(self, items, workers, expected=None, key=lambda item: item):
+        self.workers = max(1, workers)
+        self.expected = expected or {}
+        self.key = key
+        self.default_duration = (
+            statistics.median(self.expected.values()) if self.expected else DEFAULT_BRAND_DURATION
+        )
+        self.queues = [deque() for _ in range(self.workers)]
+        self.loads = [0.0] * self.workers
+        self.steals = 0
+        self._lock = threading.Lock()
+        self._assign(items)
+
+    def duration(self, item):
+        """Durée attendue d'une marque (médiane globale si inconnue)."""
+        return self.expected.get(self.key(item), self.default_duration)
+
+    def _assign(self, items):
+        """Affecte chaque marque, de la plus longue à la plus courte, au worker le moins chargé."""
+        ordered = sorted(items, key=self.duration, reverse=True)
+        durations = [self.duration(item) for item in ordered]
+        self._lower_bound = max(sum(durations) / self.workers, durations[0]) if durations else 0.0
+        heap = [(0.0, worker_id) for worker_id in range(self.workers)]
+        for item in ordered:
+            load, worker_id = heapq.heappop(heap)
+            self.queues[worker_id].append(item)
+            load += self.duration(item)
+            self.loads[worker_id] = load
+            heapq.heappush(heap, (load, worker_id))
+
+    def next(self, worker_id):
+        """Prochaine marque pour un worker, volée au plus chargé si sa file est vide."""
+        with self._lock:
+            queue = self.queues[worker_id]
+            if not queue:
+                victim = max(range(self.workers), key=self.remaining)
+                if not self.queues[victim]:
+                    return None
+                # La plus longue marque en attente chez la victime: la plus utile à démarrer tôt
+                queue.append(self.queues[victim].popleft())
+                self.steals += 1
+            return queue.popleft()
+
+    def remaining(self, worker_id):
+        """Durée attendue restant dans la file d'un worker."""
+        return sum(self.duration(item) for item in self.queues[worker_id])
+
+    def planned_makespan(self):
+        """Durée prévue du worker le plus chargé."""
+        return max(self.loads)
+
+    def lower_bound(self):
+        """Borne inférieure théorique: max(charge moyenne, plus longue marque)."""
+        return self._lower_bound
+
+    def plan_summary(self):
+        """Résumé lisible du plan de répartition."""
+        total = sum(len(queue) for queue in self.queues)
+        return (f"{total} marques sur {self.workers} workers - "
+                f"durée prévue {self.planned_makespan() / 60:.1f} min "
+                f"(optimum théorique {self.lower_bound() / 60:.1f} min)")
+
+
+def scheduler_for_source(source_prefix, items, workers, key=lambda item: item, data_dir="data"):
+    """Crée un scheduler alimenté par l'historique des timings d'une source."""
+    expected = expected_durations(source_prefix, data_dir)
+    return BrandScheduler(items, workers, expected=expected, key=key)
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Plan de répartition des marques entre workers parallèles",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('source', help='Préfixe de la source (as24, cargurus, autodata)')
+    parser.add_argument('--workers', type=int, default=4, help='Nombre de workers')
+    args = parser.parse_args()
+
+    expected = expected_durations(args.source)
+    if not expected:
+        print(f"❌ Aucun timing trouvé pour {args.source}")
+        return
+
+    scheduler = BrandScheduler(list(expected), args.workers, expected=expected)
+    print(f"🗂️ {scheduler.plan_summary()}")
+    for worker_id, queue in enumerate(scheduler.queues):
+        print(f"   Worker {worker_id + 1}: {len(queue)} marques, "
+              f"{scheduler.loads[worker_id] / 60:.1f} min (première: {queue[0] if queue else '-'})")
+
+
+if __name__ == "__main__":
+    main()
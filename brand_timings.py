@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Brand Timings - Métadonnées de temps par marque
+Collecte la durée, le nombre de tentatives, le temps d'attente et le sélecteur
+utilisé pour chaque marque scrapée, et relit l'historique depuis les snapshots.
+
+Les timings sont stockés dans une table annexe compacte du fichier
+*_scraped_models_*.json (la structure "brands_models" reste inchangée):
+
+    "brand_timings": {
+        "columns": ["duration_s", "attempts", "wait_s", "selector"],
+        "rows": {"BMW": [5.812, 1, 2.904, "select[name='model']"], ...}
+    }
+
+Usage:
+    python brand_timings.py as24                # Marques les plus lentes (dernières exécutions)
+    python brand_timings.py as24 --trend BMW    # Évolution de la latence d'une marque
+"""
+
+import argparse
+import re
+import statistics
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from data_storage import load_json
+
+# Les colonnes sont lues par leur nom: un snapshot sans colonne "attempts" reste lisible
+TIMING_COLUMNS = ["duration_s", "attempts", "wait_s", "selector"]
+ATTEMPTS_COLUMN = TIMING_COLUMNS.index("attempts")
+
+SNAPSHOT_PATTERN = r"{prefix}_scraped_models_(\d{{8}}_\d{{6}})\.json"
+
+
+class BrandTimer:
+    """Chronomètre par marque pour les scrapers."""
+
+    def __init__(self):
+        self.rows = {}
+        self._current = None
+
+    def start(self, brand_name):
+        """Démarre le chronométrage d'une marque."""
+        self._current = {
+            'brand': brand_name,
+            'start': time.perf_counter(),
+            'wait': 0.0,
+            'selector': None
+        }
+
+    def set_selector(self, selector):
+        """Enregistre le sélecteur qui a permis d'extraire les modèles."""
+        if self._current:
+            self._current['selector'] = selector
+
+    @contextmanager
+    def waiting(self):
+        """Comptabilise le temps passé dans le bloc comme temps d'attente."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._current:
+                self._current['wait'] += time.perf_counter() - start
+
+    def finish(self):
+        """Termine le chronométrage de la marque en cours.
+
+        Les scrapers font une seule passe par marque (une tentative); la file de
+        travail (work_queue.py) remplace ce nombre par celui des baux de la tâche.
+        """
+        if not self._current:
+            return None
+        current = self._current
+        row = [
+            round(time.perf_counter() - current['start'], 3),
+            1,
+            round(current['wait'], 3),
+            current['selector']
+        ]
+        self.rows[current['brand']] = row
+        self._current = None
+        return row
+
+    def to_side_table(self):
+        """Retourne la table annexe compacte à stocker dans le snapshot."""
+        return {"columns": TIMING_COLUMNS, "rows": self.rows}
+
+
+def side_table_to_dicts(side_table):
+    """Convertit une table annexe en {marque: {colonne: valeur}}."""
+    if not side_table:
+        return {}
+    columns = side_table.get("columns", TIMING_COLUMNS)
+    return {
+        brand: dict(zip(columns, row))
+        for brand, row in side_table.get("rows", {}).items()
+    }
+
+
+def list_snapshots(source_prefix, data_dir="data", include_archived=False):
+    """Liste les snapshots d'une source triés du plus ancien au plus récent.
+
+    include_archived ajoute les snapshots déplacés dans data/archive/ (chemin d'origine, lisible avec load_json:
+    l'import de snapshot_retention enregistre la lecture des archives).
+    """
+    pattern = SNAPSHOT_PATTERN.format(prefix=re.escape(source_prefix))
+    versions = []
+    for file in Path(data_dir).glob(f"{source_prefix}_scraped_models_*.json"):
+        match = re.search(pattern, file.name)
+        if match:
+            versions.append((match.group(1), file))
+    if include_archived:
+        from snapshot_retention import archived_versions
+        present = {version for version, _ in versions}
+        versions.extend(entry for entry in archived_versions(f"{source_prefix}_scraped_models", data_dir)
+                        if entry[0] not in present)
+    versions.sort(key=lambda x: x[0])
+    return versions
+
+
+def load_timing_history(source_prefix, data_dir="data", max_snapshots=5):
+    """Charge les durées par marque des derniers snapshots: {marque: [(version, durée), ...]}."""
+    history = {}
+    for version, file in list_snapshots(source_prefix, data_dir)[-max_snapshots:]:
+        try:
+            data = load_json(file)
+        except Exception:
+            continue
+        for brand, timing in side_table_to_dicts(data.get("brand_timings")).items():
+            history.setdefault(brand, []).append((version, timing.get("duration_s")))
+    return history
+
+
+def expected_durations(source_prefix, data_dir="data", max_snapshots=5):
+    """Durée attendue par marque (médiane des dernières exécutions)."""
+    history = load_timing_history(source_prefix, data_dir, max_snapshots)
+    return {
+        brand: statistics.median(d for _, d in samples if d is not None)
+        for brand, samples in history.items()
+        if any(d is not None for _, d in samples)
+    }
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Analyse des timings par marque depuis les snapshots",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('source', help='Préfixe de la source (as24, cargurus, autodata)')
+    parser.add_argument('--top', type=int, default=20, help='Nombre de marques affichées')
+    parser.add_argument('--trend', metavar='BRAND', help='Évolution de la latence pour une marque')
+    parser.add_argument('--snapshots', type=int, default=5, help='Nombre de snapshots analysés')
+    args = parser.parse_args()
+
+    if args.trend:
+        history = load_timing_history(args.source, max_snapshots=args.snapshots)
+        samples = history.get(args.trend)
+        if not samples:
+            print(f"❌ Aucun timing pour {args.trend}")
+            return
+        print(f"📈 Latence {args.trend} ({args.source}):")
+        for version, duration in samples:
+            if duration is not None:
+                print(f"   {version}: {duration:.2f}s")
+        return
+
+    durations = expected_durations(args.source, max_snapshots=args.snapshots)
+    if not durations:
+        print(f"❌ Aucun timing trouvé pour {args.source}")
+        return
+
+    print(f"🐢 Marques les plus lentes ({args.source}, médiane sur {args.snapshots} snapshots):")
+    for i, (brand, duration) in enumerate(sorted(durations.items(), key=lambda x: x[1], reverse=True)[:args.top], 1):
+        print(f"   {i:2d}. {brand:<30} {duration:>6.2f}s")
+    print(f"   Total estimé: {sum(durations.values()) / 60:.1f} min pour {len(durations)} marques")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Build Cache - Saut des étapes à jour dans les orchestrateurs
+Enregistre dans data/.build_cache.json les empreintes (SHA-256) des entrées et
+sorties de chaque étape du pipeline. Une étape dont le script, les entrées et
+les sorties n'ont pas changé depuis sa dernière exécution réussie est sautée.
+
+Les entrées/sorties sont déclarées dans PIPELINE_STAGES (pipeline_dag.py):
+un motif glob désigne le fichier le plus récent (tri par nom, comme la
+consolidation), un chemin simple désigne le fichier lui-même.
+
+Usage:
+    python build_cache.py            # État du cache par étape
+    python build_cache.py --clear    # Vider le cache
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+CACHE_FILE = Path("data/.build_cache.json")
+
+
+def file_hash(path):
+    """Empreinte SHA-256 du contenu d'un fichier."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resolve_files(patterns):
+    """Résout les motifs en fichiers: le plus récent pour un glob, le fichier lui-même sinon."""
+    files = []
+    for pattern in patterns:
+        if any(c in pattern for c in '*?['):
+            matches = sorted(Path('.').glob(pattern))
+            if matches:
+                files.append(matches[-1])
+        elif Path(pattern).exists():
+            files.append(Path(pattern))
+    return files
+
+
+def fingerprint(patterns):
+    """Empreintes {chemin: sha256} des fichiers désignés par les motifs."""
+    return {str(path): file_hash(path) for path in resolve_files(patterns)}
+
+
+class BuildCache:
+    """Manifeste des empreintes par étape, partagé entre les étapes parallèles."""
+
+    def __init__(self, cache_file=CACHE_FILE, force=False):
+        self.cache_file = Path(cache_file)
+        self.force = force
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        """Charge le manifeste (vide s'il est absent ou illisible)."""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Écrit le manifeste de manière atomique."""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        tmp_file.replace(self.cache_file)
+
+    @staticmethod
+    def is_cacheable(spec):
+        """Seules les étapes qui déclarent leurs entrées peuvent être mises en cache."""
+        return 'inputs' in spec
+
+    def _input_patterns(self, spec):
+        return [spec['script']] + list(spec['inputs'])
+
+    def is_fresh(self, spec):
+        """Retourne l'entrée du cache si l'étape est à jour, None sinon."""
+        if self.force or not self.is_cacheable(spec):
+            return None
+        with self._lock:
+            entry = self.entries.get(spec['name'])
+        if not entry:
+            return None
+        if fingerprint(self._input_patterns(spec)) != entry.get('inputs'):
+            return None
+        outputs = fingerprint(spec.get('outputs', []))
+        if not outputs or outputs != entry.get('outputs'):
+            return None
+        return entry
+
+    def record(self, spec, duration):
+        """Enregistre les empreintes après une exécution réussie."""
+        if not self.is_cacheable(spec):
+            return
+        entry = {
+            'inputs': fingerprint(self._input_patterns(spec)),
+            'outputs': fingerprint(spec.get('outputs', [])),
+            'duration': round(duration, 2),
+            'updated_at': datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        }
+        with self._lock:
+            self.entries[spec['name']] = entry
+            self._save()
+
+    def wrap(self, run_stage, bypass=None):
+        """Enveloppe un exécuteur d'étape: saute les étapes à jour, enregistre les autres.
+
+        bypass(spec) -> True exécute l'étape sans consulter ni mettre à jour le cache
+        (entrées transmises en mémoire, fichiers pas encore écrits).
+        """
+        def cached_run_stage(spec):
+            if bypass and bypass(spec):
+                return run_stage(spec)
+
+            entry = self.is_fresh(spec)
+            if entry:
+                print(f"⚡ {spec['emoji']} {spec['description']}: cached (saved ~{entry['duration']:.1f}s)")
+                return {
+                    'success': True,
+                    'duration': 0,
+                    'output': '',
+                    'error': None,
+                    'cached': True,
+                    'saved': entry['duration']
+                }
+
+            start_time = time.time()
+            result = run_stage(spec)
+            if result and result.get('success'):
+                self.record(spec, result.get('duration', time.time() - start_time))
+            return result
+
+        return cached_run_stage
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    from pipeline_dag import PIPELINE_STAGES
+
+    parser = argparse.ArgumentParser(description="État du cache des étapes du pipeline")
+    parser.add_argument('--clear', action='store_true', help='Vider le cache')
+    args = parser.parse_args()
+
+    if args.clear:
+        if CACHE_FILE.exists():
+            CACHE_FILE.unlink()
+        print("🧹 Cache vidé")
+        return
+
+    cache = BuildCache()
+    for spec in PIPELINE_STAGES:
+        if not cache.is_cacheable(spec):
+            continue
+        entry = cache.entries.get(spec['name'])
+        if not entry:
+            status = "jamais exécutée"
+        elif cache.is_fresh(spec):
+            status = f"à jour ({entry['updated_at']}, ~{entry['duration']:.1f}s)"
+        else:
+            status = "à reconstruire"
+        print(f"{spec['emoji']} {spec['name']:<15} {status}")
+
+
+if __name__ == "__main__":
+    main()
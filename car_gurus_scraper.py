@@ -18,6 +18,7 @@ import random
 import logging
 import sys
 import re
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from selenium import webdriver
@@ -26,6 +27,11 @@ from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from tracing import traced, span
+from result_writer import ScrapeResult, brand_statistics
+from brand_timings import BrandTimer
+from brand_scheduler import scheduler_for_source
+from progress_channel import ProgressEmitter
 
 # Configuration logging with emojis
 logging.basicConfig(
@@ -41,11 +47,24 @@ logger = logging.getLogger(__name__)
 class CarGurusScraper:
     """CarGurus.com autonomous and robust scraper."""
     
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, brands_list=None):
         self.base_url = "https://www.cargurus.com"
+        self.headless = headless
         self.brand_models_data = {}
-        self.setup_driver(headless)
-        self.load_brands_from_json()
+        self.brand_timer = BrandTimer()
+        self.progress = ProgressEmitter("cguru")
+        self._driver = None
+        if brands_list is None:
+            self.load_brands_from_json()
+        else:
+            self.brands_list = brands_list
+    
+    @property
+    def driver(self):
+        """Selenium driver started on first use (the parent in --workers mode never opens one)."""
+        if self._driver is None:
+            self.setup_driver(self.headless)
+        return self._driver
         
     def setup_driver(self, headless=True):
         """Configure Selenium driver with optimized options."""
@@ -62,9 +81,9 @@ class CarGurusScraper:
             chrome_options.add_experimental_option('useAutomationExtension', False)
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36")
             
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.implicitly_wait(10)
+            self._driver = webdriver.Chrome(options=chrome_options)
+            self._driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self._driver.implicitly_wait(10)
             logger.info("✅ Selenium driver configured")
             
         except Exception as e:
@@ -101,7 +120,9 @@ class CarGurusScraper:
             return False
     
     def write_progress(self, message):
-        """Write progress message to progress file (no encoding issues)."""
+        """Send progress message to the orchestrator, or to the progress file when run standalone."""
+        if self.progress.emit("message", text=message):
+            return
         try:
             progress_file = "progress_cargurus_us_market.txt"
             with open(progress_file, 'a', encoding='utf-8', errors='ignore') as f:
@@ -182,6 +203,7 @@ class CarGurusScraper:
             logger.error(f"❌ Error extracting brands: {e}")
             return False
     
+    @traced("cargurus.navigate_to_homepage")
     def navigate_to_homepage(self):
         """Navigate to homepage and wait for complete loading."""
         try:
@@ -202,6 +224,7 @@ class CarGurusScraper:
             logger.error(f"❌ Homepage navigation error: {e}")
             return False
     
+    @traced("cargurus.select_brand_in_menu")
     def select_brand_in_menu(self, brand_name, brand_id):
         """Select a brand in the dropdown menu."""
         try:
@@ -211,7 +234,8 @@ class CarGurusScraper:
             select.select_by_value(brand_id)
             
             # Wait for page to update
-            time.sleep(2)
+            with self.brand_timer.waiting():
+                time.sleep(2)
             logger.debug(f"✅ Brand '{brand_name}' selected (ID: {brand_id})")
             return True
             
@@ -219,13 +243,15 @@ class CarGurusScraper:
             logger.error(f"❌ Error selecting brand {brand_name}: {e}")
             return False
     
+    @traced("cargurus.get_model_menu_options")
     def get_model_menu_options(self):
         """Get options from model dropdown menu."""
         try:
             # Wait for model selector to be present
-            model_select = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "car-picker-model-select"))
-            )
+            with self.brand_timer.waiting():
+                model_select = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.ID, "car-picker-model-select"))
+                )
             
             options = model_select.find_elements(By.TAG_NAME, "option")
             models = []
@@ -239,6 +265,7 @@ class CarGurusScraper:
             
             if models:
                 logger.debug(f"✅ {len(models)} models found")
+                self.brand_timer.set_selector("#car-picker-model-select")
                 return models
             else:
                 logger.warning("⚠️ No models found")
@@ -267,48 +294,46 @@ class CarGurusScraper:
             logger.error(f"❌ Error scraping {brand_name}: {e}")
             return []
     
+    def build_result_data(self):
+        """Build the snapshot data (metadata, models per brand, timings)."""
+        return {
+            "metadata": {
+                "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "scraper_version": "v1.0_cargurus_us_market",
+                "source": "CarGurus.com Auto Scraping",
+                "method": "selenium_dropdown_interaction",
+                **brand_statistics(self.brand_models_data)
+            },
+            "brands_models": self.brand_models_data,
+            "brand_timings": self.brand_timer.to_side_table()
+        }
+    
     def save_results(self, output_file=None):
         """Save results with automatic versioning and Markdown version."""
+        return self.write_results(self.build_result_data(), output_file)
+    
+    @traced("cargurus.save_results")
+    def write_results(self, result_data, output_file=None):
+        """Write a snapshot (JSON and Markdown)."""
         try:
+            result = ScrapeResult("cargurus", result_data)
             if not output_file:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = f"data/cargurus_scraped_models_{timestamp}.json"
-            
-            # Prepare data
-            result_data = {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "scraper_version": "v1.0_cargurus_us_market",
-                    "source": "CarGurus.com Auto Scraping",
-                    "method": "selenium_dropdown_interaction",
-                    "total_brands": len(self.brand_models_data),
-                    "total_models": sum(len(models) for models in self.brand_models_data.values()),
-                    "brands_with_models": len([b for b, models in self.brand_models_data.items() if models]),
-                    "brands_without_models": len([b for b, models in self.brand_models_data.items() if not models])
-                },
-                "brands_models": self.brand_models_data
-            }
+                existing = result.unchanged()
+                if existing:
+                    logger.info(f"♻️ No change since {existing}: snapshot not rewritten")
+                    return existing
             
-            # Save JSON file
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result_data, f, indent=2, ensure_ascii=False)
-            
-            # Generate Markdown version
-            md_file = self.generate_markdown_version(result_data, output_file)
+            # JSON, Markdown, index and history written concurrently from the same document
+            output_file = result.write(output_file, markdown=self.generate_markdown_version)
             
             logger.info(f"💾 Results saved:")
             logger.info(f"   📄 JSON: {output_file}")
-            logger.info(f"   📝 MD: {md_file}")
-            
-            # Final summary
-            total_models = result_data["metadata"]["total_models"]
-            brands_with_models = result_data["metadata"]["brands_with_models"]
+            logger.info(f"   📝 MD: {result.md_file}")
             
             logger.info("📊 RÉSUMÉ CARGURUS:")
-            logger.info(f"   • Marques traitées: {len(self.brand_models_data)}")
-            logger.info(f"   • Marques avec modèles: {brands_with_models}")
-            logger.info(f"   • Total modèles: {total_models}")
+            logger.info(f"   • Marques traitées: {result.metadata['total_brands']}")
+            logger.info(f"   • Marques avec modèles: {result.metadata['brands_with_models']}")
+            logger.info(f"   • Total modèles: {result.metadata['total_models']}")
             
             return output_file
             
@@ -476,45 +501,111 @@ class CarGurusScraper:
             logger.error(f"❌ Error formatting brands Markdown: {e}")
             return f"# 🚗 CarGurus.com - Brands List\n\n**Formatting error:** {e}\n"
     
-    def scrape_all_brands(self, max_brands=None):
-        """Scrape all brands from JSON list."""
+    def scrape_single_brand(self, brand_info, index, total, worker=None):
+        """Scrape one brand (timing, progress) followed by the politeness pause."""
+        brand_name = brand_info["name"]
+        brand_id = brand_info["id"]
+        
+        progress_msg = f"[{index}/{total}]{f' (W{worker})' if worker else ''} {brand_name}"
+        logger.info(f"🏷️ {progress_msg}")
+        self.write_progress(progress_msg)
+        self.progress.emit("brand_started", brand=brand_name, index=index, total=total)
+        self.brand_timer.start(brand_name)
+        models = []
+        
         try:
-            if not self.navigate_to_homepage():
-                return False
+            with span("cargurus.scrape_brand", brand=brand_name):
+                models = self.scrape_brand_models(brand_name, brand_id)
+            self.brand_models_data[brand_name] = models
+            
+            if models:
+                success_msg = f"✅ {len(models)} models"
+                logger.info(f"   {success_msg}")
+                self.write_progress(success_msg)
+            else:
+                warning_msg = "⚠️ No models"
+                logger.warning(f"   {warning_msg}")
+                self.write_progress(warning_msg)
             
+        except Exception as e:
+            error_msg = f"❌ Error: {e}"
+            logger.error(f"   {error_msg}")
+            self.write_progress(error_msg)
+            self.brand_models_data[brand_name] = []
+        
+        duration, _, wait, _ = self.brand_timer.finish()
+        self.progress.emit("brand_done", brand=brand_name, models=len(models),
+                           duration_s=duration, wait_s=wait)
+        
+        # Pause between brands (1-2 seconds)
+        with span("cargurus.politeness_sleep"):
+            time.sleep(random.uniform(1, 2))
+    
+    def scrape_brands_parallel(self, brands_to_process, workers):
+        """Scrape brands with several browsers (LPT scheduling + work stealing)."""
+        scheduler = scheduler_for_source("cargurus", brands_to_process, workers, key=lambda b: b["name"])
+        logger.info(f"🗂️ {scheduler.plan_summary()}")
+        self.write_progress(f"🗂️ {scheduler.plan_summary()}")
+        
+        lock = threading.Lock()
+        processed = [0]
+        
+        def worker_loop(worker_id):
+            worker = None
+            try:
+                worker = CarGurusScraper(headless=self.headless, brands_list=self.brands_list)
+                if not worker.navigate_to_homepage():
+                    return
+                while True:
+                    brand_info = scheduler.next(worker_id)
+                    if brand_info is None:
+                        break
+                    with lock:
+                        processed[0] += 1
+                        index = processed[0]
+                    worker.scrape_single_brand(brand_info, index, len(brands_to_process), worker_id + 1)
+            except Exception as e:
+                logger.error(f"❌ Worker {worker_id + 1}: {e}")
+            finally:
+                if worker:
+                    with lock:
+                        self.brand_models_data.update(worker.brand_models_data)
+                        self.brand_timer.rows.update(worker.brand_timer.rows)
+                    worker.close()
+        
+        threads = [threading.Thread(target=worker_loop, args=(w,), name=f"cargurus-worker-{w + 1}")
+                   for w in range(scheduler.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # Restore brand list order (a failed worker leaves its brands empty)
+        self.brand_models_data = {
+            b["name"]: self.brand_models_data.get(b["name"], []) for b in brands_to_process
+        }
+        logger.info(f"🔀 Work steals between workers: {scheduler.steals}")
+    
+    def scrape_all_brands(self, max_brands=None, workers=1):
+        """Scrape all brands from JSON list."""
+        try:
             # Determine brands to process
             brands_to_process = self.brands_list[:max_brands] if max_brands else self.brands_list
             logger.info(f"🚀 Starting scraping for {len(brands_to_process)} brands")
+            self.progress.emit("plan", brands=[b["name"] for b in brands_to_process], workers=workers)
+            
+            if workers > 1:
+                self.scrape_brands_parallel(brands_to_process, workers)
+                logger.info(f"🎉 Scraping complete! {len(self.brand_models_data)} brands processed")
+                self.progress.emit("finished", brands=len(self.brand_models_data),
+                                   models=sum(len(models) for models in self.brand_models_data.values()))
+                return True
+            
+            if not self.navigate_to_homepage():
+                return False
             
             for i, brand_info in enumerate(brands_to_process, 1):
-                brand_name = brand_info["name"]
-                brand_id = brand_info["id"]
-                
-                progress_msg = f"[{i}/{len(brands_to_process)}] {brand_name}"
-                logger.info(f"🏷️ {progress_msg}")
-                self.write_progress(progress_msg)
-                
-                try:
-                    models = self.scrape_brand_models(brand_name, brand_id)
-                    self.brand_models_data[brand_name] = models
-                    
-                    if models:
-                        success_msg = f"✅ {len(models)} models"
-                        logger.info(f"   {success_msg}")
-                        self.write_progress(success_msg)
-                    else:
-                        warning_msg = "⚠️ No models"
-                        logger.warning(f"   {warning_msg}")
-                        self.write_progress(warning_msg)
-                    
-                except Exception as e:
-                    error_msg = f"❌ Error: {e}"
-                    logger.error(f"   {error_msg}")
-                    self.write_progress(error_msg)
-                    self.brand_models_data[brand_name] = []
-                
-                # Pause between brands (1-2 seconds)
-                time.sleep(random.uniform(1, 2))
+                self.scrape_single_brand(brand_info, i, len(brands_to_process))
                 
                 # Show progress every 10 brands
                 if i % 10 == 0:
@@ -524,17 +615,30 @@ class CarGurusScraper:
                     self.write_progress(progress_msg)
             
             logger.info(f"🎉 Scraping complete! {len(self.brand_models_data)} brands processed")
+            self.progress.emit("finished", brands=len(self.brand_models_data),
+                               models=sum(len(models) for models in self.brand_models_data.values()))
             return True
             
         except Exception as e:
             logger.error(f"❌ Error during scraping: {e}")
             return False
     
+    def scrape_queue_item(self, item):
+        """Scrape one brand received from the work queue (work_queue.py); return (models, timing)."""
+        if not getattr(self, 'on_homepage', False):
+            self.on_homepage = self.navigate_to_homepage()
+        brand_name = item["brand_info"]["name"]
+        self.scrape_single_brand(item["brand_info"], item["index"], item["total"])
+        return self.brand_models_data.get(brand_name, []), self.brand_timer.rows.get(brand_name)
+    
     def close(self):
         """Properly close the driver."""
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        if getattr(self, '_driver', None) is not None:
+            self._driver.quit()
+            self._driver = None
             logger.info("🔒 Driver closed")
+        if hasattr(self, 'progress'):
+            self.progress.close()
 
 def main():
     """Main function with argument handling."""
@@ -546,6 +650,7 @@ Examples of use:
   python car_gurus_scraper.py                 # All brands (auto extraction if needed)
   python car_gurus_scraper.py --test          # Quick test (20 brands)
   python car_gurus_scraper.py --max-brands 50 # 50 brands maximum
+  python car_gurus_scraper.py --workers 4     # 4 browsers in parallel
   python car_gurus_scraper.py --headless=False # See the browser
         """
     )
@@ -554,6 +659,8 @@ Examples of use:
                        help='Test mode (20 brands only)')
     parser.add_argument('--max-brands', type=int, metavar='N',
                        help='Limit number of brands to scrape')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                       help='Number of browsers in parallel (default: 1)')
     parser.add_argument('--headless', action='store_true', default=True,
                        help='Headless mode (default: True)')
     parser.add_argument('--no-headless', dest='headless', action='store_false',
@@ -568,13 +675,14 @@ Examples of use:
     logger.info(f"   • Mode: {'Test' if args.test else 'Complete'}")
     logger.info(f"   • Headless: {args.headless}")
     logger.info(f"   • Max brands: {max_brands or 'All'}")
+    logger.info(f"   • Workers: {args.workers}")
     logger.info("   • 🚀 Automatic brand extraction if needed")
     
     try:
         scraper = CarGurusScraper(headless=args.headless)
         
         # Launch scraping
-        success = scraper.scrape_all_brands(max_brands=max_brands)
+        success = scraper.scrape_all_brands(max_brands=max_brands, workers=args.workers)
         
         if success:
             output_file = scraper.save_results()
@@ -595,5 +703,39 @@ Examples of use:
         if 'scraper' in locals():
             scraper.close()
 
+def run(max_brands=None, headless=True, workers=1):
+    """In-process entry point: scrape and return the snapshot data without writing it."""
+    scraper = CarGurusScraper(headless=headless)
+    try:
+        if not scraper.scrape_all_brands(max_brands=max_brands, workers=workers):
+            return None
+        return scraper.build_result_data()
+    finally:
+        scraper.close()
+
+def save(result_data, output_file=None):
+    """Write a snapshot returned by run() (no browser: writing does not use the driver)."""
+    writer = CarGurusScraper.__new__(CarGurusScraper)
+    return writer.write_results(result_data, output_file)
+
+def queue_items(max_brands=None):
+    """Work queue tasks (work_queue.py): one per brand of cargurus_brands_for_scraping.json."""
+    with open("data/cargurus_brands_for_scraping.json", 'r', encoding='utf-8') as f:
+        brands = json.load(f)["brands"]
+    brands = brands[:max_brands] if max_brands else brands
+    return [(b["name"], {"brand_info": b, "index": i, "total": len(brands)}) for i, b in enumerate(brands, 1)]
+
+def queue_worker(headless=True):
+    """Scraper of a work queue worker (one browser)."""
+    return CarGurusScraper(headless=headless)
+
+def assemble(brands_models, timing_rows):
+    """Snapshot data built from the work queue results."""
+    builder = CarGurusScraper.__new__(CarGurusScraper)
+    builder.brand_models_data = brands_models
+    builder.brand_timer = BrandTimer()
+    builder.brand_timer.rows = timing_rows
+    return builder.build_result_data()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
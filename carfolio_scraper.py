@@ -27,6 +27,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from tracing import traced, span
+from result_writer import ScrapeResult, brand_statistics
+from data_storage import load_json
+import snapshot_retention  # Lecture des fichiers archivés dans data/archive/ (lecteur de secours de load_json)
 
 # Configuration logging avec emojis
 logging.basicConfig(
@@ -77,21 +81,22 @@ class CarfolioScraper:
         """Charge les données d'exploration Carfolio."""
         try:
             exploration_file = Path("data/carfolio_exploration_20251113_224759.json")
-            if exploration_file.exists():
-                with open(exploration_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.exploration_data = data
-                    self.brands_to_scrape = data.get("brands_discovered", [])
-                logger.info(f"📋 Chargé {len(self.brands_to_scrape)} marques depuis l'exploration Carfolio")
-                return True
-            else:
+            try:
+                # Lu dans data/archive/ si la rétention l'a archivé
+                data = load_json(exploration_file)
+            except FileNotFoundError:
                 logger.error("❌ Fichier d'exploration Carfolio non trouvé")
                 return False
+            self.exploration_data = data
+            self.brands_to_scrape = data.get("brands_discovered", [])
+            logger.info(f"📋 Chargé {len(self.brands_to_scrape)} marques depuis l'exploration Carfolio")
+            return True
 
         except Exception as e:
             logger.error(f"❌ Erreur chargement données exploration: {e}")
             return False
 
+    @traced("carfolio.extract_all_models_from_specifications_page")
     def extract_all_models_from_specifications_page(self):
         """Extrait tous les modèles depuis la page de spécifications Carfolio."""
         try:
@@ -105,7 +110,8 @@ class CarfolioScraper:
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
 
-            time.sleep(5)  # La page est lourde, attendre plus longtemps
+            with span("carfolio.page_settle_wait"):
+                time.sleep(5)  # La page est lourde, attendre plus longtemps
 
             # Collecter tous les liens de modèles sur la page
             all_links = self.driver.find_elements(By.CSS_SELECTOR, "a")
@@ -180,6 +186,7 @@ class CarfolioScraper:
             logger.error(f"❌ Erreur extraction modèles depuis page spécifications: {e}")
             return {}
 
+    @traced("carfolio.scrape_all_models")
     def scrape_all_models(self):
         """Scrape tous les modèles depuis la page de spécifications."""
         try:
@@ -273,48 +280,50 @@ class CarfolioScraper:
 
         return duplicates
 
+    def build_result_data(self):
+        """Construit les données du snapshot (métadonnées, modèles par marque, doublons)."""
+        brands_models = {brand: models for brand, (models, _) in self.brand_models_data.items()}
+        return {
+            "metadata": {
+                "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "scraper_version": "carfolio_scraper_v1.0",
+                "source": "Carfolio.com",
+                "method": "link_extraction_from_brand_pages",
+                "url_pattern": "/{brand-slug}/{brand-id}/",
+                "model_selector": "a[href*='/specifications/']",
+                **brand_statistics(brands_models),
+                "total_duplicates_detected": len(self.duplicate_log),
+                "file_prefix": "carfolio_",
+                "integration_ready": True
+            },
+            "brands_models": brands_models,
+            "duplicates_log": self.duplicate_log
+        }
+
     def save_results(self, output_file=None):
         """Sauvegarde les résultats avec le préfixe carfolio_."""
+        return self.write_results(self.build_result_data(), output_file)
+
+    @traced("carfolio.save_results")
+    def write_results(self, result_data, output_file=None):
+        """Écrit un snapshot Carfolio."""
         try:
+            result = ScrapeResult("carfolio", result_data)
             if not output_file:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_file = f"data/carfolio_scraped_models_{timestamp}.json"
-
-            result_data = {
-                "metadata": {
-                    "scraped_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-                    "scraper_version": "carfolio_scraper_v1.0",
-                    "source": "Carfolio.com",
-                    "method": "link_extraction_from_brand_pages",
-                    "url_pattern": "/{brand-slug}/{brand-id}/",
-                    "model_selector": "a[href*='/specifications/']",
-                    "total_brands": len(self.brand_models_data),
-                    "total_models": sum(len(models) for models, _ in self.brand_models_data.values()),
-                    "brands_with_models": len([b for b, (models, _) in self.brand_models_data.items() if models]),
-                    "brands_without_models": len([b for b, (models, _) in self.brand_models_data.items() if not models]),
-                    "total_duplicates_detected": len(self.duplicate_log),
-                    "file_prefix": "carfolio_",
-                    "integration_ready": True
-                },
-                "brands_models": {brand: models for brand, (models, _) in self.brand_models_data.items()},
-                "duplicates_log": self.duplicate_log
-            }
-
-            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result_data, f, indent=2, ensure_ascii=False)
+                existing = result.unchanged()
+                if existing:
+                    logger.info(f"♻️ Aucun changement depuis {existing}: snapshot Carfolio non réécrit")
+                    return existing
+
+            output_file = result.write(output_file)
 
             logger.info(f"💾 Résultats Carfolio sauvegardés: {output_file}")
 
             # Résumé
-            total_models = result_data["metadata"]["total_models"]
-            brands_with_models = result_data["metadata"]["brands_with_models"]
-            total_duplicates = result_data["metadata"]["total_duplicates_detected"]
-
             logger.info("📊 RÉSUMÉ CARFOLIO:")
-            logger.info(f"   • Marques traitées: {len(self.brand_models_data)}")
-            logger.info(f"   • Marques avec modèles: {brands_with_models}")
-            logger.info(f"   • Total modèles: {total_models}")
+            logger.info(f"   • Marques traitées: {result.metadata['total_brands']}")
+            logger.info(f"   • Marques avec modèles: {result.metadata['brands_with_models']}")
+            logger.info(f"   • Total modèles: {result.metadata['total_models']}")
 
             return output_file
 
@@ -439,5 +448,20 @@ Ce scraper génère des fichiers avec préfixe carfolio_ pour identification dan
         if 'scraper' in locals():
             scraper.close()
 
+def run(max_brands=None, headless=True):
+    """Point d'entrée in-process: scrape et retourne les données du snapshot sans les écrire."""
+    scraper = CarfolioScraper(headless=headless)
+    try:
+        if not scraper.scrape_all_brands(max_brands=max_brands):
+            return None
+        return scraper.build_result_data()
+    finally:
+        scraper.close()
+
+def save(result_data, output_file=None):
+    """Écrit un snapshot retourné par run() (sans navigateur: l'écriture n'utilise pas le driver)."""
+    writer = CarfolioScraper.__new__(CarfolioScraper)
+    return writer.write_results(result_data, output_file)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
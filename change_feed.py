@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Change Feed - Flux d'événements de changement (CDC) pour les consommateurs
+Chaque snapshot indexé dans data/snapshots.db (écrit par un scraper ou
+importé), chaque consolidation et chaque export technique ajoute ses
+changements à data/change_feed.jsonl, une ligne JSON par événement avec un
+numéro de séquence croissant:
+
+    {"seq": 1042, "ts": "2025-11-13T08:12:00Z", "type": "model_added",
+     "source": "as24", "brand": "BMW", "model": "iX2", "version": "20251113_080000"}
+
+Types: brand_added, brand_removed, model_added, model_removed, spec_changed.
+Sources: as24, cargurus, autodata, carfolio (snapshots), consolidated
+(consolidated_brands_models.json, avec les sources d'origine du modèle) et
+technical (spécifications techniques).
+
+Le premier snapshot d'une source publie toutes ses marques et tous ses
+modèles: un consommateur qui lit le flux depuis le début reconstruit l'état
+complet, puis ne lit que les nouveaux événements (--since SEQ).
+
+Usage:
+    python change_feed.py                          # Derniers événements
+    python change_feed.py --since 1000             # Événements après la séquence 1000
+    python change_feed.py --since 1000 --follow    # Suivre le flux (tail -f)
+    python change_feed.py --source as24 --type model_added
+    python change_feed.py --stats                  # Nombre d'événements par source et type
+"""
+
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FEED_FILE = Path("data/change_feed.jsonl")
+LOCK_FILE = Path("data/.change_feed.lock")
+
+FOLLOW_INTERVAL = 1.0
+
+
+def snapshot_events(source, previous, current, version=None):
+    """Événements entre deux {marque: modèles} d'une même source."""
+    events = []
+    for brand in current:
+        if brand not in previous:
+            events.append({"type": "brand_added", "source": source, "brand": brand})
+    for brand in previous:
+        if brand not in current:
+            events.append({"type": "brand_removed", "source": source, "brand": brand})
+
+    for brand in sorted(set(previous) | set(current)):
+        before = set(previous.get(brand, []))
+        after = current.get(brand, [])
+        for model in after:
+            if model not in before:
+                events.append({"type": "model_added", "source": source, "brand": brand, "model": model})
+        for model in sorted(before - set(after)):
+            events.append({"type": "model_removed", "source": source, "brand": brand, "model": model})
+
+    for event in events:
+        if version:
+            event["version"] = version
+    return events
+
+
+def consolidated_events(previous, current):
+    """Événements entre deux consolidations ({marque: {'sources', 'models'}})."""
+    events = []
+    for brand, info in current.items():
+        if brand not in previous:
+            events.append({"type": "brand_added", "source": "consolidated", "brand": brand,
+                           "origins": info.get("sources", [])})
+    for brand in previous:
+        if brand not in current:
+            events.append({"type": "brand_removed", "source": "consolidated", "brand": brand})
+    for brand in sorted(set(previous) | set(current)):
+        before = set(previous.get(brand, {}).get("models", []))
+        after = current.get(brand, {}).get("models", [])
+        origins = current.get(brand, {}).get("sources", [])
+        for model in after:
+            if model not in before:
+                events.append({"type": "model_added", "source": "consolidated", "brand": brand,
+                               "model": model, "origins": origins})
+        for model in sorted(before - set(after)):
+            events.append({"type": "model_removed", "source": "consolidated", "brand": brand, "model": model})
+    return events
+
+
+def technical_events(previous, current):
+    """Événements spec_changed entre deux exports de spécifications techniques."""
+    events = []
+    old_brands = previous.get("brands_technical_data", {})
+    for brand, brand_data in current.get("brands_technical_data", {}).items():
+        old_models = old_brands.get(brand, {}).get("models", {})
+        for model, model_data in brand_data.get("models", {}).items():
+            specs = model_data.get("technical_specifications", {})
+            old_specs = old_models.get(model, {}).get("technical_specifications")
+            if old_specs is not None and old_specs != specs:
+                events.append({"type": "spec_changed", "source": "technical", "brand": brand, "model": model,
+                               "changes": _field_changes(old_specs, specs)})
+    return events
+
+
+def _field_changes(before, after, prefix=""):
+    """{champ: [avant, après]} des valeurs modifiées (champs imbriqués en notation pointée)."""
+    changes = {}
+    for key in sorted(set(before) | set(after)):
+        old, new = before.get(key), after.get(key)
+        if old == new:
+            continue
+        if isinstance(old, dict) and isinstance(new, dict):
+            changes.update(_field_changes(old, new, f"{prefix}{key}."))
+        else:
+            changes[f"{prefix}{key}"] = [old, new]
+    return changes
+
+
+@contextmanager
+def _feed_lock(lock_file=LOCK_FILE):
+    """Verrou exclusif entre processus (scrapers parallèles); sans effet hors POSIX."""
+    lock_file = Path(lock_file)
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_file, 'w') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_line_at(f, offset):
+    """Première ligne complète à partir d'un offset: (offset de la ligne, événement) ou (None, None).
+
+    Une ligne sans "\\n" final est en cours d'écriture (les lecteurs ne prennent pas
+    le verrou): elle est ignorée et sera lue au passage suivant.
+    """
+    f.seek(offset)
+    if offset:
+        f.readline()
+    position = f.tell()
+    line = f.readline()
+    if not line.endswith(b"\n"):
+        return None, None
+    return position, json.loads(line)
+
+
+def _line_start(f, position):
+    """Début de la ligne qui contient l'octet précédant position."""
+    while position > 0:
+        f.seek(position - 1)
+        if f.read(1) == b"\n":
+            break
+        position -= 1
+    return position
+
+
+def last_sequence(feed_file=FEED_FILE):
+    """Numéro de séquence du dernier événement complet (0 si le flux est vide)."""
+    feed_file = Path(feed_file)
+    if not feed_file.exists():
+        return 0
+    with open(feed_file, 'rb') as f:
+        # Fin de la dernière ligne complète (une ligne sans "\n" final est en cours d'écriture)
+        end = _line_start(f, f.seek(0, os.SEEK_END))
+        if end == 0:
+            return 0
+        f.seek(_line_start(f, end - 1))
+        return json.loads(f.readline())["seq"]
+
+
+def _drop_partial_line(feed_file):
+    """Supprime une dernière ligne incomplète laissée par un écrivain interrompu (appelé sous le verrou)."""
+    if not feed_file.exists():
+        return
+    with open(feed_file, 'r+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        complete = _line_start(f, end)
+        if complete < end:
+            f.truncate(complete)
+
+
+def publish(events, feed_file=FEED_FILE):
+    """Ajoute des événements au flux avec des numéros de séquence consécutifs; retourne le dernier."""
+    if not events:
+        return None
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    with _feed_lock():
+        feed_file = Path(feed_file)
+        feed_file.parent.mkdir(parents=True, exist_ok=True)
+        _drop_partial_line(feed_file)
+        seq = last_sequence(feed_file)
+        with open(feed_file, 'a', encoding='utf-8') as f:
+            for event in events:
+                seq += 1
+                f.write(json.dumps({"seq": seq, "ts": timestamp, **event}, ensure_ascii=False) + "\n")
+    return seq
+
+
+def read_events(since=0, feed_file=FEED_FILE):
+    """Événements de séquence > since (recherche dichotomique de la position de départ)."""
+    feed_file = Path(feed_file)
+    if not feed_file.exists():
+        return
+    with open(feed_file, 'rb') as f:
+        low, high = 0, feed_file.stat().st_size
+        # Plus petit offset dont la ligne suivante a une séquence > since
+        while low < high:
+            middle = (low + high) // 2
+            position, event = _read_line_at(f, middle)
+            if event is None or event["seq"] > since:
+                high = middle
+            else:
+                low = middle + 1
+        f.seek(low)
+        if low:
+            f.readline()
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Ligne en cours d'écriture par publish(): lue au prochain appel
+                break
+            event = json.loads(line)
+            if event["seq"] > since:
+                yield event
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Flux d'événements de changement (marques, modèles, spécifications)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python change_feed.py --since 1000                # Reprendre après la séquence 1000
+  python change_feed.py --since 1000 --follow       # Suivre les nouveaux événements
+  python change_feed.py --source consolidated --type model_added
+        """
+    )
+    parser.add_argument('--since', type=int, metavar='SEQ', help='Événements après cette séquence')
+    parser.add_argument('--follow', action='store_true', help='Attendre et afficher les nouveaux événements')
+    parser.add_argument('--source', help='Filtrer par source (as24, cargurus, autodata, carfolio, consolidated, technical)')
+    parser.add_argument('--type', help='Filtrer par type d\'événement')
+    parser.add_argument('--stats', action='store_true', help='Nombre d\'événements par source et type')
+    args = parser.parse_args()
+
+    if args.stats:
+        counts = {}
+        for event in read_events():
+            key = (event["source"], event["type"])
+            counts[key] = counts.get(key, 0) + 1
+        for (source, event_type), count in sorted(counts.items()):
+            print(f"   {source:<13} {event_type:<14} {count:>7}")
+        print(f"📊 Dernière séquence: {last_sequence()}")
+        return
+
+    since = args.since if args.since is not None else max(0, last_sequence() - 20)
+    while True:
+        for event in read_events(since):
+            since = event["seq"]
+            if (args.source and event["source"] != args.source) or (args.type and event["type"] != args.type):
+                continue
+            print(json.dumps(event, ensure_ascii=False))
+        if not args.follow:
+            break
+        time.sleep(FOLLOW_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,79 +6,67 @@ Supports incremental addition only - no deletions allowed
 Outputs both JSON (for scripts) and Markdown (for humans)
 """
 
-import json
-import os
+import sqlite3
 import sys
 from datetime import datetime
 from pathlib import Path
 
-def load_data_sources():
-    """Load all available data sources."""
+from change_feed import consolidated_events, publish
+from data_storage import load_json, save_json
+from snapshot_db import latest_document
+from snapshot_manifest import latest_path, record_file
+from tracing import traced
+
+# Source name -> file prefix of its scraped snapshots (latest snapshot is used)
+SOURCE_PREFIXES = [
+    ('AS24', "as24"),
+    ('CarGurus', "cargurus"),
+    ('Auto-Data', "autodata"),
+    ('Carfolio', "carfolio"),
+]
+
+@traced("consolidation.load_data_sources")
+def load_data_sources(in_memory_sources=None):
+    """Load all available data sources.
+
+    in_memory_sources: optional {source_name: (file, data)} of results already in
+    memory, with the snapshot file chosen for them (possibly still being written in
+    the background, or the unchanged snapshot they match); other sources come from
+    the snapshot database (data/snapshots.db), which indexes new JSON snapshots first.
+    """
     data_sources = {}
-    data_dir = Path("data")
-
-    # Load AS24 data if available
-    as24_files = list(data_dir.glob("*as24*scraped_models*.json"))
-    if as24_files:
-        # Get the most recent AS24 file
-        as24_files.sort()
-        latest_as24 = as24_files[-1]
-        with open(latest_as24, 'r', encoding='utf-8') as f:
-            as24_data = json.load(f)
-        data_sources['AS24'] = {
-            'file': str(latest_as24),
-            'data': as24_data,
-            'brands_models': as24_data.get('brands_models', {})
-        }
-        print(f"Loaded AS24 data from: {latest_as24}")
-
-    # Load CarGurus data if available
-    cguru_files = list(data_dir.glob("*cargurus*scraped_models*.json"))
-    if cguru_files:
-        # Get the most recent CarGurus file
-        cguru_files.sort()
-        latest_cguru = cguru_files[-1]
-        with open(latest_cguru, 'r', encoding='utf-8') as f:
-            cguru_data = json.load(f)
-        data_sources['CarGurus'] = {
-            'file': str(latest_cguru),
-            'data': cguru_data,
-            'brands_models': cguru_data.get('brands_models', {})
-        }
-        print(f"Loaded CarGurus data from: {latest_cguru}")
-
-    # Load Auto-Data data if available
-    autodata_files = list(data_dir.glob("*autodata*scraped_models*.json"))
-    if autodata_files:
-        # Get the most recent Auto-Data file
-        autodata_files.sort()
-        latest_autodata = autodata_files[-1]
-        with open(latest_autodata, 'r', encoding='utf-8') as f:
-            autodata_data = json.load(f)
-        data_sources['Auto-Data'] = {
-            'file': str(latest_autodata),
-            'data': autodata_data,
-            'brands_models': autodata_data.get('brands_models', {})
-        }
-        print(f"Loaded Auto-Data data from: {latest_autodata}")
-
-    # Load Carfolio data if available
-    carfolio_files = list(data_dir.glob("*carfolio*scraped_models*.json"))
-    if carfolio_files:
-        # Get the most recent Carfolio file
-        carfolio_files.sort()
-        latest_carfolio = carfolio_files[-1]
-        with open(latest_carfolio, 'r', encoding='utf-8') as f:
-            carfolio_data = json.load(f)
-        data_sources['Carfolio'] = {
-            'file': str(latest_carfolio),
-            'data': carfolio_data,
-            'brands_models': carfolio_data.get('brands_models', {})
+    in_memory_sources = in_memory_sources or {}
+
+    for source_name, prefix in SOURCE_PREFIXES:
+        if source_name in in_memory_sources:
+            source_file, source_data = in_memory_sources[source_name]
+            print(f"Using in-memory {source_name} data ({source_file})")
+        else:
+            try:
+                source_file, source_data = latest_document(prefix)
+            except sqlite3.Error as e:
+                print(f"Snapshot database unavailable ({e}), reading {prefix} JSON files")
+                source_file, source_data = latest_snapshot_file(prefix)
+            if source_data is None:
+                continue
+            print(f"Loaded {source_name} data from: {source_file}")
+
+        data_sources[source_name] = {
+            'file': str(source_file),
+            'data': source_data,
+            'brands_models': source_data.get('brands_models', {})
         }
-        print(f"Loaded Carfolio data from: {latest_carfolio}")
 
     return data_sources
 
+def latest_snapshot_file(prefix):
+    """Latest JSON snapshot of a source read directly from disk: (file, data) or (None, None)."""
+    source_file = latest_path(prefix, "scraped_models")
+    if source_file is None:
+        return None, None
+    return str(source_file), load_json(source_file)
+
+@traced("consolidation.consolidate_brands_models")
 def consolidate_brands_models(data_sources):
     """Consolidate brands and models with additive approach only."""
     consolidated = {}
@@ -160,6 +148,14 @@ def consolidate_brands_models(data_sources):
     
     return consolidated, stats
 
+def load_previous_consolidation(output_file):
+    """Consolidated brands of the previous run ({} if there is none)."""
+    try:
+        return load_json(output_file).get('consolidated_brands_models', {})
+    except (OSError, ValueError):
+        return {}
+
+@traced("consolidation.save_json_output")
 def save_json_output(consolidated_data, stats, data_sources):
     """Save consolidated data to JSON format."""
     output_data = {
@@ -175,12 +171,19 @@ def save_json_output(consolidated_data, stats, data_sources):
     }
     
     output_file = Path("data/consolidated_brands_models.json")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    previous = load_previous_consolidation(output_file)
+    save_json(output_file, output_data)
+    record_file("consolidated", "brands_models", output_file, output_data)
+    
+    # Publish what changed since the previous consolidation to the change feed
+    last_seq = publish(consolidated_events(previous, consolidated_data))
+    if last_seq:
+        print(f"Change feed updated (last sequence: {last_seq})")
     
     print(f"JSON output saved: {output_file}")
     return str(output_file)
 
+@traced("consolidation.generate_markdown_output")
 def generate_markdown_output(consolidated_data, stats, data_sources):
     """Generate readable Markdown output."""
     md_content = f"""# Consolidated Automotive Brands & Models (4 Sources)
@@ -304,18 +307,13 @@ def generate_markdown_output(consolidated_data, stats, data_sources):
     print(f"MD - Markdown output saved: {output_file}")
     return str(output_file)
 
-def main():
-    """Main consolidation process."""
-    print("Starting Brand/Model Consolidation...")
-    print("Method: Additive only (no deletions)")
-    print()
-    
+def run(in_memory_sources=None):
+    """Load, consolidate and save; returns the output files and statistics (None without data)."""
     # Load all data sources
-    data_sources = load_data_sources()
+    data_sources = load_data_sources(in_memory_sources)
     
     if not data_sources:
-        print("ERROR: No data sources found! Please run AS24, CarGurus, or Auto-Data scrapers first.")
-        sys.exit(1)
+        return None
     
     print(f"Found {len(data_sources)} data sources")
     print()
@@ -327,6 +325,24 @@ def main():
     json_file = save_json_output(consolidated_data, stats, data_sources)
     md_file = generate_markdown_output(consolidated_data, stats, data_sources)
     
+    return {'json_file': json_file, 'md_file': md_file, 'statistics': stats}
+
+def main():
+    """Main consolidation process."""
+    print("Starting Brand/Model Consolidation...")
+    print("Method: Additive only (no deletions)")
+    print()
+    
+    result = run()
+    
+    if not result:
+        print("ERROR: No data sources found! Please run AS24, CarGurus, or Auto-Data scrapers first.")
+        sys.exit(1)
+    
+    stats = result['statistics']
+    json_file = result['json_file']
+    md_file = result['md_file']
+    
     # Final summary
     print()
     print("CONSOLIDATION COMPLETE!")
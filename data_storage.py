@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Data Storage - Écriture compressée transparente des fichiers JSON de données
+Les snapshots, la consolidation et les exports techniques passent par
+save_json() / load_json(). La compression est choisie par la variable
+d'environnement ALLCARS_COMPRESSION:
+
+    none   (défaut) JSON en clair
+    gzip   gzip (bibliothèque standard)
+    zstd   Zstandard si le module zstandard est installé, gzip sinon
+
+Le nom des fichiers ne change pas (motifs, manifeste, rétention et cache de
+build restent valables): load_json() reconnaît le format à la signature des
+premiers octets, un fichier en clair ou compressé se lit de la même façon.
+Les fichiers Markdown restent en clair (lecture humaine).
+
+Le JSON est produit par serializer (orjson si installé), compact par défaut;
+save_json(..., pretty=True) pour les fichiers destinés à être lus à la main.
+
+Usage:
+    python data_storage.py bench                     # Sérialisation et compression sur les plus gros fichiers
+    python data_storage.py bench data/autonomous_technical_specs_*.json
+    python data_storage.py cat data/as24_scraped_models_20251113_080000.json   # JSON en clair
+    python data_storage.py cat --pretty data/autonomous_technical_specs_20251113_080000.json
+    ALLCARS_COMPRESSION=zstd python autoscout24_scraper.py
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import serializer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_ENV = "ALLCARS_COMPRESSION"
+CODECS = ['none', 'gzip', 'zstd']
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_warned = set()
+
+# Lecteurs de secours d'un fichier absent: reader(path) -> octets, FileNotFoundError s'il ne le connaît pas
+# (snapshot_retention.py y enregistre la lecture des fichiers archivés dans data/archive/)
+_missing_file_readers = []
+
+
+def configured_compression():
+    """Compression demandée par ALLCARS_COMPRESSION (zstd sans le module -> gzip)."""
+    codec = os.environ.get(COMPRESSION_ENV, 'none').strip().lower() or 'none'
+    if codec not in CODECS:
+        raise ValueError(f"{COMPRESSION_ENV}={codec}: valeurs possibles {', '.join(CODECS)}")
+    if codec == 'zstd' and zstandard is None:
+        if codec not in _warned:
+            print("⚠️ Module zstandard absent (pip install zstandard): compression gzip utilisée")
+            _warned.add(codec)
+        return 'gzip'
+    return codec
+
+
+def detect(head):
+    """Format d'un fichier d'après ses premiers octets."""
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return 'none'
+
+
+def decode(raw):
+    """Contenu en clair d'octets éventuellement compressés (membre d'archive, etc.)."""
+    codec = detect(raw[:4])
+    if codec == 'gzip':
+        return gzip.decompress(raw)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise OSError("Fichier compressé en zstd: module zstandard requis")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return raw
+
+
+def register_missing_file_reader(reader):
+    """Déclare un lecteur appelé par load_json() quand un fichier n'existe pas (archives, etc.)."""
+    if reader not in _missing_file_readers:
+        _missing_file_readers.append(reader)
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        for reader in _missing_file_readers:
+            try:
+                return reader(path)
+            except FileNotFoundError:
+                continue
+        raise
+
+
+def load_json(path):
+    """Document JSON d'un fichier en clair, gzip ou zstd (lecteurs de secours si le fichier est absent)."""
+    return serializer.loads(decode(_read(path)))
+
+
+def _writer(f, codec):
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=f, mode='wb', compresslevel=GZIP_LEVEL, mtime=0)
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(f, closefd=False)
+    return f
+
+
+def save_json(path, data, pretty=False, compression=None):
+    """Écrit un document JSON (fichier temporaire puis remplacement) avec la compression configurée.
+
+    pretty=False (défaut) écrit du JSON compact pour les fichiers lus par programme.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    codec = compression or configured_compression()
+    payload = serializer.dumps(data, pretty)
+    tmp_file = path.with_name(path.name + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        out = _writer(f, codec)
+        out.write(payload)
+        if out is not f:
+            out.close()
+    tmp_file.replace(path)
+    return str(path)
+
+
+def _default_bench_files(data_dir="data"):
+    """Plus gros fichier de chaque type enregistré dans le manifeste."""
+    from snapshot_manifest import load_manifest
+    largest = {}
+    for entry in load_manifest(data_dir)["files"].values():
+        key = (entry["source"], entry["kind"])
+        if Path(entry["path"]).exists() and entry["size"] > largest.get(key, {}).get("size", -1):
+            largest[key] = entry
+    return [Path(entry["path"]) for entry in sorted(largest.values(), key=lambda e: -e["size"])]
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def bench_serialization(files):
+    """Taille et temps de sérialisation par backend et par mode (en mémoire, sans compression)."""
+    print(f"{'Fichier':<48} | {'backend':<7} | {'mode':<7} | {'taille':>9} | {'dumps':>7} | {'loads':>7}")
+    print("-" * 100)
+    for file in files:
+        document = load_json(file)
+        for backend in serializer.BACKENDS:
+            for pretty in (True, False):
+                payload, dump_time = _timed(serializer.dumps, document, pretty, backend)
+                _, load_time = _timed(serializer.loads, payload, backend)
+                print(f"{Path(file).name[:48]:<48} | {backend:<7} | {'pretty' if pretty else 'compact':<7} | "
+                      f"{len(payload) / (1024 * 1024):>7.2f}MB | {dump_time:>6.2f}s | {load_time:>6.2f}s")
+
+
+def bench(files):
+    """Taille, temps d'écriture et de lecture par compression (JSON compact), comparés au JSON en clair."""
+    codecs = [codec for codec in CODECS if codec != 'zstd' or zstandard is not None]
+    if zstandard is None:
+        print("ℹ️ zstandard non installé: zstd non mesuré")
+    print(f"{'Fichier':<48} | {'format':<5} | {'taille':>9} | {'ratio':>6} | {'écriture':>9} | {'lecture':>8}")
+    print("-" * 100)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file in files:
+            document = load_json(file)
+            plain_size = None
+            for codec in codecs:
+                target = Path(tmp_dir) / f"{codec}_{Path(file).name}"
+                _, write_time = _timed(save_json, target, document, False, codec)
+                _, read_time = _timed(load_json, target)
+                size = target.stat().st_size
+                plain_size = plain_size or size
+                print(f"{Path(file).name[:48]:<48} | {codec:<5} | {size / (1024 * 1024):>7.2f}MB | "
+                      f"{plain_size / size:>5.1f}x | {write_time:>8.2f}s | {read_time:>7.2f}s")
+                target.unlink()
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Stockage JSON compressé transparent (gzip / zstd) et sérialisation compacte",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python data_storage.py bench                              # Plus gros fichier de chaque type
+  python data_storage.py cat data/consolidated_brands_models.json | jq '.brands_list | length'
+  python data_storage.py cat --pretty data/as24_scraped_models_20251113_080000.json | less
+  ALLCARS_JSON_BACKEND=json python data_storage.py bench    # Forcer la bibliothèque standard
+  ALLCARS_COMPRESSION=gzip python update_all.py             # Écrire les sorties compressées
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench_parser = subparsers.add_parser('bench', help='Comparer backends JSON, pretty / compact, en clair / gzip / zstd')
+    bench_parser.add_argument('files', nargs='*')
+    cat_parser = subparsers.add_parser('cat', help='Afficher un fichier JSON en clair')
+    cat_parser.add_argument('file')
+    cat_parser.add_argument('--pretty', action='store_true', help='Réindenter un fichier compact')
+    args = parser.parse_args()
+
+    if args.command == 'cat':
+        if args.pretty:
+            sys.stdout.buffer.write(serializer.dumps(load_json(args.file), pretty=True) + b"\n")
+        else:
+            with open(args.file, 'rb') as f:
+                sys.stdout.buffer.write(decode(f.read()))
+        return
+
+    files = [Path(f) for f in args.files] or _default_bench_files()
+    if not files:
+        print("📭 Aucun fichier à mesurer (python snapshot_manifest.py --rebuild)")
+        return
+    print(f"🧮 Backend JSON: {serializer.backend_name()} (disponibles: {', '.join(serializer.BACKENDS)})")
+    bench_serialization(files)
+    print()
+    bench(files)
+
+
+if __name__ == "__main__":
+    main()
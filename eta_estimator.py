@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+ETA Estimator - Estimation du temps restant des scrapers et du pipeline
+Combine les durées historiques par marque (brand_timings des snapshots) et les
+événements de progression en direct (plan, brand_done) pour estimer le temps
+restant de chaque source avec une bande de confiance à 90%, puis celui du
+pipeline complet (chemin critique du DAG).
+
+En fin d'exécution, l'estimation initiale et la durée réelle de chaque étape
+sont ajoutées à data/.eta_accuracy.jsonl: le biais médian observé corrige les
+estimations suivantes.
+
+Usage:
+    python eta_estimator.py            # Précision des estimations passées par étape
+"""
+
+import argparse
+import json
+import math
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from brand_timings import expected_durations, load_timing_history
+from brand_scheduler import DEFAULT_BRAND_DURATION
+from inprocess_runner import SOURCES
+from pipeline_dag import PIPELINE_STAGES
+
+ACCURACY_LOG = Path("data/.eta_accuracy.jsonl")
+
+# Nombre d'exécutions passées utilisées pour le biais et la durée de référence
+HISTORY_RUNS = 10
+# Poids (en marques) de l'estimation historique face aux marques déjà mesurées
+PRIOR_WEIGHT = 5
+# Écart relatif supposé sans historique
+DEFAULT_SPREAD = 0.5
+# Quantile de la bande de confiance (90%)
+Z_90 = 1.645
+
+
+def format_duration(seconds):
+    """Durée lisible: 45s, 12m30s, 1h05m."""
+    seconds = int(round(max(0, seconds)))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m{seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+def format_estimate(estimate):
+    """Estimation (eta, bas, haut) lisible."""
+    eta, low, high = estimate
+    return f"ETA {format_duration(eta)} ({format_duration(low)}-{format_duration(high)})"
+
+
+def load_accuracy_log(log_file=ACCURACY_LOG):
+    """Historique des estimations: {étape: [entrée, ...]} du plus ancien au plus récent."""
+    history = {}
+    try:
+        with open(log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                history.setdefault(entry.get('stage'), []).append(entry)
+    except OSError:
+        pass
+    return history
+
+
+def _log_spread(ratios):
+    """Écart relatif (écart-type des log-ratios) d'une série réel/prévu."""
+    logs = [math.log(r) for r in ratios if r and r > 0]
+    return statistics.stdev(logs) if len(logs) >= 2 else None
+
+
+def brand_spread(source_prefix, data_dir="data"):
+    """Variabilité relative médiane d'une marque d'un snapshot à l'autre."""
+    spreads = []
+    for samples in load_timing_history(source_prefix, data_dir).values():
+        durations = [d for _, d in samples if d]
+        if len(durations) >= 2:
+            spreads.append(statistics.stdev(durations) / statistics.mean(durations))
+    return statistics.median(spreads) if spreads else None
+
+
+class SourceETA:
+    """Estimation du temps restant d'une étape (par marque pour les scrapers)."""
+
+    def __init__(self, name, prior_duration, expected=None, bias=1.0, spread=DEFAULT_SPREAD,
+                 brand_spread=None):
+        self.name = name
+        self.prior_duration = prior_duration
+        self.expected = expected or {}
+        self.bias = bias
+        self.spread = spread
+        self.brand_spread = brand_spread or spread
+        self.default_brand = statistics.median(self.expected.values()) if self.expected else DEFAULT_BRAND_DURATION
+        self.brands = None
+        self.workers = 1
+        self.done = {}
+        self.started_at = None
+        self.finished_at = None
+        self.success = None
+        self.cached = False
+        self.predicted = None
+        self.predicted_raw = None
+
+    def start(self):
+        """L'étape démarre: estimation initiale à partir de la durée de référence."""
+        self.started_at = time.time()
+        self.predicted = self.prior_duration
+
+    def plan(self, brands, workers=1):
+        """Liste des marques annoncée par le scraper: estimation initiale par marque."""
+        self.brands = list(brands)
+        self.workers = max(1, workers or 1)
+        self.predicted_raw = sum(self._brand_expected(b) for b in self.brands) / self.workers
+        self.predicted = self.elapsed() + self.bias * self.predicted_raw
+
+    def brand_done(self, brand, duration):
+        """Durée mesurée d'une marque."""
+        if duration is not None:
+            self.done[brand] = duration
+
+    def finish(self, success, cached=False):
+        """L'étape est terminée."""
+        self.finished_at = time.time()
+        self.success = success
+        self.cached = cached
+
+    def elapsed(self):
+        """Temps écoulé depuis le démarrage."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def _brand_expected(self, brand):
+        return self.expected.get(brand, self.default_brand)
+
+    def ratio(self):
+        """Facteur réel/historique: biais passé, corrigé par les marques déjà mesurées."""
+        if not self.done:
+            return self.bias
+        observed = sum(self.done.values())
+        predicted = sum(self._brand_expected(b) for b in self.done)
+        weight = len(self.done) / (len(self.done) + PRIOR_WEIGHT)
+        return (1 - weight) * self.bias + weight * (observed / predicted if predicted else self.bias)
+
+    def _residual_spread(self):
+        """Variabilité relative par marque: mesurée en direct dès 3 marques, historique sinon."""
+        if len(self.done) >= 3:
+            spread = _log_spread([d / self._brand_expected(b) for b, d in self.done.items()])
+            if spread is not None:
+                return spread
+        return self.brand_spread
+
+    def remaining(self):
+        """Temps restant estimé (eta, borne basse, borne haute) en secondes."""
+        if self.finished_at is not None:
+            return (0.0, 0.0, 0.0)
+
+        if self.brands is None:
+            # Pas encore de liste de marques (ou étape sans événements): durée de référence
+            total = self.prior_duration
+            eta = max(0.0, total - self.elapsed())
+            margin = Z_90 * self.spread * total
+            return (eta, max(0.0, eta - margin), eta + margin)
+
+        remaining = [self._brand_expected(b) for b in self.brands if b not in self.done]
+        ratio = self.ratio()
+        eta = ratio * sum(remaining) / self.workers
+        # Erreurs propres à chaque marque + incertitude sur le facteur global
+        brand_sd = ratio * self._residual_spread() * math.sqrt(sum(e * e for e in remaining)) / self.workers
+        ratio_sd = eta * self.spread / math.sqrt(len(self.done) + PRIOR_WEIGHT)
+        margin = Z_90 * math.hypot(brand_sd, ratio_sd)
+        return (eta, max(0.0, eta - margin), eta + margin)
+
+
+class ETAEstimator:
+    """Estimations par étape et pour le pipeline, alimentées par les événements de progression."""
+
+    def __init__(self, stage_names=None, data_dir="data", log_file=ACCURACY_LOG, priors=None):
+        self.log_file = Path(log_file)
+        self.specs = [spec for spec in PIPELINE_STAGES if stage_names is None or spec['name'] in stage_names]
+        self._lock = threading.Lock()
+        history = load_accuracy_log(self.log_file)
+        self.sources = {
+            spec['name']: self._source_eta(spec, history.get(spec['name'], [])[-HISTORY_RUNS:],
+                                           data_dir, (priors or {}).get(spec['name']))
+            for spec in self.specs
+        }
+
+    @staticmethod
+    def _source_eta(spec, runs, data_dir, prior=None):
+        """Estimateur d'une étape à partir de ses exécutions passées et des timings par marque."""
+        actuals = [run['actual'] for run in runs]
+        prior_duration = statistics.median(actuals) if actuals else (prior or spec['expected_duration'])
+
+        ratios = [run['actual'] / run['predicted_raw'] for run in runs if run.get('predicted_raw')]
+        bias = statistics.median(ratios) if ratios else 1.0
+        spread = _log_spread(ratios) or _log_spread([a / prior_duration for a in actuals]) or DEFAULT_SPREAD
+
+        expected, per_brand = {}, None
+        if spec['name'] in SOURCES:
+            prefix = SOURCES[spec['name']]['prefix']
+            expected = expected_durations(prefix, data_dir)
+            per_brand = brand_spread(prefix, data_dir)
+        return SourceETA(spec['name'], prior_duration, expected, bias, spread, per_brand)
+
+    def start(self, name):
+        """Une étape démarre."""
+        with self._lock:
+            if name in self.sources:
+                self.sources[name].start()
+
+    def finish(self, name, success, cached=False):
+        """Une étape est terminée."""
+        with self._lock:
+            if name in self.sources:
+                self.sources[name].finish(success, cached)
+
+    def handle(self, event):
+        """Met à jour l'estimation d'une source à partir d'un événement de progression."""
+        with self._lock:
+            source = self.sources.get(event.get('source'))
+            if source is None:
+                return
+            if source.started_at is None:
+                source.start()
+            if event.get('event') == 'plan':
+                source.plan(event.get('brands', []), event.get('workers', 1))
+            elif event.get('event') == 'brand_done':
+                source.brand_done(event.get('brand'), event.get('duration'))
+
+    def track(self, run_stage):
+        """Enveloppe un exécuteur d'étape pour chronométrer chaque étape."""
+        def tracked_run_stage(spec):
+            self.start(spec['name'])
+            result = run_stage(spec)
+            self.finish(spec['name'], bool(result and result.get('success')),
+                        bool(result and result.get('cached')))
+            return result
+        return tracked_run_stage
+
+    def estimate(self, name):
+        """Temps restant (eta, bas, haut) d'une étape."""
+        with self._lock:
+            source = self.sources.get(name)
+            return source.remaining() if source else None
+
+    def pipeline_estimate(self):
+        """Temps restant du pipeline: chemin critique des étapes (dépendances du DAG)."""
+        with self._lock:
+            finish = {}
+            for spec in self.specs:
+                remaining = self.sources[spec['name']].remaining()
+                deps = [finish[dep] for dep in spec['deps'] if dep in finish]
+                finish[spec['name']] = tuple(
+                    max([dep[i] for dep in deps], default=0.0) + remaining[i] for i in range(3)
+                )
+            return tuple(max((f[i] for f in finish.values()), default=0.0) for i in range(3))
+
+    def describe(self, name=None):
+        """Estimation lisible d'une étape, ou du pipeline si name est None."""
+        if name is None:
+            return format_estimate(self.pipeline_estimate())
+        estimate = self.estimate(name)
+        return format_estimate(estimate) if estimate else ""
+
+    def log_accuracy(self):
+        """Ajoute estimation initiale / durée réelle de chaque étape exécutée au journal; retourne les lignes de bilan."""
+        records, lines = [], []
+        run_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            for name, source in self.sources.items():
+                if not source.success or source.cached or source.predicted is None:
+                    continue
+                actual = source.elapsed()
+                error = (source.predicted - actual) / actual * 100 if actual else 0.0
+                records.append({
+                    'stage': name,
+                    'run_at': run_at,
+                    'predicted': round(source.predicted, 1),
+                    'predicted_raw': round(source.predicted_raw, 1) if source.predicted_raw else None,
+                    'actual': round(actual, 1),
+                    'error_pct': round(error, 1),
+                    'brands': len(source.brands) if source.brands is not None else None
+                })
+                lines.append(f"⏱️ {name:<15} estimé {format_duration(source.predicted):>7} | "
+                             f"réel {format_duration(actual):>7} | écart {error:+.0f}%")
+
+        if records:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return lines
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(description="Précision des estimations de durée par étape")
+    parser.add_argument('--runs', type=int, default=HISTORY_RUNS, help="Nombre d'exécutions analysées")
+    args = parser.parse_args()
+
+    history = load_accuracy_log()
+    if not history:
+        print("❌ Aucune estimation enregistrée (data/.eta_accuracy.jsonl)")
+        return
+
+    print(f"🎯 Précision des estimations ({args.runs} dernières exécutions)")
+    for spec in PIPELINE_STAGES:
+        runs = history.get(spec['name'], [])[-args.runs:]
+        if not runs:
+            continue
+        errors = [abs(run['error_pct']) for run in runs]
+        print(f"{spec['emoji']} {spec['name']:<15} {len(runs):>3} exécutions | "
+              f"écart médian {statistics.median(errors):.0f}% | "
+              f"dernier {runs[-1]['error_pct']:+.0f}% | "
+              f"durée médiane {format_duration(statistics.median(run['actual'] for run in runs))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Generator - Scale Testing
+Génère des jeux de données synthétiques réalistes pour tester la consolidation,
+l'analyse technique et les générateurs de specs à 10× / 100× la taille réelle.
+
+Fichiers produits (dans <output>/data/, directement utilisables comme entrées de benchmark):
+    - {as24,cargurus,autodata,carfolio}_scraped_models_YYYYMMDD_HHMMSS.json
+    - consolidated_brands_models.json
+    - autonomous_technical_specs_YYYYMMDD_HHMMSS.json
+
+Usage:
+    python generate_synthetic_data.py                       # Taille réelle (~1.7k marques)
+    python generate_synthetic_data.py --scale 10            # 10× la taille réelle
+    python generate_synthetic_data.py --scale 100 --seed 7  # 100×, reproductible
+    python generate_synthetic_data.py --overlap 0.3 --collision-rate 0.05
+    python generate_synthetic_data.py --snapshots 5 --churn 0.02   # Historique de 5 versions
+
+Pour lancer un benchmark sur les fichiers générés:
+    cd synthetic_output && python ../consolidate_brands_models.py
+"""
+
+import argparse
+import json
+import math
+import random
+import string
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import consolidate_brands_models
+
+# Profils des sources calqués sur les données réelles (13/11/2025)
+SOURCE_PROFILES = {
+    'AS24': {
+        'prefix': 'as24',
+        'brands': 279,
+        'mean_models': 16.0,
+        'scraper_version': 'v3.3_autonomous_with_history_and_markdown',
+        'source': 'AutoScout24.fr Auto Scraping',
+        'method': 'selenium_dynamic_dropdown_interaction',
+    },
+    'CarGurus': {
+        'prefix': 'cargurus',
+        'brands': 107,
+        'mean_models': 7.7,
+        'scraper_version': 'v1.0_cargurus_us_market',
+        'source': 'CarGurus.com Auto Scraping',
+        'method': 'selenium_dropdown_interaction',
+    },
+    'Auto-Data': {
+        'prefix': 'autodata',
+        'brands': 63,
+        'mean_models': 12.0,
+        'scraper_version': 'autodata_scraper_v1.1',
+        'source': 'Auto-Data.net',
+        'method': 'link_extraction_from_brand_pages',
+    },
+    'Carfolio': {
+        'prefix': 'carfolio',
+        'brands': 1953,
+        'mean_models': 1.1,
+        'scraper_version': 'carfolio_scraper_v1.0',
+        'source': 'Carfolio.com',
+        'method': 'link_extraction_from_brand_pages',
+    },
+}
+
+# Noms de modèles fréquents partagés entre marques (collisions de noms)
+COMMON_MODEL_NAMES = [
+    'GT', 'Sport', 'Coupe', 'Cabrio', 'Touring', 'Wagon', 'Sedan', 'Van',
+    'Roadster', 'Spider', 'Turbo', 'Classic', 'Electric', 'Hybrid', 'Pickup',
+    'Model 3', 'Model S', 'Series 1', 'Series 3', 'One', 'Two', 'City',
+]
+
+SPEC_TEMPLATES = [
+    {
+        "basic": {"fuel_type": "essence", "doors": "4", "seats": "5"},
+        "performance": {"power_hp": "150", "torque": "250", "acceleration": "9.0"},
+        "dimensions": {"length": "4600mm", "width": "1800mm", "height": "1450mm", "weight": "1400kg"},
+        "engine": {"displacement": "1.6L", "cylinders": "4", "valves": "16"},
+        "transmission": {"gearbox": "manual", "drive": "front", "gears": "6"}
+    },
+    {
+        "basic": {"fuel_type": "diesel", "doors": "4", "seats": "5"},
+        "performance": {"power_hp": "180", "torque": "380", "acceleration": "8.5"},
+        "dimensions": {"length": "4700mm", "width": "1900mm", "height": "1700mm", "weight": "1800kg"},
+        "engine": {"displacement": "2.0L", "cylinders": "4", "valves": "16"},
+        "transmission": {"gearbox": "automatic", "drive": "all", "gears": "8"}
+    },
+    {
+        "basic": {"fuel_type": "essence", "doors": "2", "seats": "4"},
+        "performance": {"power_hp": "300", "torque": "450", "acceleration": "5.0"},
+        "dimensions": {"length": "4400mm", "width": "1850mm", "height": "1300mm", "weight": "1300kg"},
+        "engine": {"displacement": "3.0L", "cylinders": "6", "valves": "24"},
+        "transmission": {"gearbox": "automatic", "drive": "rear", "gears": "7"}
+    },
+    {
+        "basic": {"fuel_type": "electrique", "doors": "4", "seats": "5"},
+        "performance": {"power_hp": "283", "torque": "420", "acceleration": "6.1"},
+        "dimensions": {"length": "4690mm", "width": "1890mm", "height": "1550mm", "weight": "1850kg"},
+        "engine": {"displacement": "N/A", "cylinders": "0", "valves": "0"},
+        "transmission": {"gearbox": "automatic", "drive": "rear", "gears": "1"}
+    },
+]
+
+VEHICLE_TYPES = ["berline", "suv", "sport", "utilitaire"]
+
+
+class SyntheticDatasetGenerator:
+    """Générateur de jeux de données synthétiques réalistes et reproductibles."""
+
+    def __init__(self, scale=1.0, seed=42, overlap=0.25, model_overlap=0.6,
+                 collision_rate=0.03, model_sigma=1.0, max_models_per_brand=5):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.overlap = overlap
+        self.model_overlap = model_overlap
+        self.collision_rate = collision_rate
+        self.model_sigma = model_sigma
+        self.max_models_per_brand = max_models_per_brand
+        self._used_names = set()
+
+    def random_name(self, min_len=4, max_len=10):
+        """Génère un nom pseudo-réaliste (alternance consonnes/voyelles)."""
+        consonants = "bcdfghjklmnprstvz"
+        vowels = "aeiou"
+        length = self.rng.randint(min_len, max_len)
+        letters = [
+            self.rng.choice(consonants if i % 2 == 0 else vowels)
+            for i in range(length)
+        ]
+        return ''.join(letters).capitalize()
+
+    def unique_brand_name(self):
+        """Génère un nom de marque unique dans tout le jeu de données."""
+        while True:
+            name = self.random_name()
+            if self.rng.random() < 0.15:
+                name += f" {self.random_name(3, 6)}"
+            if name not in self._used_names:
+                self._used_names.add(name)
+                return name
+
+    def model_count(self, mean_models):
+        """Tire un nombre de modèles selon une loi log-normale (longue traîne)."""
+        if mean_models <= 1.2:
+            return 1 if self.rng.random() < 0.9 else self.rng.randint(2, 4)
+        mu = math.log(mean_models) - self.model_sigma ** 2 / 2
+        return max(1, min(500, int(round(self.rng.lognormvariate(mu, self.model_sigma)))))
+
+    def model_name(self):
+        """Génère un nom de modèle, éventuellement en collision avec un nom courant."""
+        roll = self.rng.random()
+        if roll < self.collision_rate:
+            name = self.rng.choice(COMMON_MODEL_NAMES)
+            # Variante cosmétique (espaces) que la consolidation doit normaliser
+            return f" {name} " if self.rng.random() < 0.5 else name
+        if roll < 0.4:
+            return f"{self.rng.choice(string.ascii_uppercase)}{self.rng.randint(1, 9)}{self.rng.choice(['', '0', '00'])}"
+        return self.random_name(3, 8)
+
+    def generate_brand_universe(self):
+        """Construit les marques de chaque source avec un taux de recouvrement configurable."""
+        source_brands = {}
+        shared_pool = []
+
+        # Les sources sont triées par taille décroissante pour que les petites
+        # sources puisent dans le pool partagé des grandes.
+        ordered = sorted(SOURCE_PROFILES.items(), key=lambda x: x[1]['brands'], reverse=True)
+        for source_name, profile in ordered:
+            target = max(1, int(round(profile['brands'] * self.scale)))
+            brands = []
+            for _ in range(target):
+                if shared_pool and self.rng.random() < self.overlap:
+                    candidate = self.rng.choice(shared_pool)
+                    if candidate not in brands:
+                        brands.append(candidate)
+                        continue
+                brand = self.unique_brand_name()
+                brands.append(brand)
+                shared_pool.append(brand)
+            source_brands[source_name] = brands
+
+        return source_brands
+
+    def generate_brands_models(self, source_brands):
+        """Génère les modèles par marque et par source avec recouvrement inter-sources."""
+        brand_vocab = {}
+        data = {}
+
+        for source_name, brands in source_brands.items():
+            profile = SOURCE_PROFILES[source_name]
+            brands_models = {}
+            for brand in brands:
+                vocab = brand_vocab.setdefault(brand, [])
+                count = self.model_count(profile['mean_models'])
+                models = []
+                for _ in range(count):
+                    if vocab and self.rng.random() < self.model_overlap:
+                        models.append(self.rng.choice(vocab))
+                    else:
+                        name = self.model_name()
+                        vocab.append(name)
+                        models.append(name)
+                # Les scrapers réels dédupliquent rarement: conserver l'ordre brut
+                brands_models[brand] = list(dict.fromkeys(models))
+            data[source_name] = brands_models
+
+        return data
+
+    def apply_churn(self, brands_models, churn):
+        """Ajoute/retire une fraction de modèles pour simuler une nouvelle version."""
+        evolved = {}
+        for brand, models in brands_models.items():
+            models = list(models)
+            if models and self.rng.random() < churn:
+                models.pop(self.rng.randrange(len(models)))
+            if self.rng.random() < churn:
+                models.append(self.model_name().strip())
+            evolved[brand] = list(dict.fromkeys(models))
+        if self.rng.random() < churn * 10:
+            evolved[self.unique_brand_name()] = [self.model_name().strip()]
+        return evolved
+
+    def build_scrape_document(self, source_name, brands_models, scraped_at):
+        """Construit un document *_scraped_models_*.json au format du scraper réel."""
+        profile = SOURCE_PROFILES[source_name]
+        metadata = {
+            "scraped_at": scraped_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "scraper_version": profile['scraper_version'],
+            "source": profile['source'],
+            "method": profile['method'],
+            "total_brands": len(brands_models),
+            "total_models": sum(len(models) for models in brands_models.values()),
+            "brands_with_models": len([b for b, models in brands_models.items() if models]),
+            "brands_without_models": len([b for b, models in brands_models.items() if not models]),
+            "synthetic": True
+        }
+        if profile['prefix'] in ('autodata', 'carfolio'):
+            metadata["file_prefix"] = f"{profile['prefix']}_"
+            metadata["integration_ready"] = True
+        document = {"metadata": metadata, "brands_models": brands_models}
+        if profile['prefix'] == 'carfolio':
+            document["duplicates_log"] = []
+        return document
+
+    def build_technical_document(self, consolidated, scraped_at):
+        """Construit un fichier autonomous_technical_specs_*.json réaliste."""
+        timestamp = scraped_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+        brands_technical_data = {}
+
+        for brand_name, brand_info in consolidated.items():
+            models = brand_info['models'][:self.max_models_per_brand]
+            brand_entry = {
+                "brand": brand_name,
+                "total_models": len(brand_info['models']),
+                "scraped_models": 0,
+                "models": {},
+                "scraped_at": timestamp
+            }
+            for model_name in models:
+                original_data = {"basic": {"fuel_type": "unknown"}}
+                specs = json.loads(json.dumps(self.rng.choice(SPEC_TEMPLATES)))
+                specs["_metadata"] = {
+                    "brand": brand_name,
+                    "model": model_name,
+                    "generated_at": timestamp,
+                    "method": "generic_classification",
+                    "vehicle_type": self.rng.choice(VEHICLE_TYPES),
+                    "confidence": "low"
+                }
+                enriched = dict(original_data)
+                enriched["technical_specs"] = specs
+                enriched["derived_calculations"] = {
+                    "power_to_weight_ratio": "107.14 hp/tonne",
+                    "estimated_top_speed": 180,
+                    "fuel_efficiency_category": "C (Essence)"
+                }
+                brand_entry["models"][model_name] = {
+                    "original_data": original_data,
+                    "technical_specifications": specs,
+                    "enriched_data": enriched,
+                    "scraping_success": True
+                }
+                brand_entry["scraped_models"] += 1
+            brands_technical_data[brand_name] = brand_entry
+
+        return {
+            "metadata": {
+                "scraped_at": timestamp,
+                "scraper_version": "v1.0_autonomous",
+                "source": "Internal technical database",
+                "method": "brand_model_specifications",
+                "total_brands": len(consolidated),
+                "max_models_per_brand": self.max_models_per_brand,
+                "synthetic": True
+            },
+            "brands_technical_data": brands_technical_data
+        }
+
+    def generate(self, output_dir, snapshots=1, churn=0.02):
+        """Génère l'ensemble des fichiers et retourne un résumé."""
+        data_dir = Path(output_dir) / "data"
+        data_dir.mkdir(parents=True, exist_ok=True)
+
+        start = time.time()
+        source_brands = self.generate_brand_universe()
+        current = self.generate_brands_models(source_brands)
+
+        base_time = datetime.now(timezone.utc) - timedelta(days=7 * (snapshots - 1))
+        written = []
+        data_sources = {}
+
+        for snapshot_index in range(snapshots):
+            scraped_at = base_time + timedelta(days=7 * snapshot_index)
+            if snapshot_index > 0:
+                current = {name: self.apply_churn(bm, churn) for name, bm in current.items()}
+
+            for source_name, brands_models in current.items():
+                prefix = SOURCE_PROFILES[source_name]['prefix']
+                stamp = scraped_at.strftime("%Y%m%d_%H%M%S")
+                output_file = data_dir / f"{prefix}_scraped_models_{stamp}.json"
+                document = self.build_scrape_document(source_name, brands_models, scraped_at)
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    json.dump(document, f, indent=2, ensure_ascii=False)
+                written.append(output_file)
+                data_sources[source_name] = {
+                    'file': str(output_file),
+                    'data': document,
+                    'brands_models': brands_models
+                }
+
+        # Consolidation au format réel à partir de la dernière version
+        consolidated, stats = consolidate_brands_models.consolidate_brands_models(data_sources)
+        consolidated_file = data_dir / "consolidated_brands_models.json"
+        with open(consolidated_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'metadata': {
+                    'consolidated_at': datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    'consolidation_version': 'v2.0',
+                    'data_sources': {name: {'file': info['file']} for name, info in data_sources.items()},
+                    'statistics': stats,
+                    'description': 'Synthetic consolidated dataset for scale testing',
+                    'synthetic': True
+                },
+                'consolidated_brands_models': consolidated,
+                'brands_list': sorted(consolidated.keys())
+            }, f, indent=2, ensure_ascii=False)
+        written.append(consolidated_file)
+
+        # Spécifications techniques
+        tech_time = base_time + timedelta(days=7 * (snapshots - 1), hours=1)
+        tech_file = data_dir / f"autonomous_technical_specs_{tech_time.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(tech_file, 'w', encoding='utf-8') as f:
+            json.dump(self.build_technical_document(consolidated, tech_time), f, indent=2, ensure_ascii=False)
+        written.append(tech_file)
+
+        return {
+            'files': written,
+            'duration': time.time() - start,
+            'source_brands': {name: len(bm) for name, bm in current.items()},
+            'source_models': {name: sum(len(m) for m in bm.values()) for name, bm in current.items()},
+            'stats': stats
+        }
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Générateur de données synthétiques pour tests de montée en charge",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples d'utilisation:
+  python generate_synthetic_data.py --scale 10 --output synthetic_10x
+  python generate_synthetic_data.py --scale 100 --output synthetic_100x --seed 1
+  python generate_synthetic_data.py --overlap 0.5 --model-overlap 0.8 --collision-rate 0.1
+        """
+    )
+
+    parser.add_argument('--output', default='synthetic_output',
+                        help='Dossier de sortie (les fichiers sont écrits dans <output>/data/)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiplicateur du nombre de marques par rapport aux données réelles')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Graine aléatoire (reproductibilité)')
+    parser.add_argument('--overlap', type=float, default=0.25,
+                        help='Probabilité qu\'une marque soit partagée avec une autre source')
+    parser.add_argument('--model-overlap', type=float, default=0.6,
+                        help='Probabilité qu\'un modèle soit partagé entre sources pour une même marque')
+    parser.add_argument('--collision-rate', type=float, default=0.03,
+                        help='Taux de noms de modèles courants partagés entre marques')
+    parser.add_argument('--model-sigma', type=float, default=1.0,
+                        help='Dispersion (sigma log-normal) du nombre de modèles par marque')
+    parser.add_argument('--max-models-per-brand', type=int, default=5,
+                        help='Modèles enrichis par marque dans le fichier technique')
+    parser.add_argument('--snapshots', type=int, default=1,
+                        help='Nombre de versions successives par source')
+    parser.add_argument('--churn', type=float, default=0.02,
+                        help='Fraction de marques modifiées entre deux versions')
+
+    args = parser.parse_args()
+
+    print("🧪 SYNTHETIC DATASET GENERATOR")
+    print("=" * 50)
+    print(f"   • Scale: {args.scale}×")
+    print(f"   • Seed: {args.seed}")
+    print(f"   • Brand overlap: {args.overlap:.0%}")
+    print(f"   • Model overlap: {args.model_overlap:.0%}")
+    print(f"   • Collision rate: {args.collision_rate:.0%}")
+    print(f"   • Snapshots: {args.snapshots}")
+
+    generator = SyntheticDatasetGenerator(
+        scale=args.scale,
+        seed=args.seed,
+        overlap=args.overlap,
+        model_overlap=args.model_overlap,
+        collision_rate=args.collision_rate,
+        model_sigma=args.model_sigma,
+        max_models_per_brand=args.max_models_per_brand
+    )
+    summary = generator.generate(args.output, snapshots=max(1, args.snapshots), churn=args.churn)
+
+    print()
+    print("📊 GENERATED DATA:")
+    for source_name, brands_count in summary['source_brands'].items():
+        print(f"   {source_name:<10}: {brands_count} brands, {summary['source_models'][source_name]} models")
+    print(f"   Consolidated: {summary['stats']['total_brands']} brands, {summary['stats']['total_models']} models")
+    print(f"   Files written: {len(summary['files'])} in {summary['duration']:.1f}s")
+    print(f"📁 Output: {Path(args.output) / 'data'}")
+
+
+if __name__ == "__main__":
+    main()
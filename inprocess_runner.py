@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+In-Process Runner - Exécution des scrapers sans sous-processus Python
+Chaque scraper expose run() (scrape et retourne les données du snapshot) et
+save() (écrit le snapshot). Les orchestrateurs exécutent run() dans un pool de
+processus, transmettent les résultats en mémoire à la consolidation et
+écrivent les snapshots en arrière-plan. Le fichier de chaque snapshot (nouveau,
+ou dernier snapshot identique qui n'est pas réécrit) est choisi dès la fin du
+scraping: la consolidation le cite sans attendre l'écriture.
+
+Les imports lourds (Selenium) sont chargés une fois par le serveur forkserver
+dont les workers sont forkés (Unix), au lieu d'un interpréteur neuf par étape.
+
+Usage:
+    python update_all.py --in-process --stages as24,cguru,consolidation
+    python inprocess_runner.py --benchmark     # Surcoût subprocess vs in-process
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from data_storage import load_json, save_json
+from result_writer import ScrapeResult, snapshot_path
+from snapshot_manifest import latest_path
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+# Étape du pipeline -> module du scraper, préfixe des snapshots, nom de source en consolidation
+SOURCES = {
+    'as24': {'module': 'autoscout24_scraper', 'prefix': 'as24', 'label': 'AS24'},
+    'cguru': {'module': 'car_gurus_scraper', 'prefix': 'cargurus', 'label': 'CarGurus'},
+    'autodata': {'module': 'autodata_scraper', 'prefix': 'autodata', 'label': 'Auto-Data'},
+    'carfolio': {'module': 'carfolio_scraper', 'prefix': 'carfolio', 'label': 'Carfolio'},
+}
+
+PRELOAD_MODULES = ['selenium.webdriver', 'selenium.webdriver.support.ui']
+
+
+def _create_process_pool(max_workers):
+    """Pool de processus, un processus neuf par tâche (configuration logging propre à chaque scraper).
+
+    Sous Unix, les workers sont forkés par un serveur forkserver qui a déjà importé
+    Selenium: chaque tâche évite le démarrage de l'interpréteur et ces imports.
+    """
+    kwargs = {'max_workers': max_workers}
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        kwargs['mp_context'] = context
+    try:
+        return concurrent.futures.ProcessPoolExecutor(max_tasks_per_child=1, **kwargs)
+    except TypeError:
+        # Python < 3.11
+        return concurrent.futures.ProcessPoolExecutor(**kwargs)
+
+
+def _peak_rss_mb():
+    """Pic RSS du processus courant et du plus gros de ses descendants terminés (navigateur)."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss: Ko sous Linux, octets sous macOS
+    return usage / 1024 ** 2 if sys.platform == 'darwin' else usage / 1024
+
+
+def _snapshot_target(prefix, result_data):
+    """(fichier, à écrire): dernier snapshot si le contenu est identique (journalisé "unchanged"), sinon nouveau fichier."""
+    existing = ScrapeResult(prefix, result_data).unchanged()
+    if existing:
+        return existing, False
+    return snapshot_path(prefix), True
+
+
+def _run_source(module_name, prefix, options, env=None):
+    """Exécuté dans le pool: scrape une source.
+
+    Retourne (données, (fichier du snapshot, à écrire), durée d'import, durée de scraping, pic RSS).
+    """
+    # Canal de progression de l'orchestrateur (processus neuf par tâche)
+    os.environ.update(env or {})
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+    result_data = module.run(**options)
+    scrape_time = time.perf_counter() - imported
+    target = _snapshot_target(prefix, result_data) if result_data else (None, False)
+    return result_data, target, imported - start, scrape_time, _peak_rss_mb() if resource else None
+
+
+def _save_source(module_name, result_data, output_file):
+    """Exécuté dans le pool: écrit le snapshot d'une source dans le fichier choisi par _run_source."""
+    module = importlib.import_module(module_name)
+    return module.save(result_data, output_file)
+
+
+class InProcessRunner:
+    """Exécute les étapes scrapers/consolidation en mémoire, écritures en arrière-plan."""
+
+    def __init__(self, max_workers=4, scraper_options=None, progress=None):
+        self.max_workers = max_workers
+        self.scraper_options = scraper_options or {}
+        self.progress = progress
+        self.results = {}
+        self.snapshot_files = {}
+        self.pending_writes = {}
+        self.pool = None
+        self.writer = None
+
+    def __enter__(self):
+        self.pool = _create_process_pool(self.max_workers)
+        # Pool séparé: une écriture n'attend jamais qu'un scraper libère sa place
+        self.writer = _create_process_pool(2)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wait_for_writes()
+        self.pool.shutdown()
+        self.writer.shutdown()
+        return False
+
+    @staticmethod
+    def handles(spec):
+        """Étapes exécutées en mémoire: scrapers et consolidation."""
+        return spec['name'] in SOURCES or spec['name'] == 'consolidation'
+
+    def has_pending_inputs(self, spec):
+        """Vrai si la consolidation reçoit des résultats en mémoire (fichiers peut-être pas encore écrits)."""
+        return spec['name'] == 'consolidation' and bool(self.results)
+
+    def stage_runner(self, fallback):
+        """Exécuteur d'étape: en mémoire si possible, sinon via fallback(spec)."""
+        def run_stage(spec):
+            return self.run_stage(spec) if self.handles(spec) else fallback(spec)
+        return run_stage
+
+    def run_stage(self, spec):
+        """Exécute une étape en mémoire et retourne son résultat au format des orchestrateurs."""
+        if spec['name'] == 'consolidation':
+            return self.run_consolidation(spec)
+        return self.run_scraper(spec)
+
+    def run_scraper(self, spec):
+        """Scrape une source dans le pool puis planifie l'écriture du snapshot."""
+        source = SOURCES[spec['name']]
+        print(f"🚀 {spec['emoji']} Starting in-process: {spec['description']}")
+        start_time = time.time()
+        env = None
+        if self.progress:
+            self.progress.dashboard.register(spec['name'], spec['description'], spec['emoji'])
+            env = self.progress.env_for(spec['name'])
+
+        try:
+            future = self.pool.submit(_run_source, source['module'], source['prefix'],
+                                      self.scraper_options.get(spec['name'], {}), env)
+            result_data, (output_file, to_write), import_time, scrape_time, peak_rss = future.result()
+        except Exception as e:
+            self._finish_progress(spec, False)
+            print(f"  💥 {spec['description']} failed with exception: {e}")
+            return {'success': False, 'duration': time.time() - start_time, 'output': '', 'error': str(e)}
+
+        self._finish_progress(spec, bool(result_data))
+        duration = time.time() - start_time
+        if not result_data:
+            print(f"  ❌ {spec['description']} failed after {duration:.1f}s")
+            return {'success': False, 'duration': duration, 'output': '', 'error': 'Scraper returned no data'}
+
+        self.results[source['label']] = result_data
+        self.snapshot_files[source['label']] = output_file
+        if to_write:
+            self.pending_writes[source['label']] = self.writer.submit(_save_source, source['module'], result_data,
+                                                                      output_file)
+            print(f"  ✅ {spec['description']} completed in {duration:.1f}s (writing {output_file} in background)")
+        else:
+            print(f"  ✅ {spec['description']} completed in {duration:.1f}s (unchanged since {output_file})")
+        result = {
+            'success': True,
+            'duration': duration,
+            'output': '',
+            'error': None,
+            'overhead': duration - scrape_time,
+            'import_time': import_time
+        }
+        if peak_rss is not None:
+            result['peak_rss_mb'] = peak_rss
+        return result
+
+    def _finish_progress(self, spec, success):
+        """Affiche les derniers événements de la source et la marque comme terminée."""
+        if self.progress:
+            self.progress.drain(spec['name'])
+            self.progress.dashboard.finish(spec['name'], success)
+
+    def run_consolidation(self, spec):
+        """Consolide à partir des résultats en mémoire (et des derniers fichiers pour les autres sources)."""
+        import consolidate_brands_models
+
+        print(f"🚀 Starting in-process: {spec['emoji']} {spec['description']}")
+        start_time = time.time()
+        # Fichiers choisis à la fin de chaque scraping: les écritures en cours ne sont pas attendues
+        in_memory = {label: (self.snapshot_files[label], data) for label, data in self.results.items()}
+        try:
+            result = consolidate_brands_models.run(in_memory)
+        except Exception as e:
+            print(f"💥 {spec['description']} failed with exception: {e}")
+            return {'success': False, 'duration': time.time() - start_time, 'output': '', 'error': str(e)}
+
+        duration = time.time() - start_time
+        if not result:
+            print(f"❌ {spec['description']} failed: no data sources")
+            return {'success': False, 'duration': duration, 'output': '', 'error': 'No data sources found'}
+
+        print(f"✅ {spec['emoji']} {spec['description']} completed in {duration:.1f}s")
+        return {'success': True, 'duration': duration, 'output': result['json_file'], 'error': None, 'overhead': 0.0}
+
+    def wait_for_writes(self):
+        """Attend la fin des écritures en arrière-plan et signale celles qui ont échoué."""
+        for label, future in list(self.pending_writes.items()):
+            try:
+                if not future.result():
+                    print(f"⚠️ {label} snapshot not written ({self.snapshot_files[label]})")
+            except Exception as e:
+                print(f"💥 {label} snapshot write failed: {e}")
+            del self.pending_writes[label]
+
+
+def _latest_snapshot(prefix):
+    """Dernier snapshot d'une source (données de référence du benchmark)."""
+    latest = latest_path(prefix, "scraped_models")
+    if latest is None:
+        return None
+    return load_json(latest)
+
+
+def _import_only(module_name):
+    """Tâche du pool pour le benchmark: import seul."""
+    start = time.perf_counter()
+    importlib.import_module(module_name)
+    return time.perf_counter() - start
+
+
+def benchmark():
+    """Mesure le surcoût par source: sous-processus + passage par fichier vs pool + passage en mémoire."""
+    print("⏱️ Surcoût par source (hors temps de scraping)")
+    print(f"{'Source':<10} | {'subprocess':>11} | {'in-process':>11} | {'gain':>8}")
+    print("-" * 50)
+
+    totals = [0.0, 0.0]
+    with _create_process_pool(1) as pool, tempfile.TemporaryDirectory() as tmp_dir:
+        for name, source in SOURCES.items():
+            result_data = _latest_snapshot(source['prefix']) or {"metadata": {}, "brands_models": {}}
+
+            # Chemin subprocess: interpréteur + imports, puis écriture JSON, glob et relecture
+            start = time.perf_counter()
+            completed = subprocess.run([sys.executable, '-c', f"import {source['module']}"],
+                                       capture_output=True)
+            if completed.returncode != 0:
+                print(f"{name:<10} | indisponible (dépendances manquantes)")
+                continue
+            handoff_file = Path(tmp_dir) / f"{source['prefix']}_scraped_models_00000000_000000.json"
+            save_json(handoff_file, result_data)
+            latest = sorted(Path(tmp_dir).glob(f"{source['prefix']}_scraped_models_*.json"))[-1]
+            load_json(latest)
+            subprocess_time = time.perf_counter() - start
+
+            # Chemin in-process: tâche du pool (fork + import) et retour des données picklées
+            start = time.perf_counter()
+            pool.submit(_import_only, source['module']).result()
+            pickle.loads(pickle.dumps(result_data))
+            inprocess_time = time.perf_counter() - start
+
+            totals[0] += subprocess_time
+            totals[1] += inprocess_time
+            print(f"{name:<10} | {subprocess_time:>10.3f}s | {inprocess_time:>10.3f}s | "
+                  f"{subprocess_time / max(inprocess_time, 1e-9):>7.1f}×")
+
+    print("-" * 50)
+    print(f"{'TOTAL':<10} | {totals[0]:>10.3f}s | {totals[1]:>10.3f}s | "
+          f"{totals[0] / max(totals[1], 1e-9):>7.1f}×")
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(description="Exécution in-process des scrapers")
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Comparer le surcoût subprocess vs in-process')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
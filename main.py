@@ -5,8 +5,10 @@ AllCars-DB Main Menu - Central Hub
 Complete automotive data management system with statistics and navigation
 """
 
-import json
+import argparse
+import contextlib
 import logging
+import os
 import sys
 import time
 import subprocess
@@ -14,6 +16,14 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from pipeline_dag import PipelineDAG, build_stages, stage_spec, PIPELINE_STAGES, SCRAPER_STAGES
+from build_cache import BuildCache
+from inprocess_runner import InProcessRunner
+from progress_channel import ProgressServer, ProgressDashboard
+from eta_estimator import ETAEstimator
+from admission_control import AdmissionController
+from snapshot_manifest import MANIFEST_NAME, file_stats, latest_path, load_manifest, parse_name
+
 # Configuration logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,10 +38,13 @@ logger = logging.getLogger(__name__)
 class AllCarsDBMainMenu:
     """Central menu system for AllCars-DB with comprehensive statistics."""
 
-    def __init__(self):
+    def __init__(self, force=False, in_process=False):
         self.start_time = None
         self.stats_cache = {}
         self.last_stats_update = 0
+        self.build_cache = BuildCache(force=force)
+        self.in_process = in_process
+        self.progress = None
 
     def display_banner(self):
         """Display the main banner with system status."""
@@ -50,89 +63,41 @@ class AllCarsDBMainMenu:
         print("-" * 50)
 
         # Data sources status
-        data_dir = Path("data")
-        data_dir.mkdir(exist_ok=True)
+        Path("data").mkdir(exist_ok=True)
 
-        # Brands/Models data
-        consolidated_files = list(data_dir.glob("consolidated_brands_models_*.json"))
-        if consolidated_files:
-            latest = max(consolidated_files, key=lambda x: x.stat().st_mtime)
-            brands_count = self.get_brands_count(latest)
-            print(f"🏷️ Brands/Models: {brands_count} brands ({latest.name})")
+        # Brands/Models data (latest files from data/manifest.json, counts from their stats sidecars)
+        latest = latest_path("consolidated", "brands_models")
+        if latest:
+            print(f"🏷️ Brands/Models: {file_stats(latest).get('brands', 0)} brands ({latest.name})")
         else:
             print("🏷️ Brands/Models: No data available")
 
         # Technical specs data
-        autodata_files = list(data_dir.glob("autodata_technical_specs_*.json"))
-        carfolio_files = list(data_dir.glob("carfolio_technical_specs_*.json"))
-        consolidated_tech_files = list(data_dir.glob("consolidated_technical_specs_*.json"))
-
-        if autodata_files:
-            latest = max(autodata_files, key=lambda x: x.stat().st_mtime)
-            autodata_stats = self.get_technical_stats(latest)
-            print(f"🇧🇬 Auto-Data Tech: {autodata_stats['brands']} brands, {autodata_stats['models']} models")
+        latest = latest_path("autodata", "technical_specs")
+        if latest:
+            autodata_stats = file_stats(latest)
+            print(f"🇧🇬 Auto-Data Tech: {autodata_stats.get('brands', 0)} brands, {autodata_stats.get('models', 0)} models")
         else:
             print("🇧🇬 Auto-Data Tech: No data available")
 
-        if carfolio_files:
-            latest = max(carfolio_files, key=lambda x: x.stat().st_mtime)
-            carfolio_stats = self.get_technical_stats(latest)
-            print(f"🌍 Carfolio Tech: {carfolio_stats['brands']} brands, {carfolio_stats['models']} models")
+        latest = latest_path("carfolio", "technical_specs")
+        if latest:
+            carfolio_stats = file_stats(latest)
+            print(f"🌍 Carfolio Tech: {carfolio_stats.get('brands', 0)} brands, {carfolio_stats.get('models', 0)} models")
         else:
             print("🌍 Carfolio Tech: No data available")
 
-        if consolidated_tech_files:
-            latest = max(consolidated_tech_files, key=lambda x: x.stat().st_mtime)
-            consolidated_stats = self.get_consolidated_tech_stats(latest)
-            print(f"🔄 Consolidated Tech: {consolidated_stats['brands']} brands, {consolidated_stats['conflicts']} conflicts resolved")
+        latest = latest_path("consolidated", "technical_specs")
+        if latest:
+            consolidated_stats = file_stats(latest).get('metadata', {}).get('consolidation_stats', {})
+            print(f"🔄 Consolidated Tech: {consolidated_stats.get('brands_processed', 0)} brands, "
+                  f"{consolidated_stats.get('total_conflicts_resolved', 0)} conflicts resolved")
         else:
             print("🔄 Consolidated Tech: No data available")
 
         print("-" * 50)
         print()
 
-    def get_brands_count(self, file_path: Path) -> int:
-        """Get brands count from consolidated file."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            consolidated = data.get('consolidated_brands_models', data)
-            return len(consolidated)
-        except:
-            return 0
-
-    def get_technical_stats(self, file_path: Path) -> Dict[str, int]:
-        """Get technical specs statistics."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            brands_data = data.get('brands_technical_data', {})
-            total_models = sum(len(brand.get('models', {})) for brand in brands_data.values())
-
-            return {
-                'brands': len(brands_data),
-                'models': total_models
-            }
-        except:
-            return {'brands': 0, 'models': 0}
-
-    def get_consolidated_tech_stats(self, file_path: Path) -> Dict[str, int]:
-        """Get consolidated technical specs statistics."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            metadata = data.get('metadata', {})
-            stats = metadata.get('consolidation_stats', {})
-
-            return {
-                'brands': stats.get('brands_processed', 0),
-                'conflicts': stats.get('total_conflicts_resolved', 0)
-            }
-        except:
-            return {'brands': 0, 'conflicts': 0}
-
     def display_menu(self):
         """Display the main menu options."""
         print("📋 MAIN MENU - SELECT OPERATION:")
@@ -161,62 +126,38 @@ class AllCarsDBMainMenu:
         print()
 
     def run_script_with_progress(self, script_name: str, description: str, expected_duration: int = 300, *args) -> Dict[str, Any]:
-        """Run a script with periodic progress messages for long-running tasks."""
-        import threading
+        """Run a scraper with a live ETA computed from its progress events and past runs."""
+        stage = next((spec['name'] for spec in PIPELINE_STAGES if spec['script'] == script_name), Path(script_name).stem)
+
+        if self.progress is None:
+            # Standalone scraper: its own progress channel and estimator
+            eta = ETAEstimator([stage], priors={stage: expected_duration})
+            with ProgressServer(ProgressDashboard(eta=eta)) as self.progress:
+                eta.start(stage)
+                try:
+                    result = self.run_script_with_progress(script_name, description, expected_duration, *args)
+                finally:
+                    self.progress = None
+            eta.finish(stage, result['success'])
+            for line in eta.log_accuracy():
+                print(line)
+            return result
 
         print(f"🚀 Starting: {description}")
+        eta = self.progress.dashboard.eta
+        if eta:
+            print(f"⏱️ {description}: {eta.describe(stage)}")
+        self.progress.dashboard.register(stage, description)
         start_time = time.time()
 
-        # Expected durations for different scrapers (in seconds)
-        duration_messages = {
-            'autoscout24': [
-                (300, "🌍 AutoScout24: Still working... (~5-10 min remaining)"),
-                (600, "🌍 AutoScout24: Processing brands... (~10-20 min remaining)"),
-                (1200, "🌍 AutoScout24: Halfway through... (~10-15 min remaining)"),
-                (1800, "🌍 AutoScout24: Almost done... (~5 min remaining)")
-            ],
-            'cargurus': [
-                (600, "🇺🇸 CarGurus: Initializing... (~45-50 min remaining)"),
-                (1200, "🇺🇸 CarGurus: Processing brands... (~35-40 min remaining)"),
-                (1800, "🇺🇸 CarGurus: Still working... (~25-30 min remaining)"),
-                (2400, "🇺🇸 CarGurus: Halfway through... (~15-20 min remaining)"),
-                (3000, "🇺🇸 CarGurus: Almost done... (~5 min remaining)")
-            ],
-            'carfolio': [
-                (30, "🌐 Carfolio: Quick processing... (~1-2 min remaining)"),
-                (60, "🌐 Carfolio: Almost done... (~30 sec remaining)")
-            ],
-            'autodata': [
-                (150, "🇧🇬 Auto-Data: Initializing... (~12-13 min remaining)"),
-                (300, "🇧🇬 Auto-Data: Processing brands... (~10-11 min remaining)"),
-                (450, "🇧🇬 Auto-Data: Halfway through... (~7-8 min remaining)"),
-                (600, "🇧🇬 Auto-Data: Still working... (~4-5 min remaining)"),
-                (750, "🇧🇬 Auto-Data: Almost done... (~1-2 min remaining)")
-            ]
-        }
-
-        # Get progress messages for this scraper
-        scraper_key = script_name.lower().replace('_scraper.py', '').replace('car_gurus', 'cargurus')
-        progress_messages = duration_messages.get(scraper_key, [])
-
-        # Function to print progress messages
-        def print_progress_messages():
-            for delay, message in progress_messages:
-                time.sleep(delay)
-                elapsed = time.time() - start_time
-                if elapsed < expected_duration:  # Only print if still running
-                    print(f"⏳ {message}")
-
-        # Start progress message thread
-        if progress_messages:
-            progress_thread = threading.Thread(target=print_progress_messages, daemon=True)
-            progress_thread.start()
-
         try:
             cmd = [sys.executable, script_name] + list(args)
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600, encoding='utf-8', errors='replace')
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600, encoding='utf-8', errors='replace',
+                                    env={**os.environ, **self.progress.env_for(stage)})
 
             duration = time.time() - start_time
+            self.progress.drain(stage)
+            self.progress.dashboard.finish(stage, result.returncode == 0)
 
             if result.returncode == 0:
                 print(f"✅ {description} completed in {duration:.1f}s")
@@ -238,6 +179,7 @@ class AllCarsDBMainMenu:
                 }
 
         except subprocess.TimeoutExpired:
+            self.progress.dashboard.finish(stage, False)
             print(f"⏰ {description} timed out after 1 hour")
             return {
                 'success': False,
@@ -246,6 +188,7 @@ class AllCarsDBMainMenu:
                 'error': 'Timeout after 1 hour'
             }
         except Exception as e:
+            self.progress.dashboard.finish(stage, False)
             print(f"💥 {description} failed with exception: {e}")
             return {
                 'success': False,
@@ -307,40 +250,44 @@ class AllCarsDBMainMenu:
                 'error': str(e)
             }
 
+    def run_pipeline_stage(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one pipeline stage, with progress feedback for the scrapers."""
+        description = f"{spec['emoji']} {spec['description']}"
+        if spec['name'] in SCRAPER_STAGES:
+            return self.run_script_with_progress(spec['script'], description, spec['expected_duration'])
+        return self.run_script(spec['script'], description)
+
     def run_quick_start(self):
         """Run the complete data update pipeline."""
         print("🚀 QUICK START: Complete data update pipeline")
         print("=" * 60)
 
         self.start_time = time.time()
-        results = {}
-
-        # Step 1: Update brands/models
-        print("\n📍 PHASE 1: Updating Brands & Models")
-        print("-" * 40)
-
-        # Run individual scrapers with progress feedback
-        results['autoscout24'] = self.run_script_with_progress('autoscout24_scraper.py', '🌍 AutoScout24 scraper', 1800)  # ~30 min
-        results['cargurus'] = self.run_script_with_progress('car_gurus_scraper.py', '🇺🇸 CarGurus scraper', 3600)  # ~1 hour
-        results['carfolio'] = self.run_script_with_progress('carfolio_scraper.py', '🌐 Carfolio scraper', 120)  # ~2 min
-        results['autodata'] = self.run_script_with_progress('autodata_scraper.py', '🇧🇬 Auto-Data scraper', 900)  # ~15 min
-
-        # Consolidate brands
-        results['consolidate'] = self.run_script('consolidate_brands_models.py', '🔄 Brands consolidation')
-
-        # Step 2: Update technical specs
-        print("\n📍 PHASE 2: Updating Technical Specifications")
-        print("-" * 40)
-
-        # Run technical scrapers in parallel simulation
-        results['autodata_tech'] = self.run_script('autodata_technical_scraper.py', '🇧🇬 Auto-Data technical scraper')
-        results['carfolio_tech'] = self.run_script('carfolio_technical_scraper.py', '🌍 Carfolio technical scraper')
 
-        # Consolidate technical specs
-        results['tech_consolidate'] = self.run_script('technical_data_orchestrator.py', '🔄 Technical specs consolidation', '--consolidate-only')
+        # Scrapers in parallel, consolidation as soon as all sources are done,
+        # then technical specifications and analysis
+        eta = ETAEstimator()
+        with ProgressServer(ProgressDashboard(eta=eta)) as self.progress:
+            runner_context = InProcessRunner(progress=self.progress) if self.in_process else contextlib.nullcontext()
+            with runner_context as runner, AdmissionController() as admission:
+                if runner:
+                    # Scrapers in a process pool, results handed to consolidation in memory
+                    run_stage = self.build_cache.wrap(runner.stage_runner(self.run_pipeline_stage),
+                                                      bypass=runner.has_pending_inputs)
+                else:
+                    run_stage = self.build_cache.wrap(self.run_pipeline_stage)
+                # Start stages only while memory / CPU headroom allows (footprints from past runs)
+                dag = PipelineDAG(build_stages(eta.track(run_stage)), admission=admission)
+                print(f"⚡ Pipeline{' (in-process)' if runner else ''}: {' → '.join(dag.order)}")
+                print(f"⏱️ Estimated duration: {eta.describe()}")
+                print("-" * 40)
+                results = dag.run()
+        self.progress = None
 
         # Summary
         self.display_execution_summary(results)
+        for line in eta.log_accuracy():
+            print(line)
 
         return all(r['success'] for r in results.values())
 
@@ -362,6 +309,9 @@ class AllCarsDBMainMenu:
                 status = "✅ SUCCESS" if result['success'] else "❌ FAILED"
                 duration = f"{result.get('duration', 0):>6.1f}s"
                 details = "OK" if result['success'] else "Check logs"
+                if result.get('cached'):
+                    status = "⚡ CACHED"
+                    details = f"Saved ~{result['saved']:.1f}s"
 
                 if result['success']:
                     successful += 1
@@ -379,21 +329,15 @@ class AllCarsDBMainMenu:
         print("📊 BRANDS & MODELS STATISTICS")
         print("=" * 60)
 
-        data_dir = Path("data")
-        consolidated_files = list(data_dir.glob("consolidated_brands_models_*.json"))
+        latest_file = latest_path("consolidated", "brands_models")
 
-        if not consolidated_files:
+        if latest_file is None:
             print("❌ No consolidated brands data found!")
             print("💡 Run option 4 to create consolidated data")
             return
 
-        latest_file = max(consolidated_files, key=lambda x: x.stat().st_mtime)
-
         try:
-            with open(latest_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            metadata = data.get('metadata', {})
+            metadata = file_stats(latest_file).get('metadata', {})
             stats = metadata.get('statistics', {})
 
             print(f"📅 Last Update: {metadata.get('consolidated_at', 'Unknown')}")
@@ -411,7 +355,7 @@ class AllCarsDBMainMenu:
             data_sources = metadata.get('data_sources', {})
             print("📄 DATA SOURCES:")
             for source_name, source_info in data_sources.items():
-                print(f"   {source_name.upper()}: {source_info.get('brands_count', 'N/A')} brands, {source_info.get('models_count', 'N/A')} models")
+                print(f"   {source_name.upper()}: {source_info.get('brands', 'N/A')} brands, {source_info.get('models', 'N/A')} models")
 
             print()
             print("📁 File: " + str(latest_file.name))
@@ -426,48 +370,36 @@ class AllCarsDBMainMenu:
         print("📊 TECHNICAL SPECIFICATIONS STATISTICS")
         print("=" * 60)
 
-        data_dir = Path("data")
-
-        # Individual source files
-        autodata_files = list(data_dir.glob("autodata_technical_specs_*.json"))
-        carfolio_files = list(data_dir.glob("carfolio_technical_specs_*.json"))
-        consolidated_files = list(data_dir.glob("consolidated_technical_specs_*.json"))
+        # Latest files per source (data/manifest.json) and their stats sidecars
+        autodata_latest = latest_path("autodata", "technical_specs")
+        carfolio_latest = latest_path("carfolio", "technical_specs")
+        consolidated_latest = latest_path("consolidated", "technical_specs")
 
         # Show individual sources
-        if autodata_files:
-            latest = max(autodata_files, key=lambda x: x.stat().st_mtime)
-            stats = self.get_technical_stats(latest)
-            print(f"🇧🇬 Auto-Data: {stats['brands']} brands, {stats['models']} models ({latest.name})")
+        if autodata_latest:
+            stats = file_stats(autodata_latest)
+            print(f"🇧🇬 Auto-Data: {stats.get('brands', 0)} brands, {stats.get('models', 0)} models ({autodata_latest.name})")
 
-        if carfolio_files:
-            latest = max(carfolio_files, key=lambda x: x.stat().st_mtime)
-            stats = self.get_technical_stats(latest)
-            print(f"🌍 Carfolio: {stats['brands']} brands, {stats['models']} models ({latest.name})")
+        if carfolio_latest:
+            stats = file_stats(carfolio_latest)
+            print(f"🌍 Carfolio: {stats.get('brands', 0)} brands, {stats.get('models', 0)} models ({carfolio_latest.name})")
 
         # Show consolidated data
-        if consolidated_files:
+        if consolidated_latest:
             print()
-            latest = max(consolidated_files, key=lambda x: x.stat().st_mtime)
-            try:
-                with open(latest, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                metadata = data.get('metadata', {})
-                stats = metadata.get('consolidation_stats', {})
-
-                print("🔄 CONSOLIDATED TECHNICAL DATA:")
-                print(f"   Last Consolidation: {metadata.get('consolidated_at', 'Unknown')}")
-                print(f"   Method: {metadata.get('method', 'Unknown')}")
-                print(f"   Brands Processed: {stats.get('brands_processed', 'N/A')}")
-                print(f"   Models Consolidated: {stats.get('models_consolidated', 'N/A')}")
-                print(f"   Specifications: {stats.get('specs_consolidated', 'N/A')}")
-                print(f"   Conflicts Resolved: {stats.get('total_conflicts_resolved', 'N/A')}")
-                print(f"   File: {latest.name}")
+            metadata = file_stats(consolidated_latest).get('metadata', {})
+            stats = metadata.get('consolidation_stats', {})
 
-            except Exception as e:
-                print(f"❌ Error loading consolidated stats: {e}")
+            print("🔄 CONSOLIDATED TECHNICAL DATA:")
+            print(f"   Last Consolidation: {metadata.get('consolidated_at', 'Unknown')}")
+            print(f"   Method: {metadata.get('method', 'Unknown')}")
+            print(f"   Brands Processed: {stats.get('brands_processed', 'N/A')}")
+            print(f"   Models Consolidated: {stats.get('models_consolidated', 'N/A')}")
+            print(f"   Specifications: {stats.get('specs_consolidated', 'N/A')}")
+            print(f"   Conflicts Resolved: {stats.get('total_conflicts_resolved', 'N/A')}")
+            print(f"   File: {consolidated_latest.name}")
 
-        if not autodata_files and not carfolio_files and not consolidated_files:
+        if not autodata_latest and not carfolio_latest and not consolidated_latest:
             print("❌ No technical specifications data found!")
             print("💡 Run options 6-8 to scrape and consolidate technical data")
 
@@ -481,8 +413,19 @@ class AllCarsDBMainMenu:
         data_dir = Path("data")
         data_dir.mkdir(exist_ok=True)
 
-        # Get all JSON files
-        all_files = list(data_dir.glob("*.json"))
+        # Files recorded in data/manifest.json need no stat or read; the directory scan
+        # adds files written without the manifest (older runs, other tools, free names)
+        on_disk = {path.name: path for path in data_dir.glob("*.json") if path.name != MANIFEST_NAME}
+        all_files = [entry for entry in load_manifest()["files"].values() if Path(entry['path']).name in on_disk]
+        recorded = {Path(entry['path']).name for entry in all_files}
+        for name, path in on_disk.items():
+            if name not in recorded:
+                stat = path.stat()
+                source, kind, _ = parse_name(path) or (None, None, None)
+                all_files.append({
+                    'source': source, 'kind': kind, 'path': str(path), 'size': stat.st_size,
+                    'written_at': datetime.fromtimestamp(stat.st_mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                })
         if not all_files:
             print("❌ No data files found in /data directory")
             return
@@ -490,24 +433,28 @@ class AllCarsDBMainMenu:
         # Group files by type
         file_groups = {
             'Brands/Models': [],
+            'Scraped Snapshots': [],
             'Technical Specs': [],
             'Consolidated': [],
             'Other': []
         }
 
-        for file_path in sorted(all_files, key=lambda x: x.stat().st_mtime, reverse=True):
-            filename = file_path.name
-            size_mb = file_path.stat().st_size / (1024 * 1024)
-            mtime = datetime.fromtimestamp(file_path.stat().st_mtime).strftime("%Y-%m-%d %H:%M")
+        for entry in sorted(all_files, key=lambda e: e['written_at'], reverse=True):
+            filename = Path(entry['path']).name
+            size_mb = entry['size'] / (1024 * 1024)
+            mtime = datetime.strptime(entry['written_at'], "%Y-%m-%dT%H:%M:%SZ").replace(
+                tzinfo=timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M")
 
-            if 'consolidated_brands' in filename:
+            if entry['kind'] == 'brands_models':
                 file_groups['Brands/Models'].append((filename, size_mb, mtime))
-            elif 'technical_specs' in filename and 'consolidated' not in filename:
+            elif entry['kind'] == 'scraped_models':
+                file_groups['Scraped Snapshots'].append((filename, size_mb, mtime))
+            elif entry['kind'] is None:
+                file_groups['Other'].append((filename, size_mb, mtime))
+            elif entry['source'] != 'consolidated':
                 file_groups['Technical Specs'].append((filename, size_mb, mtime))
-            elif 'consolidated_technical' in filename:
-                file_groups['Consolidated'].append((filename, size_mb, mtime))
             else:
-                file_groups['Other'].append((filename, size_mb, mtime))
+                file_groups['Consolidated'].append((filename, size_mb, mtime))
 
         # Display each group
         for group_name, files in file_groups.items():
@@ -608,7 +555,7 @@ class AllCarsDBMainMenu:
 
                 elif choice == "5":
                     print("\n🔄 Starting brands/models consolidation...")
-                    result = self.run_script('consolidate_brands_models.py', 'Brands consolidation')
+                    result = self.build_cache.wrap(self.run_pipeline_stage)(stage_spec('consolidation'))
 
                 elif choice == "5":
                     print("\n📊 Showing brands/models statistics...")
@@ -688,7 +635,14 @@ class AllCarsDBMainMenu:
 
 def main():
     """Main entry point."""
-    menu = AllCarsDBMainMenu()
+    parser = argparse.ArgumentParser(description="AllCars-DB Main Menu")
+    parser.add_argument('--force', action='store_true',
+                        help='Re-run pipeline stages even when their inputs are unchanged')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Quick Start: run scrapers in a process pool, results passed in memory')
+    args = parser.parse_args()
+
+    menu = AllCarsDBMainMenu(force=args.force, in_process=args.in_process)
     menu.run()
 
 if __name__ == "__main__":
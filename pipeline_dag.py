@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Pipeline DAG - Ordonnancement des étapes de mise à jour
+Décrit le pipeline sous forme de graphe d'étapes (scraping des sources →
+consolidation → spécifications techniques → analyse) et l'exécute en lançant
+chaque étape dès que ses dépendances sont terminées, en parallèle dans la
+limite d'un budget de ressources (navigateurs, CPU).
+
+Usage:
+    from pipeline_dag import PipelineDAG, build_stages
+    dag = PipelineDAG(build_stages(run_stage_script), budget={'browser': 2, 'cpu': 2})
+    results = dag.select(['as24', 'cguru', 'consolidation']).run()
+"""
+
+import concurrent.futures
+import time
+from collections import Counter
+
+from tracing import flush_trace, span
+
+# Budget par défaut: 4 navigateurs (un par source) et 2 étapes CPU simultanées
+DEFAULT_BUDGET = {'browser': 4, 'cpu': 2}
+
+# Délai avant de réévaluer une étape refusée par le contrôle d'admission (secondes)
+ADMISSION_RECHECK = 5
+
+# Description déclarative du pipeline complet
+# ('inputs'/'outputs': fichiers suivis par build_cache.py; sans 'inputs', l'étape est toujours exécutée)
+PIPELINE_STAGES = [
+    {
+        'name': 'as24',
+        'script': 'autoscout24_scraper.py',
+        'description': 'AutoScout24 (EU Market)',
+        'emoji': '🇪🇺',
+        'deps': [],
+        'resources': {'browser': 1},
+        'expected_duration': 1800
+    },
+    {
+        'name': 'cguru',
+        'script': 'car_gurus_scraper.py',
+        'description': 'CarGurus (US Market)',
+        'emoji': '🇺🇸',
+        'deps': [],
+        'resources': {'browser': 1},
+        'expected_duration': 3600
+    },
+    {
+        'name': 'autodata',
+        'script': 'autodata_scraper.py',
+        'description': 'Auto-Data (Technical Specs)',
+        'emoji': '🇧🇬',
+        'deps': [],
+        'resources': {'browser': 1},
+        'expected_duration': 900
+    },
+    {
+        'name': 'carfolio',
+        'script': 'carfolio_scraper.py',
+        'description': 'Carfolio (Global Brands/Models)',
+        'emoji': '🌍',
+        'deps': [],
+        'resources': {'browser': 1},
+        'expected_duration': 120
+    },
+    {
+        'name': 'consolidation',
+        'script': 'consolidate_brands_models.py',
+        'description': 'Data Consolidation',
+        'emoji': '🔗',
+        'deps': ['as24', 'cguru', 'autodata', 'carfolio'],
+        'resources': {'cpu': 1},
+        'expected_duration': 10,
+        'inputs': [
+            'data/*as24*scraped_models*.json',
+            'data/*cargurus*scraped_models*.json',
+            'data/*autodata*scraped_models*.json',
+            'data/*carfolio*scraped_models*.json'
+        ],
+        'outputs': ['data/consolidated_brands_models.json', 'data/consolidated_brands_models.md']
+    },
+    {
+        'name': 'technical',
+        'script': 'technical_scraper_autonomous.py',
+        'description': 'Technical Specifications',
+        'emoji': '🔧',
+        'deps': ['consolidation'],
+        'resources': {'cpu': 1},
+        'expected_duration': 60,
+        'inputs': ['data/consolidated_brands_models.json'],
+        'outputs': ['data/autonomous_technical_specs_*.json']
+    },
+    {
+        'name': 'analysis',
+        'script': 'analyze_technical_data.py',
+        'description': 'Technical Analysis & Export',
+        'emoji': '📊',
+        'deps': ['technical'],
+        'resources': {'cpu': 1},
+        'expected_duration': 30,
+        'inputs': ['data/autonomous_technical_specs_*.json'],
+        'outputs': ['data/autodata_web_ready.json']
+    }
+]
+
+SCRAPER_STAGES = ['as24', 'cguru', 'autodata', 'carfolio']
+
+
+def stage_spec(name):
+    """Description déclarative d'une étape par son nom."""
+    for spec in PIPELINE_STAGES:
+        if spec['name'] == name:
+            return spec
+    raise ValueError(f"Étape inconnue: {name}")
+
+
+class Stage:
+    """Étape du pipeline: une fonction à exécuter, ses dépendances et ses ressources."""
+
+    def __init__(self, name, run, deps=None, resources=None, description=None):
+        self.name = name
+        self.run = run
+        self.deps = list(deps or [])
+        self.resources = dict(resources or {})
+        self.description = description or name
+
+
+def build_stages(run_stage, names=None):
+    """Construit les étapes du pipeline; run_stage(spec) exécute une étape et retourne son résultat."""
+    stages = []
+    for spec in PIPELINE_STAGES:
+        if names is None or spec['name'] in names:
+            stages.append(Stage(
+                spec['name'],
+                lambda spec=spec: run_stage(spec),
+                deps=spec['deps'],
+                resources=spec['resources'],
+                description=spec['description']
+            ))
+    return stages
+
+
+class PipelineDAG:
+    """Exécute un graphe d'étapes au plus tôt, dans la limite d'un budget de ressources."""
+
+    def __init__(self, stages, budget=None, admission=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.budget = dict(DEFAULT_BUDGET if budget is None else budget)
+        self.admission = admission
+        self.peak_concurrency = 0
+        self.order = self._topological_order()
+        self._validate_budget()
+
+    def _topological_order(self):
+        """Ordre topologique (ordre de déclaration conservé), erreur si cycle."""
+        order = []
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Cycle dans le pipeline: {' → '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dep in self.stages[name].deps:
+                if dep in self.stages:
+                    visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def _validate_budget(self):
+        """Vérifie qu'aucune étape ne demande plus que le budget total."""
+        for stage in self.stages.values():
+            for resource, amount in stage.resources.items():
+                if amount > self.budget.get(resource, 0):
+                    raise ValueError(
+                        f"Étape {stage.name}: {amount} {resource} demandé(s), budget {self.budget.get(resource, 0)}"
+                    )
+
+    def select(self, names, include_deps=False):
+        """Sous-pipeline limité aux étapes choisies (dépendances hors sélection supposées à jour)."""
+        unknown = [name for name in names if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Étapes inconnues: {', '.join(unknown)}")
+
+        selected = set(names)
+        if include_deps:
+            pending = list(names)
+            while pending:
+                for dep in self.stages[pending.pop()].deps:
+                    if dep in self.stages and dep not in selected:
+                        selected.add(dep)
+                        pending.append(dep)
+
+        return PipelineDAG([self.stages[name] for name in self.order if name in selected], self.budget, self.admission)
+
+    def _fits(self, stage, in_use):
+        """Indique si les ressources de l'étape sont disponibles."""
+        return all(in_use[r] + amount <= self.budget.get(r, 0) for r, amount in stage.resources.items())
+
+    def _admits(self, stage, running):
+        """Contrôle d'admission (mémoire / CPU mesurés) en plus du budget statique."""
+        if self.admission is None:
+            return True
+        return self.admission.admit(stage, [s.name for s in running.values()])
+
+    def _run_stage(self, stage):
+        """Exécute une étape en capturant les exceptions."""
+        start_time = time.time()
+        try:
+            with span(f"pipeline.{stage.name}"):
+                result = stage.run()
+        except Exception as e:
+            print(f"💥 {stage.description} failed with exception: {e}")
+            result = {'success': False, 'output': '', 'error': str(e)}
+        finally:
+            flush_trace()
+        result = dict(result or {'success': False, 'error': 'No result'})
+        result.setdefault('duration', time.time() - start_time)
+        return result
+
+    def run(self):
+        """Exécute le pipeline et retourne {étape: résultat} dans l'ordre topologique."""
+        results = {}
+        pending = list(self.order)
+        running = {}
+        in_use = Counter()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(self.stages))) as executor:
+            while pending or running:
+                deferred = False
+                for name in list(pending):
+                    stage = self.stages[name]
+                    deps = [dep for dep in stage.deps if dep in self.stages]
+
+                    failed = [dep for dep in deps if dep in results and not results[dep]['success']]
+                    if failed:
+                        print(f"⏭️ {stage.description} skipped ({', '.join(failed)} failed)")
+                        results[name] = {
+                            'success': False,
+                            'duration': 0,
+                            'output': '',
+                            'error': f"Skipped: dependency {', '.join(failed)} failed"
+                        }
+                        pending.remove(name)
+                        continue
+
+                    if all(dep in results for dep in deps) and self._fits(stage, in_use):
+                        if not self._admits(stage, running):
+                            deferred = True
+                            continue
+                        in_use.update(stage.resources)
+                        running[executor.submit(self._run_stage, stage)] = stage
+                        pending.remove(name)
+                        self.peak_concurrency = max(self.peak_concurrency, len(running))
+
+                if not running:
+                    break
+
+                # Étape refusée faute de marge: réévaluer périodiquement, pas seulement à la fin d'une étape
+                done, _ = concurrent.futures.wait(running, timeout=ADMISSION_RECHECK if deferred else None,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    in_use.subtract(stage.resources)
+                    results[stage.name] = future.result()
+
+        return {name: results[name] for name in self.order if name in results}
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Progress Channel - Canal d'événements de progression des scrapers
+Les scrapers émettent des événements JSON (une ligne par événement) sur une
+socket locale dont l'adresse est transmise par variable d'environnement;
+l'orchestrateur les reçoit sans délai de polling et affiche un tableau de bord
+multi-sources.
+
+Événements: message (texte libre de write_progress), plan (liste des marques),
+brand_started, brand_done (modèles, durée, attente), finished.
+
+Sans orchestrateur (variable absente), ProgressEmitter.emit() retourne False
+et les scrapers gardent leur fichier progress_*.txt.
+"""
+
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+PROGRESS_ENV = "ALLCARS_PROGRESS"
+PROGRESS_SOURCE_ENV = "ALLCARS_PROGRESS_SOURCE"
+
+# Intervalle minimal entre deux lignes d'ETA d'une source (affichage ligne à ligne)
+ETA_PRINT_INTERVAL = 60
+
+
+class ProgressEmitter:
+    """Côté scraper: envoie des événements JSON à l'orchestrateur s'il écoute."""
+
+    def __init__(self, source):
+        self.source = os.environ.get(PROGRESS_SOURCE_ENV, source)
+        self.address = os.environ.get(PROGRESS_ENV)
+        self._sock = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        host, port = self.address.rsplit(':', 1)
+        self._sock = socket.create_connection((host, int(port)), timeout=2)
+
+    def emit(self, event, **fields):
+        """Envoie un événement; retourne False si aucun orchestrateur n'écoute."""
+        if not self.address:
+            return False
+        payload = {'source': self.source, 'event': event, 'ts': time.time(), **fields}
+        line = (json.dumps(payload, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._sock.sendall(line)
+                return True
+            except OSError:
+                # Orchestrateur absent ou arrêté: repli sur le fichier de progression
+                self.address = None
+                self._sock = None
+                return False
+
+    def close(self):
+        """Ferme la connexion."""
+        with self._lock:
+            if self._sock is not None:
+                try:
+                    self._sock.close()
+                except OSError:
+                    pass
+                self._sock = None
+
+
+def _format_elapsed(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+
+class ProgressDashboard:
+    """Tableau de bord multi-sources: redessiné en place sur un terminal, ligne à ligne sinon."""
+
+    def __init__(self, stream=None, live=None, eta=None):
+        self.stream = stream or sys.stdout
+        self.live = self.stream.isatty() if live is None else live
+        self.eta = eta
+        self.sources = {}
+        self._drawn = 0
+        self._lock = threading.Lock()
+
+    def register(self, source, label, emoji=''):
+        """Déclare une source affichée dans le tableau de bord."""
+        with self._lock:
+            self.sources[source] = {
+                'label': label,
+                'emoji': emoji,
+                'status': 'running',
+                'start': time.time(),
+                'index': 0,
+                'total': 0,
+                'brand': '',
+                'models': 0,
+                'message': '',
+                'messages': [],
+                'eta_printed': time.time()
+            }
+            self._render()
+
+    def finish(self, source, success):
+        """Marque une source comme terminée."""
+        with self._lock:
+            if source in self.sources:
+                self.sources[source]['status'] = 'done' if success else 'failed'
+                self._render()
+
+    def messages(self, source):
+        """Tous les messages reçus d'une source (répétitions comprises)."""
+        return list(self.sources.get(source, {}).get('messages', []))
+
+    def log(self, text):
+        """Affiche une ligne au-dessus du tableau de bord."""
+        with self._lock:
+            self._clear()
+            self.stream.write(text + '\n')
+            self._render()
+
+    def handle(self, event):
+        """Met à jour l'état d'une source à partir d'un événement."""
+        with self._lock:
+            if self.eta:
+                self.eta.handle(event)
+            state = self.sources.get(event.get('source'))
+            if state is None:
+                return
+            kind = event.get('event')
+            if kind == 'message':
+                state['message'] = event.get('text', '')
+                state['messages'].append(state['message'])
+                if not self.live:
+                    self.stream.write(f"  {state['emoji']} {state['message']}\n")
+            elif kind == 'brand_started':
+                state['brand'] = event.get('brand', '')
+                state['index'] = event.get('index', state['index'])
+                state['total'] = event.get('total', state['total'])
+            elif kind == 'brand_done':
+                state['models'] += event.get('models', 0)
+                if self.eta and not self.live and time.time() - state['eta_printed'] >= ETA_PRINT_INTERVAL:
+                    state['eta_printed'] = time.time()
+                    self.stream.write(f"  ⏳ {state['emoji']} {state['label']}: "
+                                      f"{self.eta.describe(event['source'])}\n")
+            self._render()
+
+    def _line(self, source, state):
+        icon = {'running': '⏳', 'done': '✅', 'failed': '❌'}[state['status']]
+        percent = f"{100 * state['index'] / state['total']:3.0f}%" if state['total'] else "  -"
+        eta = ""
+        if self.eta and state['status'] == 'running' and self.eta.describe(source):
+            eta = f"  {self.eta.describe(source)}"
+        return (f"{icon} {state['emoji']} {state['label'][:28]:<28} "
+                f"[{state['index']:>4}/{state['total'] or '?':>4}] {percent} "
+                f"{state['brand'][:18]:<18} {state['models']:>6} modèles  "
+                f"{_format_elapsed(time.time() - state['start'])}{eta}  {state['message'][:40]}")
+
+    def _clear(self):
+        if self.live and self._drawn:
+            self.stream.write(f"\033[{self._drawn}F\033[J")
+            self._drawn = 0
+
+    def _render(self):
+        if not self.live:
+            self.stream.flush()
+            return
+        self._clear()
+        for source, state in self.sources.items():
+            self.stream.write(self._line(source, state) + '\033[K\n')
+        self._drawn = len(self.sources)
+        if self.eta:
+            self.stream.write(f"⏱️ Pipeline: {self.eta.describe()}\033[K\n")
+            self._drawn += 1
+        self.stream.flush()
+
+
+class _DashboardStream:
+    """Remplace sys.stdout pendant l'affichage en place: les print() passent au-dessus du tableau de bord."""
+
+    def __init__(self, dashboard):
+        self.dashboard = dashboard
+        self._buffer = ''
+
+    def write(self, text):
+        self._buffer += text
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            self.dashboard.log(line)
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self.dashboard.log(self._buffer)
+            self._buffer = ''
+
+    def isatty(self):
+        return False
+
+
+class ProgressServer:
+    """Côté orchestrateur: socket locale qui reçoit les événements et alimente le tableau de bord."""
+
+    def __init__(self, dashboard=None):
+        self.dashboard = dashboard or ProgressDashboard()
+        self.events = queue.Queue()
+        self._open = {}
+        self._unidentified = 0
+        self._cond = threading.Condition()
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.bind(('127.0.0.1', 0))
+        self._listener.listen()
+        self.address = "%s:%d" % self._listener.getsockname()
+        self._threads = []
+        self._stdout = None
+
+    def __enter__(self):
+        if self.dashboard.live and sys.stdout is self.dashboard.stream:
+            self._stdout = sys.stdout
+            sys.stdout = _DashboardStream(self.dashboard)
+        self._threads = [
+            threading.Thread(target=self._accept_loop, name="progress-accept", daemon=True),
+            threading.Thread(target=self._consume_loop, name="progress-dashboard", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def env_for(self, source):
+        """Variables d'environnement à transmettre au scraper d'une source."""
+        return {PROGRESS_ENV: self.address, PROGRESS_SOURCE_ENV: source}
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            with self._cond:
+                self._unidentified += 1
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _read_loop(self, conn):
+        source = None
+        with conn, conn.makefile('r', encoding='utf-8', errors='replace') as reader:
+            for line in reader:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if source is None:
+                    source = event.get('source')
+                    with self._cond:
+                        self._unidentified -= 1
+                        self._open[source] = self._open.get(source, 0) + 1
+                self.events.put(event)
+        with self._cond:
+            if source is None:
+                self._unidentified -= 1
+            else:
+                self._open[source] -= 1
+            self._cond.notify_all()
+
+    def _consume_loop(self):
+        while True:
+            event = self.events.get()
+            try:
+                if event is None:
+                    return
+                self.dashboard.handle(event)
+            finally:
+                self.events.task_done()
+
+    def drain(self, source, timeout=5):
+        """Attend que les connexions d'une source soient fermées et ses événements affichés."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._open.get(source) and not self._unidentified, timeout=timeout)
+        self.events.join()
+
+    def close(self):
+        """Arrête l'écoute et le tableau de bord."""
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+        self.events.put(None)
+        for thread in self._threads:
+            thread.join(timeout=2)
+        if self._stdout is not None:
+            sys.stdout.flush()
+            sys.stdout = self._stdout
+            self._stdout = None
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Result Writer - Post-traitement en une passe des résultats d'un scraping
+Un ScrapeResult garde le document du snapshot en mémoire avec ce qui en est
+dérivé une seule fois (empreinte canonique, totaux par marque). Toutes les
+sorties en sont tirées sans relire le fichier écrit: JSON, Markdown, base
+SQLite, historique compact, journal et manifeste, rapport de versioning.
+
+Les écritures indépendantes tournent en parallèle (threads):
+
+    JSON ─────────────┬──> journal + manifeste
+    index SQLite ─────┴──> rapport (versioning, historique docs/)
+    Markdown
+    historique compact (as24, cargurus)
+
+Usage (dans un scraper):
+    result = ScrapeResult("as24", result_data)
+    existing = result.unchanged()
+    output_file = existing or result.write(markdown=self.generate_markdown_version)
+"""
+
+import concurrent.futures
+from datetime import datetime
+
+from data_storage import save_json
+from snapshot_db import index_snapshot
+from snapshot_history import record_version
+from snapshot_io import canonical_hash, record_snapshot, unchanged_snapshot
+
+# JSON, Markdown, index SQLite et historique compact écrits simultanément
+WRITERS = 4
+
+
+def brand_statistics(brands_models):
+    """Totaux des métadonnées d'un snapshot, en un seul parcours des marques."""
+    total_models = brands_with_models = 0
+    for models in brands_models.values():
+        total_models += len(models)
+        brands_with_models += bool(models)
+    return {
+        "total_brands": len(brands_models),
+        "total_models": total_models,
+        "brands_with_models": brands_with_models,
+        "brands_without_models": len(brands_models) - brands_with_models
+    }
+
+
+def snapshot_path(source):
+    """Nom d'un nouveau snapshot horodaté de la source."""
+    return f"data/{source}_scraped_models_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+
+class ScrapeResult:
+    """Snapshot d'une source en mémoire et valeurs dérivées partagées par toutes les sorties."""
+
+    def __init__(self, source, document):
+        self.source = source
+        self.document = document
+        self.metadata = document["metadata"]
+        self.brands_models = document.get("brands_models", {})
+        self.digest = canonical_hash(self.brands_models)
+        self.output_file = None
+        self.md_file = None
+        self.report = None
+
+    def unchanged(self):
+        """Dernier snapshot de la source s'il a le même contenu (rien à écrire), None sinon."""
+        return unchanged_snapshot(self.source, self.document, digest=self.digest)
+
+    def write(self, output_file=None, markdown=None, report=None):
+        """Écrit le snapshot et ses dérivés; retourne le fichier JSON.
+
+        markdown(document, fichier JSON) écrit la version Markdown et retourne son chemin.
+        report(result) est appelé dès que le snapshot est indexé (rapport de versioning,
+        historique des exécutions), pendant que les autres écritures se terminent.
+        """
+        self.output_file = str(output_file or snapshot_path(self.source))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=WRITERS) as executor:
+            written = executor.submit(save_json, self.output_file, self.document)
+            indexed = executor.submit(index_snapshot, self.source, self.output_file, self.document, self.digest)
+            pending = [executor.submit(record_version, self.source, self.output_file, self.document)]
+            if markdown:
+                md_written = executor.submit(markdown, self.document, self.output_file)
+                pending.append(md_written)
+
+            written.result()
+            indexed.result()
+            # Le manifeste décrit le fichier écrit; le snapshot est déjà indexé quand il devient le dernier
+            pending.append(executor.submit(record_snapshot, self.source, self.output_file, self.document,
+                                           digest=self.digest))
+            if report:
+                self.report = report(self)
+            for task in pending:
+                task.result()
+            if markdown:
+                self.md_file = md_written.result()
+        return self.output_file
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Scheduler Daemon - Mise à jour automatique des sources à cadence fixe
+Mode non interactif de update_all.py: chaque source a sa propre période de
+rafraîchissement (AS24 hebdomadaire, Carfolio mensuel...). Les sources dues
+sont scrapées ensemble via l'orchestrateur (DAG, progression, cache) puis
+consolidées; un seul lot tourne à la fois, dans la limite de --max-concurrent
+navigateurs.
+
+La table des jobs (dernière exécution, statut, prochaine échéance) est stockée
+dans data/scheduler_jobs.json. Les échéances manquées pendant un arrêt sont
+rattrapées en une seule exécution au redémarrage.
+
+Usage:
+    python scheduler_daemon.py                         # Boucle continue
+    python scheduler_daemon.py --once                  # Exécuter les sources dues puis quitter (cron)
+    python scheduler_daemon.py --status                # Table des jobs
+    python scheduler_daemon.py --cadence as24=3d --cadence carfolio=60d
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pipeline_dag import SCRAPER_STAGES, stage_spec
+
+JOBS_FILE = Path("data/scheduler_jobs.json")
+LOCK_FILE = Path("data/.scheduler.lock")
+
+DAY = 86400
+
+# Période de rafraîchissement par source (secondes)
+DEFAULT_CADENCES = {
+    'as24': 7 * DAY,
+    'cguru': 7 * DAY,
+    'autodata': 14 * DAY,
+    'carfolio': 30 * DAY
+}
+
+# Décalage aléatoire de chaque échéance: ±5% de la période, au plus 2 heures
+JITTER_FRACTION = 0.05
+MAX_JITTER = 2 * 3600
+# Attente maximale entre deux vérifications (arrêt propre, modification de la table)
+MAX_SLEEP = 60
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': DAY, 'w': 7 * DAY}
+
+
+def parse_duration(text):
+    """Durée '12h', '7d', '2w' ou nombre de secondes."""
+    text = text.strip().lower()
+    if text and text[-1] in UNITS:
+        return float(text[:-1]) * UNITS[text[-1]]
+    return float(text)
+
+
+def format_timestamp(timestamp):
+    """Horodatage lisible (heure locale)."""
+    if not timestamp:
+        return "-"
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M")
+
+
+def jitter(interval):
+    """Décalage aléatoire d'une échéance pour ne pas solliciter les sites à heure fixe."""
+    spread = min(JITTER_FRACTION * interval, MAX_JITTER)
+    return random.uniform(-spread, spread)
+
+
+class SchedulerLock:
+    """Verrou fichier: un seul daemon (ou cron --once) à la fois, verrou d'un processus mort repris."""
+
+    def __init__(self, lock_file=LOCK_FILE):
+        self.lock_file = Path(lock_file)
+
+    def __enter__(self):
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            try:
+                fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._holder_alive():
+                    raise RuntimeError(f"Scheduler déjà actif ({self.lock_file})")
+                self.lock_file.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            return self
+
+    def _holder_alive(self):
+        try:
+            pid = int(self.lock_file.read_text().strip())
+            os.kill(pid, 0)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def __exit__(self, exc_type, exc, tb):
+        self.lock_file.unlink(missing_ok=True)
+        return False
+
+
+class JobTable:
+    """Table persistante des jobs par source: période, dernière exécution, prochaine échéance."""
+
+    def __init__(self, jobs_file=JOBS_FILE, cadences=None):
+        self.jobs_file = Path(jobs_file)
+        self.jobs = self._load()
+        for source, interval in {**DEFAULT_CADENCES, **(cadences or {})}.items():
+            job = self.jobs.setdefault(source, {'last_run': None, 'last_status': None,
+                                                'last_duration': None, 'next_run': None, 'runs': 0})
+            if (cadences and source in cadences) or 'interval' not in job:
+                job['interval'] = interval
+
+    def _load(self):
+        """Charge la table (vide si absente ou illisible)."""
+        try:
+            with open(self.jobs_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Écrit la table de manière atomique."""
+        self.jobs_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.jobs_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.jobs, f, indent=2, ensure_ascii=False)
+        tmp_file.replace(self.jobs_file)
+
+    def due(self, now, catch_up=True):
+        """Sources dont l'échéance est passée.
+
+        Sans rattrapage, une échéance manquée de plus d'une période est replanifiée
+        à partir de maintenant au lieu d'être exécutée.
+        """
+        due = []
+        for source, job in self.jobs.items():
+            if job['next_run'] is None or job['next_run'] <= now:
+                if not catch_up and job['next_run'] is not None and now - job['next_run'] > job['interval']:
+                    print(f"⏭️ {source}: missed run skipped (catch-up disabled)")
+                    job['next_run'] = now + job['interval'] + jitter(job['interval'])
+                    continue
+                due.append(source)
+        return [source for source in SCRAPER_STAGES if source in due]
+
+    def next_wakeup(self):
+        """Prochaine échéance de la table."""
+        pending = [job['next_run'] for job in self.jobs.values() if job['next_run'] is not None]
+        return min(pending) if pending else time.time()
+
+    def record(self, source, result, finished_at):
+        """Enregistre le résultat d'une exécution et planifie la suivante."""
+        job = self.jobs[source]
+        job['last_run'] = finished_at
+        job['last_status'] = 'success' if result and result.get('success') else 'failed'
+        job['last_duration'] = round(result.get('duration', 0), 1) if result else None
+        job['runs'] += 1
+        # Une source en échec est retentée après un dixième de sa période
+        interval = job['interval'] if job['last_status'] == 'success' else job['interval'] / 10
+        job['next_run'] = finished_at + interval + jitter(interval)
+
+    def display(self):
+        """Affiche la table des jobs."""
+        print(f"{'Source':<10} | {'Période':>8} | {'Dernière exécution':<17} | {'Statut':<8} | {'Prochaine':<17}")
+        print("-" * 75)
+        for source in SCRAPER_STAGES:
+            job = self.jobs.get(source)
+            if not job:
+                continue
+            print(f"{source:<10} | {job['interval'] / DAY:>7.1f}j | {format_timestamp(job['last_run']):<17} | "
+                  f"{job['last_status'] or '-':<8} | {format_timestamp(job['next_run']) if job['next_run'] else 'maintenant':<17}")
+
+
+class SchedulerDaemon:
+    """Boucle de planification: exécute les sources dues par lots, sans chevauchement."""
+
+    def __init__(self, jobs, max_concurrent=2, catch_up=True, force=False):
+        self.jobs = jobs
+        self.max_concurrent = max_concurrent
+        self.catch_up = catch_up
+        self.force = force
+        self.stopping = False
+
+    def stop(self, *_):
+        """Arrêt propre après le lot en cours."""
+        if not self.stopping:
+            print("\n⏹️ Stop requested, finishing current batch...")
+        self.stopping = True
+
+    def run_batch(self, sources):
+        """Scrape les sources dues puis consolide, via l'orchestrateur."""
+        from update_all import AutoScoutOrchestrator
+
+        print(f"\n🗓️ {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%SZ')} - due: "
+              f"{', '.join(stage_spec(source)['description'] for source in sources)}")
+        orchestrator = AutoScoutOrchestrator(budget={'browser': self.max_concurrent, 'cpu': 1}, force=self.force)
+        orchestrator.start_time = time.time()
+        orchestrator.run_stages(sources + ['consolidation'])
+        orchestrator.display_summary()
+
+        finished_at = time.time()
+        for source in sources:
+            self.jobs.record(source, orchestrator.results.get(source), finished_at)
+        self.jobs.save()
+
+    def run_once(self):
+        """Exécute les sources dues; retourne le nombre de sources exécutées."""
+        due = self.jobs.due(time.time(), self.catch_up)
+        self.jobs.save()
+        if due:
+            self.run_batch(due)
+        return len(due)
+
+    def run_forever(self):
+        """Boucle jusqu'à SIGINT / SIGTERM."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        print(f"🕒 Scheduler started (max {self.max_concurrent} concurrent sources)")
+        self.jobs.display()
+
+        while not self.stopping:
+            if self.run_once():
+                self.jobs.display()
+                continue
+            wakeup = self.jobs.next_wakeup()
+            time.sleep(min(MAX_SLEEP, max(1.0, wakeup - time.time())))
+
+        print("👋 Scheduler stopped")
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Mise à jour planifiée des sources (mode non interactif)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python scheduler_daemon.py                              # Boucle continue
+  python scheduler_daemon.py --once                       # Pour cron: sources dues puis sortie
+  python scheduler_daemon.py --cadence as24=3d --max-concurrent 1
+        """
+    )
+    parser.add_argument('--once', action='store_true', help='Exécuter les sources dues puis quitter')
+    parser.add_argument('--status', action='store_true', help='Afficher la table des jobs')
+    parser.add_argument('--cadence', action='append', default=[], metavar='SOURCE=PERIODE',
+                        help='Période d\'une source (ex: as24=7d, carfolio=30d, cguru=12h)')
+    parser.add_argument('--max-concurrent', type=int, default=2,
+                        help='Nombre maximal de scrapers simultanés')
+    parser.add_argument('--no-catch-up', action='store_true',
+                        help='Ne pas rattraper les échéances manquées pendant un arrêt')
+    parser.add_argument('--force', action='store_true',
+                        help='Ré-exécuter la consolidation même si ses entrées sont inchangées')
+    args = parser.parse_args()
+
+    cadences = {}
+    for item in args.cadence:
+        source, _, period = item.partition('=')
+        if source not in DEFAULT_CADENCES or not period:
+            parser.error(f"Cadence invalide: {item} (sources: {', '.join(DEFAULT_CADENCES)})")
+        cadences[source] = parse_duration(period)
+
+    jobs = JobTable(cadences=cadences)
+    if args.status:
+        jobs.display()
+        return
+
+    daemon = SchedulerDaemon(jobs, args.max_concurrent, catch_up=not args.no_catch_up, force=args.force)
+    try:
+        with SchedulerLock():
+            if args.once:
+                if not daemon.run_once():
+                    print("✅ Nothing due")
+                jobs.display()
+            else:
+                daemon.run_forever()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
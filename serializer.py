@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Serializer - Sérialisation JSON interchangeable (orjson si installé, json sinon)
+Deux modes d'écriture:
+
+    compact  sans indentation ni espaces, pour les fichiers lus par programme
+             (snapshots, spécifications techniques, export web-ready)
+    pretty   indentation de 2 espaces, pour les fichiers ouverts à la main
+
+Le backend est choisi par la variable d'environnement ALLCARS_JSON_BACKEND
+(auto par défaut: orjson s'il est installé, sinon json de la bibliothèque
+standard). D'autres backends peuvent être ajoutés avec register_backend().
+Les deux backends produisent du JSON UTF-8 équivalent; en mode pretty la
+sortie est celle de json.dump(..., indent=2, ensure_ascii=False).
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND_ENV = "ALLCARS_JSON_BACKEND"
+
+BACKENDS = {}
+
+
+def register_backend(name, dumps, loads):
+    """Déclare un backend: dumps(data, pretty) -> bytes, loads(bytes) -> document."""
+    BACKENDS[name] = (dumps, loads)
+
+
+def _json_dumps(data, pretty):
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    # Sans indentation, json utilise son encodeur C (l'indentation force l'encodeur Python)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+register_backend('json', _json_dumps, json.loads)
+
+if orjson is not None:
+    def _orjson_dumps(data, pretty):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, option=option)
+
+    register_backend('orjson', _orjson_dumps, orjson.loads)
+
+
+def backend_name():
+    """Backend demandé par ALLCARS_JSON_BACKEND (auto: orjson s'il est installé)."""
+    name = os.environ.get(BACKEND_ENV, 'auto').strip().lower() or 'auto'
+    if name == 'auto':
+        return 'orjson' if 'orjson' in BACKENDS else 'json'
+    if name not in BACKENDS:
+        raise ValueError(f"{BACKEND_ENV}={name}: backends disponibles {', '.join(['auto', *BACKENDS])}")
+    return name
+
+
+def dumps(data, pretty=False, backend=None):
+    """Document -> octets JSON UTF-8."""
+    return BACKENDS[backend or backend_name()][0](data, pretty)
+
+
+def loads(raw, backend=None):
+    """Octets (ou texte) JSON -> document."""
+    return BACKENDS[backend or backend_name()][1](raw)
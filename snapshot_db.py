@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Snapshot DB - Historique des snapshots dans une base SQLite indexée
+Chaque snapshot est stocké en lignes (source, snapshot, marque, modèle) dans
+data/snapshots.db: le dernier snapshot d'une source, les différences par
+marque et les requêtes sur plusieurs snapshots deviennent des requêtes
+indexées au lieu de relire des fichiers JSON complets.
+
+Les fichiers *_scraped_models_*.json restent écrits (cache de build, outils
+existants) et sont importés automatiquement: un snapshot écrit par un scraper
+est indexé à l'écriture, les fichiers antérieurs au premier accès. N'importe
+quel snapshot peut être ré-exporté au format JSON d'origine. Chaque snapshot
+indexé (à l'écriture ou à l'import) publie ses changements par rapport au
+snapshot indexé précédent dans le flux change_feed.py.
+
+Usage:
+    python snapshot_db.py                                # Snapshots indexés par source
+    python snapshot_db.py import                         # Importer les fichiers JSON existants
+    python snapshot_db.py diff as24                      # Changements du dernier snapshot
+    python snapshot_db.py diff as24 20251101_080000 20251113_080000
+    python snapshot_db.py history as24 BMW               # Nombre de modèles par snapshot
+    python snapshot_db.py find "Model 3"                 # Snapshots/sources contenant un modèle
+    python snapshot_db.py export as24 [--version V] [--output FICHIER]
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from brand_timings import list_snapshots
+from change_feed import publish, snapshot_events
+from data_storage import load_json, save_json
+from snapshot_io import canonical_hash
+from snapshot_manifest import latest_entry
+
+SNAPSHOT_DB = Path("data/snapshots.db")
+
+# Préfixes de fichiers des sources
+SOURCE_PREFIXES = ['as24', 'cargurus', 'autodata', 'carfolio']
+
+VERSION_PATTERN = re.compile(r"_scraped_models_(\d{8}_\d{6})\.json$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    version TEXT NOT NULL,
+    file TEXT,
+    scraped_at TEXT,
+    content_hash TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    extra TEXT NOT NULL,
+    UNIQUE (source, version)
+);
+CREATE TABLE IF NOT EXISTS brands (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    brand TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, brand)
+);
+CREATE TABLE IF NOT EXISTS models (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    brand TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS models_by_snapshot ON models(snapshot_id, brand);
+CREATE INDEX IF NOT EXISTS models_by_name ON models(name);
+CREATE INDEX IF NOT EXISTS snapshots_by_source ON snapshots(source, version);
+CREATE TABLE IF NOT EXISTS timeline (
+    source TEXT NOT NULL,
+    version TEXT NOT NULL,
+    PRIMARY KEY (source, version)
+);
+CREATE TABLE IF NOT EXISTS model_intervals (
+    source TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    name TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (source, brand, name, first_seen)
+);
+CREATE INDEX IF NOT EXISTS intervals_by_brand ON model_intervals(source, brand, last_seen);
+CREATE INDEX IF NOT EXISTS intervals_by_name ON model_intervals(name);
+"""
+
+
+def version_of(snapshot_file):
+    """Version YYYYMMDD_HHMMSS d'un fichier snapshot, None si le nom ne suit pas le format."""
+    match = VERSION_PATTERN.search(Path(snapshot_file).name)
+    return match.group(1) if match else None
+
+
+class SnapshotStore:
+    """Snapshots en lignes SQLite: import, dernier snapshot, différences, export JSON."""
+
+    def __init__(self, db_path=SNAPSHOT_DB, data_dir="data"):
+        self.db_path = Path(db_path)
+        self.data_dir = Path(data_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def add(self, source, document, version=None, snapshot_file=None, content_hash=None):
+        """Indexe un snapshot (ignoré s'il est déjà présent); retourne son identifiant."""
+        version = version or (version_of(snapshot_file) if snapshot_file else None) \
+            or datetime.now().strftime("%Y%m%d_%H%M%S")
+        existing = self.conn.execute("SELECT id FROM snapshots WHERE source = ? AND version = ?",
+                                     (source, version)).fetchone()
+        if existing:
+            return existing['id']
+
+        brands_models = document.get("brands_models", {})
+        metadata = document.get("metadata", {})
+        extra = {key: value for key, value in document.items() if key not in ("metadata", "brands_models")}
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO snapshots (source, version, file, scraped_at, content_hash, metadata, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (source, version, str(snapshot_file) if snapshot_file else None, metadata.get("scraped_at"),
+                 content_hash or canonical_hash(brands_models), json.dumps(metadata, ensure_ascii=False),
+                 json.dumps(extra, ensure_ascii=False))
+            )
+            snapshot_id = cursor.lastrowid
+            self.conn.executemany("INSERT INTO brands (snapshot_id, position, brand) VALUES (?, ?, ?)",
+                                  [(snapshot_id, i, brand) for i, brand in enumerate(brands_models)])
+            self.conn.executemany(
+                "INSERT INTO models (snapshot_id, brand, position, name) VALUES (?, ?, ?, ?)",
+                [(snapshot_id, brand, i, model)
+                 for brand, models in brands_models.items() for i, model in enumerate(models)]
+            )
+            self._update_intervals(source, version, snapshot_id)
+        self._publish_changes(source, version, brands_models)
+        return snapshot_id
+
+    def _publish_changes(self, source, version, brands_models):
+        """Publie les changements d'un snapshot qui vient d'être indexé par rapport au précédent indexé.
+
+        Un snapshot plus ancien que le dernier indexé (archive importée après coup) ne
+        publie rien: ses changements sont déjà couverts par les événements suivants.
+        """
+        if self.latest(source)['version'] != version:
+            return
+        previous = self.latest_before(source, version)
+        previous_models = self.brands_models(previous['id']) if previous else {}
+        publish(snapshot_events(source, previous_models, brands_models, version))
+
+    def _update_intervals(self, source, version, snapshot_id):
+        """Étend les intervalles de présence (marque, modèle) avec un nouveau snapshot.
+
+        Un modèle présent dans le snapshot précédent prolonge son intervalle, sinon un
+        nouvel intervalle commence. Un snapshot arrivé dans le désordre (ou une base
+        créée avant la table des intervalles) déclenche la reconstruction de la source.
+        """
+        previous = self.conn.execute("SELECT MAX(version) FROM timeline WHERE source = ?", (source,)).fetchone()[0]
+        indexed = self.conn.execute("SELECT COUNT(*) FROM timeline WHERE source = ?", (source,)).fetchone()[0]
+        snapshots = self.conn.execute("SELECT COUNT(*) FROM snapshots WHERE source = ?", (source,)).fetchone()[0]
+        if (previous is not None and version < previous) or indexed != snapshots - 1:
+            self.rebuild_intervals(source)
+            return
+        self._extend_intervals(source, version, snapshot_id, previous)
+
+    def _extend_intervals(self, source, version, snapshot_id, previous):
+        self.conn.execute("INSERT INTO timeline (source, version) VALUES (?, ?)", (source, version))
+        if previous is not None:
+            self.conn.execute(
+                "UPDATE model_intervals SET last_seen = ? WHERE source = ? AND last_seen = ? "
+                "AND (brand, name) IN (SELECT brand, name FROM models WHERE snapshot_id = ?)",
+                (version, source, previous, snapshot_id))
+        self.conn.execute(
+            "INSERT OR IGNORE INTO model_intervals (source, brand, name, first_seen, last_seen) "
+            "SELECT DISTINCT ?, brand, name, ?, ? FROM models WHERE snapshot_id = ? "
+            "AND (brand, name) NOT IN (SELECT brand, name FROM model_intervals WHERE source = ? AND last_seen = ?)",
+            (source, version, version, snapshot_id, source, version))
+
+    def rebuild_intervals(self, source):
+        """Reconstruit les intervalles d'une source à partir de tous ses snapshots."""
+        self.conn.execute("DELETE FROM timeline WHERE source = ?", (source,))
+        self.conn.execute("DELETE FROM model_intervals WHERE source = ?", (source,))
+        previous = None
+        for row in self.conn.execute("SELECT id, version FROM snapshots WHERE source = ? ORDER BY version",
+                                     (source,)).fetchall():
+            self._extend_intervals(source, row['version'], row['id'], previous)
+            previous = row['version']
+
+    def add_file(self, source, snapshot_file):
+        """Indexe un fichier snapshot s'il ne l'est pas déjà."""
+        version = version_of(snapshot_file)
+        if version and self.find_version(source, version):
+            return self.find_version(source, version)['id']
+        return self.add(source, load_json(snapshot_file), version, snapshot_file)
+
+    def sync(self, source, full=False):
+        """Importe les fichiers JSON de la source qui ne sont pas encore indexés; retourne leur nombre.
+
+        Sans full, data/ n'est parcouru que si le dernier snapshot du manifeste n'est pas indexé.
+        """
+        known = {row['version'] for row in
+                 self.conn.execute("SELECT version FROM snapshots WHERE source = ?", (source,))}
+        latest = latest_entry(source, "scraped_models", self.data_dir)
+        if not full and (latest is None or latest['version'] in known):
+            # Dernier snapshot du manifeste déjà indexé: pas de parcours de data/
+            return 0
+        imported = 0
+        for version, snapshot_file in list_snapshots(source, self.data_dir, include_archived=full):
+            if version in known:
+                continue
+            try:
+                self.add_file(source, snapshot_file)
+                imported += 1
+            except (OSError, ValueError):
+                continue
+        return imported
+
+    def versions(self, source):
+        """Snapshots d'une source, du plus ancien au plus récent."""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT id, version, file, scraped_at, content_hash FROM snapshots WHERE source = ? ORDER BY version",
+            (source,))]
+
+    def find_version(self, source, version):
+        row = self.conn.execute("SELECT id, version, file, scraped_at, content_hash FROM snapshots "
+                                "WHERE source = ? AND version = ?", (source, version)).fetchone()
+        return dict(row) if row else None
+
+    def latest(self, source, offset=0):
+        """Dernier snapshot d'une source (offset=1: l'avant-dernier), None s'il n'y en a pas."""
+        row = self.conn.execute("SELECT id, version, file, scraped_at, content_hash FROM snapshots "
+                                "WHERE source = ? ORDER BY version DESC LIMIT 1 OFFSET ?",
+                                (source, offset)).fetchone()
+        return dict(row) if row else None
+
+    def latest_before(self, source, version):
+        """Snapshot précédant une version, None s'il n'y en a pas."""
+        row = self.conn.execute("SELECT id, version, file, scraped_at, content_hash FROM snapshots "
+                                "WHERE source = ? AND version < ? ORDER BY version DESC LIMIT 1",
+                                (source, version)).fetchone()
+        return dict(row) if row else None
+
+    def brands_models(self, snapshot_id, brands=None):
+        """{marque: modèles} d'un snapshot, dans l'ordre d'origine (éventuellement limité à des marques)."""
+        brand_filter, params = "", [snapshot_id]
+        if brands:
+            brand_filter = f" AND brand IN ({','.join('?' * len(brands))})"
+            params += list(brands)
+        result = {row['brand']: [] for row in self.conn.execute(
+            f"SELECT brand FROM brands WHERE snapshot_id = ?{brand_filter} ORDER BY position", params)}
+        for row in self.conn.execute(f"SELECT brand, name FROM models WHERE snapshot_id = ?"
+                                     f"{brand_filter} ORDER BY brand, position", params):
+            result[row['brand']].append(row['name'])
+        return result
+
+    def counts(self, snapshot_id):
+        """(nombre de marques, nombre de modèles distincts par marque) d'un snapshot."""
+        brands = self.conn.execute("SELECT COUNT(*) FROM brands WHERE snapshot_id = ?", (snapshot_id,)).fetchone()[0]
+        models = self.conn.execute("SELECT COUNT(*) FROM (SELECT DISTINCT brand, name FROM models "
+                                   "WHERE snapshot_id = ?)", (snapshot_id,)).fetchone()[0]
+        return brands, models
+
+    def document(self, snapshot_id):
+        """Snapshot complet au format JSON d'origine."""
+        row = self.conn.execute("SELECT metadata, extra FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        if row is None:
+            return None
+        return {"metadata": json.loads(row['metadata']), "brands_models": self.brands_models(snapshot_id),
+                **json.loads(row['extra'])}
+
+    def diff(self, old_id, new_id):
+        """Différences entre deux snapshots: marques ajoutées/supprimées, modèles ajoutés/supprimés par marque."""
+        def brand_set(snapshot_id):
+            return {row[0] for row in self.conn.execute("SELECT brand FROM brands WHERE snapshot_id = ?",
+                                                        (snapshot_id,))}
+
+        def model_changes(left, right):
+            changes = {}
+            for row in self.conn.execute(
+                    "SELECT brand, name FROM models WHERE snapshot_id = ? AND (brand, name) NOT IN "
+                    "(SELECT brand, name FROM models WHERE snapshot_id = ?) ORDER BY brand, position",
+                    (left, right)):
+                changes.setdefault(row['brand'], []).append(row['name'])
+            return changes
+
+        old_brands, new_brands = brand_set(old_id), brand_set(new_id)
+        return {
+            'new_brands': sorted(new_brands - old_brands),
+            'removed_brands': sorted(old_brands - new_brands),
+            'added_models': model_changes(new_id, old_id),
+            'removed_models': model_changes(old_id, new_id)
+        }
+
+    def brand_history(self, source, brand):
+        """Nombre de modèles d'une marque dans chaque snapshot de la source."""
+        return [(row['version'], row['n']) for row in self.conn.execute(
+            "SELECT s.version, COUNT(m.name) AS n FROM snapshots s "
+            "JOIN brands b ON b.snapshot_id = s.id AND b.brand = ? "
+            "LEFT JOIN models m ON m.snapshot_id = s.id AND m.brand = b.brand "
+            "WHERE s.source = ? GROUP BY s.id ORDER BY s.version", (brand, source))]
+
+    def find_model(self, name):
+        """(source, première version, dernière version, marque) des snapshots contenant un modèle."""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT s.source, m.brand, MIN(s.version) AS first_seen, MAX(s.version) AS last_seen, "
+            "COUNT(DISTINCT s.id) AS snapshots FROM models m JOIN snapshots s ON s.id = m.snapshot_id "
+            "WHERE m.name = ? GROUP BY s.source, m.brand ORDER BY s.source", (name,))]
+
+
+def index_snapshot(source, snapshot_file, document, content_hash=None):
+    """Indexe un snapshot qui vient d'être écrit et publie ses changements (appelé par les scrapers)."""
+    version = version_of(snapshot_file) or datetime.now().strftime("%Y%m%d_%H%M%S")
+    try:
+        with SnapshotStore() as store:
+            # Les fichiers non indexés (dont celui-ci) sont importés et publiés dans l'ordre des versions
+            store.sync(source)
+            store.add(source, document, version, snapshot_file, content_hash)
+    except sqlite3.Error as e:
+        print(f"⚠️ Indexation SQLite impossible pour {snapshot_file}: {e}")
+
+
+def previous_snapshot(source, offset=0, brands=None, data_dir="data", db_path=SNAPSHOT_DB):
+    """(fichier, {marque: modèles}) du dernier snapshot (offset=1: l'avant-dernier), (None, None) sinon."""
+    with SnapshotStore(db_path, data_dir) as store:
+        store.sync(source)
+        snapshot = store.latest(source, offset)
+        if snapshot is None:
+            return None, None
+        return snapshot['file'] or snapshot['version'], store.brands_models(snapshot['id'], brands)
+
+
+def latest_document(source, data_dir="data", db_path=SNAPSHOT_DB):
+    """(fichier, document) du dernier snapshot d'une source, (None, None) s'il n'y en a pas."""
+    with SnapshotStore(db_path, data_dir) as store:
+        store.sync(source)
+        latest = store.latest(source)
+        if latest is None:
+            return None, None
+        return latest['file'], store.document(latest['id'])
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Historique des snapshots dans une base SQLite indexée",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python snapshot_db.py import                          # Indexer les snapshots JSON existants
+  python snapshot_db.py diff as24                       # Dernier snapshot vs précédent
+  python snapshot_db.py history cargurus Tesla
+  python snapshot_db.py export as24 --version 20251113_080000 --output /tmp/as24.json
+        """
+    )
+    parser.add_argument('--db', default=str(SNAPSHOT_DB), help='Base SQLite')
+    subparsers = parser.add_subparsers(dest='command')
+
+    subparsers.add_parser('import', help='Importer les fichiers JSON existants')
+
+    diff_parser = subparsers.add_parser('diff', help='Différences entre deux snapshots')
+    diff_parser.add_argument('source', choices=SOURCE_PREFIXES)
+    diff_parser.add_argument('old', nargs='?', help='Version de départ (défaut: avant-dernière)')
+    diff_parser.add_argument('new', nargs='?', help='Version d\'arrivée (défaut: dernière)')
+
+    history_parser = subparsers.add_parser('history', help='Modèles d\'une marque par snapshot')
+    history_parser.add_argument('source', choices=SOURCE_PREFIXES)
+    history_parser.add_argument('brand')
+
+    find_parser = subparsers.add_parser('find', help='Snapshots contenant un modèle')
+    find_parser.add_argument('model')
+
+    export_parser = subparsers.add_parser('export', help='Exporter un snapshot au format JSON')
+    export_parser.add_argument('source', choices=SOURCE_PREFIXES)
+    export_parser.add_argument('--version', help='Version (défaut: dernière)')
+    export_parser.add_argument('--output', help='Fichier de sortie (défaut: data/<source>_scraped_models_<version>.json)')
+
+    args = parser.parse_args()
+
+    with SnapshotStore(args.db) as store:
+        for source in SOURCE_PREFIXES:
+            imported = store.sync(source, full=args.command == 'import')
+            if imported:
+                print(f"📥 {source}: {imported} snapshots importés")
+
+        if args.command == 'diff':
+            new = store.find_version(args.source, args.new) if args.new else store.latest(args.source)
+            old = store.find_version(args.source, args.old) if args.old else store.latest(args.source, 1)
+            if not old or not new:
+                print("❌ Deux snapshots sont nécessaires")
+                return
+            changes = store.diff(old['id'], new['id'])
+            print(f"🔄 {args.source}: {old['version']} → {new['version']}")
+            for brand in changes['new_brands']:
+                print(f"   + {brand} (nouvelle marque)")
+            for brand in changes['removed_brands']:
+                print(f"   - {brand} (marque absente)")
+            for brand, models in changes['added_models'].items():
+                print(f"   {brand}: +{len(models)} ({', '.join(models[:5])}{'...' if len(models) > 5 else ''})")
+            for brand, models in changes['removed_models'].items():
+                print(f"   {brand}: -{len(models)} ({', '.join(models[:5])}{'...' if len(models) > 5 else ''})")
+        elif args.command == 'history':
+            for version, count in store.brand_history(args.source, args.brand):
+                print(f"   {version}: {count} modèles")
+        elif args.command == 'find':
+            for row in store.find_model(args.model):
+                print(f"   {row['source']:<10} {row['brand']:<20} {row['first_seen']} → {row['last_seen']} "
+                      f"({row['snapshots']} snapshots)")
+        elif args.command == 'export':
+            snapshot = store.find_version(args.source, args.version) if args.version else store.latest(args.source)
+            if not snapshot:
+                print(f"❌ Snapshot introuvable: {args.source} {args.version or ''}")
+                return
+            output_file = Path(args.output or f"data/{args.source}_scraped_models_{snapshot['version']}.json")
+            save_json(output_file, store.document(snapshot['id']))
+            print(f"📄 {args.source} {snapshot['version']} exporté: {output_file}")
+        else:
+            for source in SOURCE_PREFIXES:
+                versions = store.versions(source)
+                if not versions:
+                    continue
+                brands, models = store.counts(versions[-1]['id'])
+                print(f"🗄️ {source:<10} {len(versions):>3} snapshots, dernier {versions[-1]['version']} "
+                      f"({brands} marques, {models} modèles)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Snapshot Diff - Différences entre deux snapshots d'une source
+Jointure par fusion de deux flux triés (marque, modèle) lus dans la base
+data/snapshots.db: la mémoire utilisée ne dépend que de la marque en cours,
+pas de la taille des snapshots. Le résultat est écrit au fil de l'eau, en JSON
+ou en Markdown, pour n'importe quelle source et n'importe quelle paire de
+versions (ou de fichiers snapshot, indexés au passage).
+
+Usage:
+    python snapshot_diff.py as24                                  # Avant-dernier vs dernier
+    python snapshot_diff.py as24 20251101_080000 20251113_080000
+    python snapshot_diff.py cargurus ancien.json nouveau.json --format markdown --output diff.md
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import serializer
+from snapshot_db import SNAPSHOT_DB, SOURCE_PREFIXES, SnapshotStore
+
+# Nombre de modèles ajoutés + supprimés à partir duquel un changement est "significatif"
+SIGNIFICANT_CHANGES = 3
+
+
+def _brands(store, snapshot_id):
+    return (row[0] for row in store.conn.execute(
+        "SELECT brand FROM brands WHERE snapshot_id = ? ORDER BY brand", (snapshot_id,)))
+
+
+def _models(store, snapshot_id):
+    return ((row[0], row[1]) for row in store.conn.execute(
+        "SELECT DISTINCT brand, name FROM models WHERE snapshot_id = ? ORDER BY brand, name", (snapshot_id,)))
+
+
+class _Cursor:
+    """Itérateur avec lecture anticipée d'un élément."""
+
+    def __init__(self, iterator):
+        self._iterator = iterator
+        self.current = next(iterator, None)
+
+    def advance(self):
+        value = self.current
+        self.current = next(self._iterator, None)
+        return value
+
+
+def diff_snapshots(store, old_id, new_id, include_unchanged=False):
+    """Génère un dict par marque modifiée (ordre alphabétique):
+    {"brand", "status": added|removed|changed|unchanged, "added", "removed", "old_count", "new_count"}.
+    """
+    old_brands, new_brands = _Cursor(_brands(store, old_id)), _Cursor(_brands(store, new_id))
+    old_models, new_models = _Cursor(_models(store, old_id)), _Cursor(_models(store, new_id))
+
+    while old_brands.current is not None or new_brands.current is not None:
+        old_brand, new_brand = old_brands.current, new_brands.current
+        if new_brand is None or (old_brand is not None and old_brand < new_brand):
+            brand, status = old_brands.advance(), 'removed'
+        elif old_brand is None or new_brand < old_brand:
+            brand, status = new_brands.advance(), 'added'
+        else:
+            brand, status = old_brands.advance(), 'changed'
+            new_brands.advance()
+
+        added, removed, old_count, new_count = [], [], 0, 0
+        # Fusion des modèles de la marque (les deux flux sont triés par marque puis modèle)
+        while True:
+            old_model = old_models.current[1] if old_models.current and old_models.current[0] == brand else None
+            new_model = new_models.current[1] if new_models.current and new_models.current[0] == brand else None
+            if old_model is None and new_model is None:
+                break
+            if new_model is None or (old_model is not None and old_model < new_model):
+                removed.append(old_models.advance()[1])
+                old_count += 1
+            elif old_model is None or new_model < old_model:
+                added.append(new_models.advance()[1])
+                new_count += 1
+            else:
+                old_models.advance()
+                new_models.advance()
+                old_count += 1
+                new_count += 1
+
+        if status == 'changed' and not added and not removed:
+            status = 'unchanged'
+            if not include_unchanged:
+                continue
+        yield {"brand": brand, "status": status, "added": added, "removed": removed,
+               "old_count": old_count, "new_count": new_count}
+
+
+class DiffSummary:
+    """Totaux d'une différence, calculés au fil du flux."""
+
+    def __init__(self, store, old_id, new_id):
+        self.old_brands, self.old_models = store.counts(old_id)
+        self.new_brands, self.new_models = store.counts(new_id)
+        self.new_brand_names = []
+        self.removed_brand_names = []
+        self.models_added = 0
+        self.models_removed = 0
+        self.significant_changes = []
+
+    def add(self, change):
+        if change['status'] == 'added':
+            self.new_brand_names.append(change['brand'])
+        elif change['status'] == 'removed':
+            self.removed_brand_names.append(change['brand'])
+        elif len(change['added']) + len(change['removed']) >= SIGNIFICANT_CHANGES:
+            self.significant_changes.append({
+                "brand": change['brand'],
+                "previous_count": change['old_count'],
+                "current_count": change['new_count'],
+                "change": change['new_count'] - change['old_count']
+            })
+        self.models_added += len(change['added'])
+        self.models_removed += len(change['removed'])
+        return change
+
+    def to_dict(self):
+        return {
+            "previous_brands": self.old_brands,
+            "current_brands": self.new_brands,
+            "brand_changes": self.new_brands - self.old_brands,
+            "previous_models": self.old_models,
+            "current_models": self.new_models,
+            "model_changes": self.new_models - self.old_models,
+            "models_added": self.models_added,
+            "models_removed": self.models_removed,
+            "new_brands": self.new_brand_names,
+            "removed_brands": self.removed_brand_names,
+            "significant_changes": self.significant_changes
+        }
+
+
+def latest_changes(source, data_dir="data", db_path=SNAPSHOT_DB):
+    """(snapshot précédent, {marque: changement}, totaux) entre l'avant-dernier et le dernier snapshot indexé.
+
+    Retourne (None, {}, {}) tant que la source n'a qu'un snapshot.
+    """
+    with SnapshotStore(db_path, data_dir) as store:
+        store.sync(source)
+        old, new = store.latest(source, 1), store.latest(source)
+        if old is None:
+            return None, {}, {}
+        summary = DiffSummary(store, old['id'], new['id'])
+        changes = {change['brand']: summary.add(change) for change in diff_snapshots(store, old['id'], new['id'])}
+        return dict(old), changes, summary.to_dict()
+
+
+def _json(value):
+    return serializer.dumps(value).decode('utf-8')
+
+
+def write_json(out, source, old, new, changes, summary):
+    """Écrit la différence en JSON ({"source", "old", "new", "brands", "summary"}), une marque à la fois."""
+    out.write(f'{{"source":{_json(source)},"old":{_json(old["version"])},"new":{_json(new["version"])},"brands":[')
+    for i, change in enumerate(changes):
+        out.write(("," if i else "") + "\n" + _json(summary.add(change)))
+    out.write(f'\n],"summary":{_json(summary.to_dict())}}}\n')
+
+
+def write_markdown(out, source, old, new, changes, summary):
+    """Écrit la différence en Markdown, une marque à la fois."""
+    out.write(f"# 🔄 {source}: {old['version']} → {new['version']}\n\n")
+    out.write("| Marque | Statut | Modèles | Ajoutés | Supprimés |\n|---|---|---|---|---|\n")
+    for change in changes:
+        summary.add(change)
+        out.write(f"| {change['brand']} | {change['status']} | {change['old_count']} → {change['new_count']} | "
+                  f"{', '.join(change['added'])} | {', '.join(change['removed'])} |\n")
+    totals = summary.to_dict()
+    out.write(f"\n**Marques** : {totals['previous_brands']} → {totals['current_brands']} ({totals['brand_changes']:+d})  \n")
+    out.write(f"**Modèles** : {totals['previous_models']} → {totals['current_models']} "
+              f"(+{totals['models_added']} / -{totals['models_removed']})\n")
+
+
+def resolve(store, source, reference, default_offset):
+    """Snapshot désigné par une version, un fichier (indexé au besoin) ou par défaut le dernier / l'avant-dernier."""
+    if reference is None:
+        return store.latest(source, default_offset)
+    if Path(reference).suffix == '.json':
+        snapshot_id = store.add_file(source, reference)
+        row = store.conn.execute("SELECT version FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+        return store.find_version(source, row['version'])
+    return store.find_version(source, reference)
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Différences entre deux snapshots d'une source",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python snapshot_diff.py as24                                    # Avant-dernier vs dernier
+  python snapshot_diff.py cargurus 20251101_080000 20251113_080000 --format markdown
+  python snapshot_diff.py autodata data/autodata_scraped_models_20251101_080000.json --output diff.json
+        """
+    )
+    parser.add_argument('source', choices=SOURCE_PREFIXES)
+    parser.add_argument('old', nargs='?', help='Version ou fichier de départ (défaut: avant-dernier)')
+    parser.add_argument('new', nargs='?', help='Version ou fichier d\'arrivée (défaut: dernier)')
+    parser.add_argument('--format', choices=['json', 'markdown'], default='json')
+    parser.add_argument('--output', help='Fichier de sortie (défaut: sortie standard)')
+    parser.add_argument('--all', action='store_true', help='Inclure les marques inchangées')
+    args = parser.parse_args()
+
+    with SnapshotStore() as store:
+        store.sync(args.source)
+        old = resolve(store, args.source, args.old, 1)
+        new = resolve(store, args.source, args.new, 0)
+        if not old or not new:
+            print("❌ Snapshot introuvable (deux snapshots indexés sont nécessaires)", file=sys.stderr)
+            sys.exit(1)
+
+        changes = diff_snapshots(store, old['id'], new['id'], include_unchanged=args.all)
+        summary = DiffSummary(store, old['id'], new['id'])
+        writer = write_json if args.format == 'json' else write_markdown
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as out:
+                writer(out, args.source, old, new, changes, summary)
+            totals = summary.to_dict()
+            print(f"✅ {args.output}: +{totals['models_added']} / -{totals['models_removed']} modèles, "
+                  f"{len(totals['new_brands'])} nouvelles marques, {len(totals['removed_brands'])} marques absentes")
+        else:
+            writer(sys.stdout, args.source, old, new, changes, summary)
+
+
+if __name__ == "__main__":
+    main()
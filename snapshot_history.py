@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Snapshot History - Historique compact des snapshots AS24 et CarGurus
+Deux snapshots consécutifs ne diffèrent que de quelques modèles: l'historique
+stocke un snapshot complet de base à intervalle régulier, puis pour chaque
+exécution un delta (modèles ajoutés et supprimés par marque, métadonnées et
+timings), en JSON compact:
+
+    data/history/as24/base_20251101_080000.json
+    data/history/as24/delta_20251108_080000.json
+    data/history/as24/delta_20251113_080000.json
+
+Une version est reconstruite à partir de la base qui la précède et des deltas
+suivants (ordre des marques et des modèles compris). "Qu'est-ce qui a changé
+depuis la version X" ne lit que les deltas.
+
+Usage:
+    python snapshot_history.py as24                           # Versions de l'historique
+    python snapshot_history.py as24 --since 20251101_080000   # Changements depuis une version
+    python snapshot_history.py as24 --show 20251108_080000    # Reconstruire une version (JSON)
+    python snapshot_history.py as24 --compact [--prune-json]  # Importer les JSON, reconstruire les bases
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from brand_timings import list_snapshots
+from data_storage import load_json
+from snapshot_db import version_of
+
+HISTORY_DIR = Path("data/history")
+
+# Sources dont les snapshots sont historisés
+HISTORY_SOURCES = ['as24', 'cargurus']
+
+# Un snapshot complet toutes les N versions (reconstruction en au plus N-1 deltas)
+BASE_INTERVAL = 10
+
+
+def compute_delta(previous, current):
+    """Delta entre deux documents snapshot; previous + delta redonne exactement current."""
+    old, new = previous.get("brands_models", {}), current.get("brands_models", {})
+    delta = {"added": {}, "removed": {}, "replaced": {}, "new_brands": [], "removed_brands": []}
+
+    for brand, models in new.items():
+        before = old.get(brand)
+        if before is None:
+            delta["new_brands"].append(brand)
+            if models:
+                delta["added"][brand] = list(models)
+            continue
+        if before == models:
+            continue
+        removed = [m for m in before if m not in models]
+        added = [m for m in models if m not in before]
+        if added:
+            delta["added"][brand] = added
+        if removed:
+            delta["removed"][brand] = removed
+        # Ordre des modèles: liste complète seulement s'il ne suffit pas d'ajouter à la fin
+        if [m for m in before if m in models] + added != models:
+            delta["replaced"][brand] = models
+    delta["removed_brands"] = [brand for brand in old if brand not in new]
+
+    # Ordre des marques: conservé seulement s'il diffère de celui obtenu en appliquant le delta
+    if list(_apply_models(old, delta)) != list(new):
+        delta["brand_order"] = list(new)
+
+    delta["document"] = {key: value for key, value in current.items() if key != "brands_models"}
+    return {key: value for key, value in delta.items() if value}
+
+
+def _apply_models(brands_models, delta):
+    removed_brands = set(delta.get("removed_brands", []))
+    result = {}
+    for brand, models in brands_models.items():
+        if brand in removed_brands:
+            continue
+        if brand in delta.get("replaced", {}):
+            result[brand] = list(delta["replaced"][brand])
+        else:
+            removed = delta.get("removed", {}).get(brand, [])
+            result[brand] = [m for m in models if m not in removed] + delta.get("added", {}).get(brand, [])
+    for brand in delta.get("new_brands", []):
+        result[brand] = list(delta.get("added", {}).get(brand, []))
+    if "brand_order" in delta:
+        result = {brand: result[brand] for brand in delta["brand_order"]}
+    return result
+
+
+def apply_delta(document, delta):
+    """Applique un delta à un document snapshot."""
+    return {**delta.get("document", {}), "brands_models": _apply_models(document.get("brands_models", {}), delta)}
+
+
+class SnapshotHistory:
+    """Historique base + deltas d'une source."""
+
+    def __init__(self, source, history_dir=HISTORY_DIR, base_interval=BASE_INTERVAL):
+        self.source = source
+        self.directory = Path(history_dir) / source
+        self.base_interval = base_interval
+
+    def entries(self):
+        """[(version, 'base' | 'delta', fichier)] du plus ancien au plus récent."""
+        entries = []
+        for kind in ('base', 'delta'):
+            for file in self.directory.glob(f"{kind}_*.json"):
+                entries.append((file.stem.split('_', 1)[1], kind, file))
+        return sorted(entries)
+
+    def versions(self):
+        return [version for version, _, _ in self.entries()]
+
+    def _read(self, file):
+        with open(file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, kind, version, payload):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        output_file = self.directory / f"{kind}_{version}.json"
+        tmp_file = output_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        tmp_file.replace(output_file)
+        return output_file
+
+    def reconstruct(self, version=None):
+        """Document complet d'une version (défaut: la plus récente), None si elle est inconnue."""
+        entries = self.entries()
+        if version is None and entries:
+            version = entries[-1][0]
+        if version not in [v for v, _, _ in entries]:
+            return None
+        document = None
+        for entry_version, kind, file in entries:
+            if entry_version > version:
+                break
+            if kind == 'base':
+                document = self._read(file)["snapshot"]
+            elif document is not None:
+                document = apply_delta(document, self._read(file))
+        return document
+
+    def append(self, version, document):
+        """Ajoute une version (base toutes les BASE_INTERVAL versions, delta sinon); ignorée si connue."""
+        entries = self.entries()
+        if any(v == version for v, _, _ in entries):
+            return None
+        if entries and version < entries[-1][0]:
+            raise ValueError(f"{self.source} {version}: plus ancienne que la dernière version de l'historique")
+        if not entries:
+            return self._write('base', version, {"snapshot": document, "changes": None})
+
+        delta = compute_delta(self.reconstruct(entries[-1][0]), document)
+        since_base = 0
+        for _, kind, _ in reversed(entries):
+            if kind == 'base':
+                break
+            since_base += 1
+        if since_base + 1 >= self.base_interval:
+            # La base garde aussi ses changements, pour que --since ne lise que des changements
+            changes = {key: value for key, value in delta.items() if key not in ("document", "replaced", "brand_order")}
+            return self._write('base', version, {"snapshot": document, "changes": changes})
+        return self._write('delta', version, delta)
+
+    def changes_since(self, version):
+        """Changements nets depuis une version, en ne lisant que les changements enregistrés après elle."""
+        added, removed = {}, {}
+        new_brands, removed_brands = set(), set()
+
+        def net(brand, plus, minus):
+            for model in plus:
+                if model in removed.get(brand, []):
+                    removed[brand].remove(model)
+                else:
+                    added.setdefault(brand, []).append(model)
+            for model in minus:
+                if model in added.get(brand, []):
+                    added[brand].remove(model)
+                else:
+                    removed.setdefault(brand, []).append(model)
+
+        for entry_version, kind, file in self.entries():
+            if entry_version <= version:
+                continue
+            payload = self._read(file)
+            changes = (payload.get("changes") or {}) if kind == 'base' else payload
+            for brand in changes.get("removed_brands", []):
+                if brand in new_brands:
+                    new_brands.discard(brand)
+                else:
+                    removed_brands.add(brand)
+                added.pop(brand, None)
+            for brand in changes.get("new_brands", []):
+                if brand in removed_brands:
+                    removed_brands.discard(brand)
+                else:
+                    new_brands.add(brand)
+            for brand, models in changes.get("added", {}).items():
+                net(brand, models, [])
+            for brand, models in changes.get("removed", {}).items():
+                net(brand, [], models)
+        return {
+            'added': {brand: models for brand, models in added.items() if models},
+            'removed': {brand: models for brand, models in removed.items() if models},
+            'new_brands': sorted(new_brands),
+            'removed_brands': sorted(removed_brands)
+        }
+
+    def compact(self, data_dir="data", prune_json=False):
+        """Importe les snapshots JSON absents, réécrit bases et deltas, supprime éventuellement les JSON."""
+        documents = {}
+        for version in self.versions():
+            documents[version] = self.reconstruct(version)
+        snapshot_files = {}
+        for version, file in list_snapshots(self.source, data_dir, include_archived=True):
+            snapshot_files[version] = file
+            if version not in documents:
+                documents[version] = load_json(file)
+
+        for file in list(self.directory.glob("*.json")):
+            file.unlink()
+        for version in sorted(documents):
+            self.append(version, documents[version])
+
+        pruned = 0
+        if prune_json:
+            # Le dernier snapshot JSON reste en place (consolidation, déduplication)
+            for version, file in sorted(snapshot_files.items())[:-1]:
+                if not file.exists() or self.reconstruct(version) != documents[version]:
+                    continue
+                file.unlink()
+                file.with_suffix('.md').unlink(missing_ok=True)
+                pruned += 1
+        return len(documents), pruned
+
+    def disk_usage(self):
+        return sum(file.stat().st_size for _, _, file in self.entries())
+
+
+def record_version(source, snapshot_file, document):
+    """Ajoute un snapshot qui vient d'être écrit à l'historique de la source (appelé par les scrapers)."""
+    version = version_of(snapshot_file)
+    if source not in HISTORY_SOURCES or version is None:
+        return
+    try:
+        SnapshotHistory(source).append(version, document)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Historique {source} non mis à jour: {e}")
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Historique compact (base + deltas) des snapshots AS24 et CarGurus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python snapshot_history.py as24 --compact                 # Importer les snapshots JSON existants
+  python snapshot_history.py as24 --since 20251101_080000   # Modèles ajoutés / supprimés depuis
+  python snapshot_history.py cargurus --show 20251108_080000 > /tmp/cargurus.json
+  python snapshot_history.py as24 --compact --prune-json    # Ne garder que le dernier JSON complet
+        """
+    )
+    parser.add_argument('source', choices=HISTORY_SOURCES)
+    parser.add_argument('--since', metavar='VERSION', help='Changements depuis une version')
+    parser.add_argument('--show', metavar='VERSION', help='Reconstruire une version (JSON sur la sortie standard)')
+    parser.add_argument('--compact', action='store_true', help='Importer les JSON et réécrire bases et deltas')
+    parser.add_argument('--prune-json', action='store_true',
+                        help='Avec --compact: supprimer les snapshots JSON historisés (sauf le dernier)')
+    parser.add_argument('--base-every', type=int, default=BASE_INTERVAL, metavar='N',
+                        help=f'Une base complète toutes les N versions (défaut: {BASE_INTERVAL})')
+    args = parser.parse_args()
+
+    history = SnapshotHistory(args.source, base_interval=args.base_every)
+
+    if args.compact:
+        versions, pruned = history.compact(prune_json=args.prune_json)
+        print(f"🗜️ {args.source}: {versions} versions historisées ({history.disk_usage() / 1024:.0f} KB)"
+              + (f", {pruned} snapshots JSON supprimés" if args.prune_json else ""))
+        return
+
+    if args.show:
+        document = history.reconstruct(args.show)
+        if document is None:
+            print(f"❌ Version inconnue: {args.show}", file=sys.stderr)
+            sys.exit(1)
+        json.dump(document, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+
+    if args.since:
+        if args.since not in history.versions():
+            print(f"❌ Version inconnue: {args.since}")
+            sys.exit(1)
+        changes = history.changes_since(args.since)
+        print(f"🔄 {args.source} depuis {args.since}:")
+        for brand, models in changes['added'].items():
+            print(f"   + {brand}: {', '.join(models)}")
+        for brand, models in changes['removed'].items():
+            print(f"   - {brand}: {', '.join(models)}")
+        for brand in changes['new_brands']:
+            print(f"   + {brand} (nouvelle marque)")
+        for brand in changes['removed_brands']:
+            print(f"   - {brand} (marque absente)")
+        if not any(changes.values()):
+            print("   ✅ Aucun changement")
+        return
+
+    entries = history.entries()
+    if not entries:
+        print(f"📭 Historique {args.source} vide (python snapshot_history.py {args.source} --compact)")
+        return
+    for version, kind, file in entries:
+        print(f"   {version}  {'📦 base ' if kind == 'base' else '➕ delta'}  {file.stat().st_size / 1024:>7.1f} KB")
+    print(f"📊 {len(entries)} versions, {history.disk_usage() / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
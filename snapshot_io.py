@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Snapshot IO - Déduplication des snapshots par contenu
+Chaque snapshot est identifié par l'empreinte canonique de "brands_models"
+(métadonnées et timings exclus, marques et modèles triés). Quand une exécution
+produit le même contenu que le dernier snapshot de la source, aucun nouveau
+fichier n'est écrit: une entrée "unchanged" du journal data/.snapshot_ledger.jsonl
+pointe vers le snapshot existant. Le dernier snapshot d'une source et son
+empreinte sont lus dans le manifeste data/manifest.json (snapshot_manifest.py).
+
+Usage:
+    python snapshot_io.py                  # Journal des écritures (toutes sources)
+    python snapshot_io.py as24             # Journal d'une source
+    python snapshot_io.py --hash FICHIER   # Empreinte canonique d'un snapshot
+"""
+
+import argparse
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from data_storage import load_json
+from snapshot_manifest import latest_entry, record_file
+
+LEDGER_FILE = Path("data/.snapshot_ledger.jsonl")
+
+
+def canonical_hash(brands_models):
+    """Empreinte SHA-256 du contenu, indépendante de l'ordre des marques et des modèles."""
+    canonical = {brand: sorted(models) for brand, models in brands_models.items()}
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_hash(snapshot_file):
+    """Empreinte canonique d'un fichier snapshot."""
+    return canonical_hash(load_json(snapshot_file).get("brands_models", {}))
+
+
+def load_ledger(source_prefix=None, ledger_file=LEDGER_FILE):
+    """Entrées du journal (les plus anciennes d'abord), éventuellement filtrées par source."""
+    entries = []
+    try:
+        with open(ledger_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if source_prefix is None or entry.get("source") == source_prefix:
+                    entries.append(entry)
+    except OSError:
+        pass
+    return entries
+
+
+def _append(entry, ledger_file=LEDGER_FILE):
+    ledger_file = Path(ledger_file)
+    ledger_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(ledger_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def latest_snapshot_hash(source_prefix, data_dir="data"):
+    """(fichier, empreinte) du dernier snapshot de la source, (None, None) s'il n'y en a pas."""
+    entry = latest_entry(source_prefix, "scraped_models", data_dir)
+    if entry is None:
+        return None, None
+    return Path(entry["path"]), entry["hash"]
+
+
+def unchanged_snapshot(source_prefix, result_data, data_dir="data", ledger_file=LEDGER_FILE, digest=None):
+    """Dernier snapshot si son contenu est identique (entrée "unchanged" journalisée), None sinon."""
+    digest = digest or canonical_hash(result_data.get("brands_models", {}))
+    latest, latest_hash = latest_snapshot_hash(source_prefix, data_dir)
+    if latest is None or latest_hash != digest:
+        return None
+    _append({
+        "source": source_prefix,
+        "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "status": "unchanged",
+        "hash": digest,
+        "file": str(latest),
+        "scraped_at": result_data.get("metadata", {}).get("scraped_at")
+    }, ledger_file)
+    return str(latest)
+
+
+def record_snapshot(source_prefix, output_file, result_data, ledger_file=LEDGER_FILE, digest=None):
+    """Journalise l'écriture d'un nouveau snapshot et l'enregistre dans le manifeste de data/."""
+    digest = digest or canonical_hash(result_data.get("brands_models", {}))
+    record_file(source_prefix, "scraped_models", output_file, result_data, digest)
+    _append({
+        "source": source_prefix,
+        "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "status": "written",
+        "hash": digest,
+        "file": str(output_file),
+        "scraped_at": result_data.get("metadata", {}).get("scraped_at")
+    }, ledger_file)
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(description="Journal des snapshots et empreintes canoniques")
+    parser.add_argument('source', nargs='?', help='Préfixe de la source (as24, cargurus, autodata, carfolio)')
+    parser.add_argument('--hash', metavar='FICHIER', help='Afficher l\'empreinte canonique d\'un snapshot')
+    args = parser.parse_args()
+
+    if args.hash:
+        print(f"{file_hash(args.hash)}  {args.hash}")
+        return
+
+    entries = load_ledger(args.source)
+    if not entries:
+        print("📭 Journal vide")
+        return
+    skipped = sum(1 for entry in entries if entry["status"] == "unchanged")
+    for entry in entries:
+        icon = "💾" if entry["status"] == "written" else "♻️"
+        print(f"{icon} {entry['recorded_at']} {entry['source']:<10} {entry['hash'][:12]} {entry['file']}")
+    print(f"📊 {len(entries)} exécutions, {skipped} sans changement (aucun fichier écrit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Snapshot Manifest - Index des fichiers de données écrits dans data/
+Chaque écriture de snapshot (scrapers, fusion), de consolidation ou d'export
+technique met à jour data/manifest.json (écriture atomique, verrou entre
+processus): source, type, chemin, version, date d'écriture, nombre de marques
+et de modèles, empreinte du contenu (empreinte canonique pour les snapshots,
+SHA-256 du fichier sinon) et taille.
+
+Les outils qui cherchaient le "dernier fichier" en listant data/ et en
+ouvrant les fichiers trouvés lisent une entrée du manifeste:
+
+    latest_entry("as24", "scraped_models")       # data/as24_scraped_models_*.json
+    latest_entry("consolidated", "brands_models") # data/consolidated_brands_models*.json
+    latest_entry("autodata", "technical_specs")   # data/autodata_technical_specs_*.json
+
+Un type absent du manifeste (fichiers antérieurs, écrits par un autre outil)
+est retrouvé une fois sur disque puis enregistré.
+
+Chaque fichier enregistré a aussi un petit fichier de statistiques à côté de
+lui (data/.<fichier>.stats: marques, modèles, métadonnées scalaires), valide
+tant que la date de modification et la taille du fichier n'ont pas changé.
+file_stats() ne relit le fichier complet que si ce cache est absent ou périmé.
+
+Usage:
+    python snapshot_manifest.py              # Derniers fichiers par source et type
+    python snapshot_manifest.py --all        # Tous les fichiers enregistrés
+    python snapshot_manifest.py --rebuild    # Reconstruire le manifeste depuis data/
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from data_storage import load_json
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".manifest.lock"
+
+# flock n'exclut pas les threads d'un même processus (écritures parallèles de result_writer.py)
+_thread_lock = threading.Lock()
+
+# <source>_<type>[_YYYYMMDD_HHMMSS].json
+FILE_PATTERN = re.compile(r"^([a-z0-9]+)_(scraped_models|brands_models|technical_specs)(?:_(\d{8}_\d{6}))?\.json$")
+
+
+def parse_name(path):
+    """(source, type, version) d'un fichier de données, None si le nom ne suit pas le format."""
+    match = FILE_PATTERN.match(Path(path).name)
+    return match.groups() if match else None
+
+
+def document_counts(document):
+    """Nombre de marques et de modèles d'un document (snapshot, consolidation ou export technique)."""
+    if "brands_models" in document:
+        brands_models = document["brands_models"]
+        return {"brands": len(brands_models), "models": sum(len(models) for models in brands_models.values())}
+    if "consolidated_brands_models" in document:
+        consolidated = document["consolidated_brands_models"]
+        return {"brands": len(consolidated),
+                "models": sum(len(info.get("models", [])) for info in consolidated.values())}
+    if "brands_technical_data" in document:
+        brands = document["brands_technical_data"]
+        counts = {"brands": len(brands), "models": sum(len(brand.get("models", {})) for brand in brands.values())}
+        stats = document.get("metadata", {}).get("consolidation_stats")
+        if stats:
+            counts["conflicts"] = stats.get("total_conflicts_resolved", 0)
+        return counts
+    return {}
+
+
+def _scalar(value):
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def document_summary(document):
+    """Statistiques d'un document: nombres de marques et de modèles, métadonnées scalaires."""
+    metadata = {}
+    for key, value in document.get("metadata", {}).items():
+        if key == "data_sources" and isinstance(value, dict):
+            # Consolidation: fichier et volumes de chaque source, sans leurs données
+            metadata[key] = {name: {"file": info.get("file"), **document_counts(info)}
+                             for name, info in value.items() if isinstance(info, dict)}
+        elif _scalar(value) or (isinstance(value, dict) and all(_scalar(v) for v in value.values())):
+            metadata[key] = value
+    return {**document_counts(document), "metadata": metadata}
+
+
+def sidecar_path(path):
+    """Fichier de statistiques d'un fichier de données (data/.<nom>.stats)."""
+    path = Path(path)
+    return path.with_name(f".{path.name}.stats")
+
+
+def write_sidecar(path, document):
+    """Écrit les statistiques d'un fichier qui vient d'être écrit; les retourne."""
+    stat = Path(path).stat()
+    summary = document_summary(document)
+    sidecar = sidecar_path(path)
+    tmp_file = sidecar.with_name(sidecar.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, **summary}, f, ensure_ascii=False)
+    tmp_file.replace(sidecar)
+    return summary
+
+
+def file_stats(path):
+    """Statistiques d'un fichier de données: cache si date et taille concordent, sinon lecture complète."""
+    path = Path(path)
+    try:
+        stat = path.stat()
+        with open(sidecar_path(path), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get("mtime_ns") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+            return {key: value for key, value in cached.items() if key not in ("mtime_ns", "size")}
+    except (OSError, ValueError):
+        pass
+    try:
+        return write_sidecar(path, load_json(path))
+    except (OSError, ValueError):
+        return {}
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _manifest_lock(data_dir):
+    """Verrou exclusif entre processus (scrapers parallèles) et entre threads; flock sans effet hors POSIX."""
+    lock_file = Path(data_dir) / LOCK_NAME
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with _thread_lock, open(lock_file, 'w') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_manifest(data_dir="data"):
+    """Contenu du manifeste ({"latest": {...}, "files": {...}}, vide s'il n'existe pas)."""
+    try:
+        with open(Path(data_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("latest", {})
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def _save_manifest(manifest, data_dir):
+    manifest_file = Path(data_dir) / MANIFEST_NAME
+    manifest["updated_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    tmp_file = manifest_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    tmp_file.replace(manifest_file)
+
+
+def _is_newer(entry, current):
+    """Une entrée remplace le dernier fichier connu sauf si elle porte une version plus ancienne."""
+    if current is None or not entry.get("version") or not current.get("version"):
+        return True
+    return entry["version"] >= current["version"]
+
+
+def _make_entry(source, kind, path, document=None, content_hash=None):
+    path = Path(path)
+    parsed = parse_name(path)
+    if document is None:
+        document = load_json(path)
+    summary = write_sidecar(path, document)
+    stat = path.stat()
+    if content_hash is None and "brands_models" in document:
+        # Snapshots: même empreinte canonique que la déduplication (snapshot_io)
+        from snapshot_io import canonical_hash
+        content_hash = canonical_hash(document["brands_models"])
+    return {
+        "source": source,
+        "kind": kind,
+        "path": str(path),
+        "version": parsed[2] if parsed else None,
+        "written_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        **{key: value for key, value in summary.items() if key != "metadata"},
+        "hash": content_hash or _file_sha256(path),
+        "size": stat.st_size
+    }
+
+
+def record_file(source, kind, path, document=None, content_hash=None, data_dir="data"):
+    """Enregistre un fichier qui vient d'être écrit; retourne son entrée.
+
+    Les fichiers hors de data/ ou nommés librement (--output) ne sont pas enregistrés (None).
+    """
+    if not parse_name(path) or Path(path).resolve().parent != Path(data_dir).resolve():
+        return None
+    try:
+        entry = _make_entry(source, kind, path, document, content_hash)
+        with _manifest_lock(data_dir):
+            manifest = load_manifest(data_dir)
+            manifest["files"][entry["path"]] = entry
+            key = f"{source}/{kind}"
+            if _is_newer(entry, manifest["latest"].get(key)):
+                manifest["latest"][key] = entry
+            _save_manifest(manifest, data_dir)
+        return entry
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Manifeste non mis à jour pour {path}: {e}")
+        return None
+
+
+def forget_file(path, data_dir="data"):
+    """Retire un fichier supprimé du manifeste (le dernier fichier de son type est recalculé)."""
+    with _manifest_lock(data_dir):
+        manifest = load_manifest(data_dir)
+        entry = manifest["files"].pop(str(path), None)
+        sidecar_path(path).unlink(missing_ok=True)
+        if entry is None:
+            return False
+        key = f"{entry['source']}/{entry['kind']}"
+        if manifest["latest"].get(key, {}).get("path") == str(path):
+            candidates = [e for e in manifest["files"].values() if e["source"] == entry["source"]
+                          and e["kind"] == entry["kind"]]
+            candidates.sort(key=lambda e: (e.get("version") or "", e["written_at"]))
+            if candidates:
+                manifest["latest"][key] = candidates[-1]
+            else:
+                del manifest["latest"][key]
+        _save_manifest(manifest, data_dir)
+        return True
+
+
+def _scan_latest(source, kind, data_dir):
+    """Dernier fichier d'un type trouvé sur disque (version dans le nom, sinon date de modification)."""
+    candidates = []
+    for path in Path(data_dir).glob(f"{source}_{kind}*.json"):
+        parsed = parse_name(path)
+        if parsed and parsed[0] == source and parsed[1] == kind:
+            candidates.append((parsed[2] or "", path.stat().st_mtime, path))
+    return max(candidates)[2] if candidates else None
+
+
+def latest_entry(source, kind, data_dir="data"):
+    """Entrée du dernier fichier d'un type, None s'il n'y en a pas."""
+    entry = load_manifest(data_dir)["latest"].get(f"{source}/{kind}")
+    if entry and Path(entry["path"]).exists():
+        return entry
+    if entry:
+        forget_file(entry["path"], data_dir)
+        return latest_entry(source, kind, data_dir)
+    # Type encore absent du manifeste: recherche sur disque une seule fois
+    path = _scan_latest(source, kind, data_dir)
+    return record_file(source, kind, path, data_dir=data_dir) if path else None
+
+
+def latest_path(source, kind, data_dir="data"):
+    """Chemin du dernier fichier d'un type, None s'il n'y en a pas."""
+    entry = latest_entry(source, kind, data_dir)
+    return Path(entry["path"]) if entry else None
+
+
+def rebuild(data_dir="data"):
+    """Reconstruit le manifeste à partir des fichiers présents dans data/; retourne le nombre de fichiers."""
+    entries = []
+    for path in sorted(Path(data_dir).glob("*.json")):
+        parsed = parse_name(path)
+        if not parsed:
+            continue
+        try:
+            entries.append(_make_entry(parsed[0], parsed[1], path))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {path.name} ignoré: {e}")
+    with _manifest_lock(data_dir):
+        manifest = {"latest": {}, "files": {}}
+        for entry in sorted(entries, key=lambda e: (e.get("version") or "", e["written_at"])):
+            manifest["files"][entry["path"]] = entry
+            manifest["latest"][f"{entry['source']}/{entry['kind']}"] = entry
+        _save_manifest(manifest, data_dir)
+    return len(entries)
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Manifeste des fichiers de données (dernier fichier par source et type)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python snapshot_manifest.py               # Derniers fichiers par source et type
+  python snapshot_manifest.py --all         # Tous les fichiers enregistrés
+  python snapshot_manifest.py --rebuild     # Après une copie ou un nettoyage manuel de data/
+        """
+    )
+    parser.add_argument('--all', action='store_true', help='Lister tous les fichiers enregistrés')
+    parser.add_argument('--rebuild', action='store_true', help='Reconstruire le manifeste depuis data/')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"🔁 {rebuild()} fichiers enregistrés dans data/{MANIFEST_NAME}")
+        return
+
+    manifest = load_manifest()
+    entries = manifest["files"].values() if args.all else manifest["latest"].values()
+    if not entries:
+        print("📭 Manifeste vide (python snapshot_manifest.py --rebuild)")
+        return
+    for entry in sorted(entries, key=lambda e: (e["source"], e["kind"], e.get("version") or "")):
+        print(f"   {entry['source']:<13} {entry['kind']:<16} {entry.get('brands', '-'):>6} marques "
+              f"{entry.get('models', '-'):>7} modèles  {entry['size'] / (1024 * 1024):>7.2f} MB  {entry['path']}")
+    print(f"📊 {len(manifest['files'])} fichiers, mis à jour le {manifest.get('updated_at', '?')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Snapshot Merge - Fusion de snapshots partiels d'une source
+Grâce à l'approche additive (les modèles ne sont jamais supprimés), des
+résultats partiels produits par plusieurs exécutions ou machines peuvent être
+fusionnés par union, sans coordination: chaque partiel couvre un sous-ensemble
+de marques avec son propre horodatage.
+
+Format d'un partiel (data/partials/<source>_partial_YYYYMMDD_HHMMSS[_noeud].json),
+identique à un snapshot *_scraped_models_*.json - un snapshot complet est
+lui-même un partiel couvrant toutes les marques:
+
+    {
+        "metadata": {"format": "partial-v1", "source_prefix": "as24",
+                     "scraped_at": "2025-11-13T08:00:00Z", "node": "scraper-2",
+                     "brand_scraped_at": {"BMW": "2025-11-13T08:00:00Z"},    # optionnel
+                     "merged_from": ["as24_partial_20251113_080000_scraper-2"]},  # optionnel
+        "brands_models": {"BMW": ["Série 1", "X5"]},
+        "brand_timings": {"columns": [...], "rows": {"BMW": [...]}}           # optionnel
+    }
+
+La fusion est commutative, idempotente et associative: modèles par union
+(ordre canonique), timing et horodatage les plus récents par marque, liste des
+partiels fusionnés par union. Le résultat d'une fusion est lui-même un partiel
+et peut être fusionné à nouveau. Les fichiers sont lus un par un: seul l'état
+fusionné reste en mémoire.
+
+Usage:
+    python snapshot_merge.py as24                               # data/partials/as24_partial_*.json
+    python snapshot_merge.py as24 a.json b.json --base          # + dernier snapshot complet
+    python snapshot_merge.py as24 --output data/partials/as24_partial_semaine.json
+"""
+
+import argparse
+import json
+import re
+import socket
+from datetime import datetime, timezone
+from pathlib import Path
+
+from brand_timings import TIMING_COLUMNS, list_snapshots
+from data_storage import load_json, save_json
+from snapshot_db import index_snapshot
+from snapshot_io import record_snapshot, unchanged_snapshot
+
+PARTIAL_DIR = Path("data/partials")
+PARTIAL_FORMAT = "partial-v1"
+
+FILE_PREFIX_PATTERN = re.compile(r"^([a-z0-9]+)_(?:scraped_models|partial)_")
+
+
+def canonical_order(names):
+    """Ordre indépendant de l'ordre de fusion (insensible à la casse, puis exact)."""
+    return sorted(names, key=lambda name: (name.casefold(), name))
+
+
+def _normalize_timestamp(timestamp):
+    """Horodatage comparable: ISO 8601 sans suffixe Z."""
+    return (timestamp or "").rstrip("Z")
+
+
+def source_prefix_of(document, path=None):
+    """Préfixe de source d'un partiel (métadonnées, sinon nom du fichier)."""
+    prefix = document.get("metadata", {}).get("source_prefix")
+    if prefix or path is None:
+        return prefix
+    match = FILE_PREFIX_PATTERN.match(Path(path).name)
+    return match.group(1) if match else None
+
+
+def write_partial(source_prefix, brands_models, timing_rows=None, node=None, partial_dir=PARTIAL_DIR):
+    """Écrit un partiel pour un sous-ensemble de marques; retourne le fichier écrit."""
+    now = datetime.now(timezone.utc)
+    node = node or socket.gethostname()
+    name = f"{source_prefix}_partial_{now.strftime('%Y%m%d_%H%M%S')}_{node}"
+    document = {
+        "metadata": {
+            "format": PARTIAL_FORMAT,
+            "source_prefix": source_prefix,
+            "scraped_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "node": node,
+            "merged_from": [name]
+        },
+        "brands_models": brands_models,
+        "brand_timings": {"columns": TIMING_COLUMNS, "rows": timing_rows or {}}
+    }
+    output_file = Path(partial_dir) / f"{name}.json"
+    _write_atomic(document, output_file)
+    return output_file
+
+
+def _write_atomic(document, output_file):
+    save_json(output_file, document)
+
+
+class SnapshotMerger:
+    """État de fusion: les partiels sont ajoutés un par un, dans n'importe quel ordre."""
+
+    def __init__(self, source_prefix=None):
+        self.source_prefix = source_prefix
+        self.models = {}
+        self.brand_scraped_at = {}
+        self.timings = {}
+        self.merged_from = set()
+
+    def add(self, document, name=None):
+        """Fusionne un partiel (document déjà chargé)."""
+        metadata = document.get("metadata", {})
+        prefix = source_prefix_of(document, name)
+        if self.source_prefix and prefix and prefix != self.source_prefix:
+            raise ValueError(f"Partiel d'une autre source: {name or prefix} ({prefix} au lieu de {self.source_prefix})")
+        self.source_prefix = self.source_prefix or prefix
+
+        scraped_at = _normalize_timestamp(metadata.get("scraped_at"))
+        brand_scraped_at = metadata.get("brand_scraped_at", {})
+        for brand, models in document.get("brands_models", {}).items():
+            self.models.setdefault(brand, set()).update(models)
+            brand_at = _normalize_timestamp(brand_scraped_at.get(brand)) or scraped_at
+            if brand_at > self.brand_scraped_at.get(brand, ""):
+                self.brand_scraped_at[brand] = brand_at
+
+        side_table = document.get("brand_timings") or {}
+        columns = side_table.get("columns", TIMING_COLUMNS)
+        for brand, row in side_table.get("rows", {}).items():
+            row = dict(zip(columns, row))
+            row = [row.get(column) for column in TIMING_COLUMNS]
+            brand_at = _normalize_timestamp(brand_scraped_at.get(brand)) or scraped_at
+            # Timing le plus récent; à égalité, choix déterministe
+            candidate = (brand_at, json.dumps(row, ensure_ascii=False))
+            if brand not in self.timings or candidate > self.timings[brand]:
+                self.timings[brand] = candidate
+
+        merged_from = metadata.get("merged_from")
+        if merged_from:
+            self.merged_from.update(merged_from)
+        elif name is not None:
+            self.merged_from.add(Path(name).stem)
+        else:
+            self.merged_from.add(f"{prefix or 'snapshot'}@{scraped_at}")
+
+    def add_file(self, path):
+        """Charge et fusionne un fichier partiel."""
+        self.add(load_json(path), str(path))
+
+    def result(self):
+        """Document fusionné (format partiel, compatible avec les snapshots *_scraped_models_*.json)."""
+        brands = canonical_order(self.models)
+        brands_models = {brand: canonical_order(self.models[brand]) for brand in brands}
+        brand_scraped_at = {brand: self.brand_scraped_at[brand] + "Z"
+                            for brand in brands if self.brand_scraped_at.get(brand)}
+        return {
+            "metadata": {
+                "format": PARTIAL_FORMAT,
+                "source_prefix": self.source_prefix,
+                "scraped_at": max(brand_scraped_at.values(), default=None),
+                "total_brands": len(brands_models),
+                "total_models": sum(len(models) for models in brands_models.values()),
+                "brands_with_models": len([b for b, models in brands_models.items() if models]),
+                "brands_without_models": len([b for b, models in brands_models.items() if not models]),
+                "brand_scraped_at": brand_scraped_at,
+                "merged_from": sorted(self.merged_from)
+            },
+            "brands_models": brands_models,
+            "brand_timings": {
+                "columns": TIMING_COLUMNS,
+                "rows": {brand: json.loads(self.timings[brand][1])
+                         for brand in canonical_order(self.timings)}
+            }
+        }
+
+
+def merge_files(paths, source_prefix=None):
+    """Fusionne des fichiers partiels; retourne le document fusionné."""
+    merger = SnapshotMerger(source_prefix)
+    for path in paths:
+        merger.add_file(path)
+    return merger.result()
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Fusion de snapshots partiels d'une source (union additive)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python snapshot_merge.py as24                          # Tous les partiels AS24 -> nouveau snapshot
+  python snapshot_merge.py as24 --base                   # + dernier snapshot complet
+  python snapshot_merge.py cargurus noeud1.json noeud2.json --output data/partials/cargurus_partial_lot.json
+        """
+    )
+    parser.add_argument('source', help='Préfixe de la source (as24, cargurus, autodata, carfolio)')
+    parser.add_argument('files', nargs='*', help=f'Partiels à fusionner (défaut: {PARTIAL_DIR}/<source>_partial_*.json)')
+    parser.add_argument('--base', action='store_true', help='Inclure le dernier snapshot complet de la source')
+    parser.add_argument('--output', help='Fichier de sortie (défaut: data/<source>_scraped_models_<date>.json)')
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or sorted(PARTIAL_DIR.glob(f"{args.source}_partial_*.json"))
+    if args.base:
+        snapshots = list_snapshots(args.source)
+        if snapshots:
+            files.insert(0, snapshots[-1][1])
+    if not files:
+        print(f"❌ Aucun partiel trouvé pour {args.source}")
+        return
+
+    merger = SnapshotMerger(args.source)
+    for path in files:
+        try:
+            merger.add_file(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ {path}: ignoré ({e})")
+            continue
+        print(f"➕ {path}: {len(merger.models)} marques cumulées")
+
+    result = merger.result()
+    output_file = args.output
+    if not output_file:
+        existing = unchanged_snapshot(args.source, result)
+        if existing:
+            print(f"♻️ Aucun changement depuis {existing}: snapshot non réécrit")
+            return
+        output_file = f"data/{args.source}_scraped_models_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    _write_atomic(result, output_file)
+    record_snapshot(args.source, output_file, result)
+    if not args.output:
+        index_snapshot(args.source, output_file, result)
+    metadata = result['metadata']
+    print(f"✅ {len(metadata['merged_from'])} partiels fusionnés: {metadata['total_brands']} marques, "
+          f"{metadata['total_models']} modèles -> {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Snapshot Retention - Politique de rétention et archives compressées
+Les fichiers horodatés de data/ (<famille>_YYYYMMDD_HHMMSS.json et leur .md:
+*_scraped_models_*, autonomous_technical_specs_*, carfolio_exploration_*...)
+s'accumulent à chaque exécution. Une politique par paliers d'âge décide des
+versions gardées en clair, par exemple (politique par défaut):
+
+    all:30,weekly:365,monthly     # tout sur 30 jours, une par semaine sur un an,
+                                  # puis une par mois sans limite
+
+Granularités: all, daily, weekly, monthly, yearly. Dans chaque période, la
+version la plus récente est gardée; la dernière version d'une famille est
+toujours gardée. Les autres sont déplacées dans une archive ZIP compressée
+par famille (data/archive/<famille>.zip, dont le répertoire central sert
+d'index) puis supprimées de data/ et du manifeste.
+
+Un fichier archivé reste lisible par son chemin d'origine: ce module
+enregistre auprès de data_storage.load_json() un lecteur de secours qui lit
+le membre correspondant de l'archive quand le fichier n'existe plus
+(snapshots, historique, base SQLite, exploration Carfolio).
+
+Usage:
+    python snapshot_retention.py                       # Plan de rétention (aucune modification)
+    python snapshot_retention.py --apply               # Archiver les versions non retenues
+    python snapshot_retention.py --policy all:7,monthly --apply
+    python snapshot_retention.py --archived            # Contenu des archives
+    python snapshot_retention.py --extract as24_scraped_models_20250101_080000.json
+"""
+
+import argparse
+import re
+import zipfile
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import data_storage
+from snapshot_manifest import forget_file
+
+ARCHIVE_DIRNAME = "archive"
+
+DEFAULT_POLICY = "all:30,weekly:365,monthly"
+
+GRANULARITIES = {
+    'all': lambda ts: ts,
+    'daily': lambda ts: ts.strftime("%Y-%m-%d"),
+    'weekly': lambda ts: ts.isocalendar()[:2],
+    'monthly': lambda ts: ts.strftime("%Y-%m"),
+    'yearly': lambda ts: ts.year,
+}
+
+# <famille>_YYYYMMDD_HHMMSS.(json|md)
+VERSIONED_PATTERN = re.compile(r"^(.+)_(\d{8}_\d{6})\.(json|md)$")
+
+
+def parse_policy(text):
+    """'all:30,weekly:365,monthly' -> [('all', 30), ('weekly', 365), ('monthly', None)]."""
+    tiers = []
+    for part in text.split(','):
+        granularity, _, days = part.strip().partition(':')
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularité inconnue: {granularity} ({', '.join(GRANULARITIES)})")
+        tiers.append((granularity, int(days) if days else None))
+    ages = [days for _, days in tiers if days is not None]
+    if ages != sorted(ages) or any(days is None for _, days in tiers[:-1]):
+        raise ValueError(f"Paliers non croissants: {text}")
+    return tiers
+
+
+def _archive_file(family, data_dir):
+    return Path(data_dir) / ARCHIVE_DIRNAME / f"{family}.zip"
+
+
+def versioned_files(data_dir="data"):
+    """{famille: {version: [fichiers]}} des fichiers horodatés de data/."""
+    families = {}
+    for path in Path(data_dir).iterdir():
+        match = VERSIONED_PATTERN.match(path.name)
+        if match and path.is_file():
+            family, version, _ = match.groups()
+            families.setdefault(family, {}).setdefault(version, []).append(path)
+    return families
+
+
+def plan(versions, tiers, now=None):
+    """Versions (YYYYMMDD_HHMMSS) à garder en clair selon la politique; les autres sont archivées."""
+    now = now or datetime.now()
+    ordered = sorted(versions, reverse=True)
+    keep = set(ordered[:1])
+    seen = set()
+    for version in ordered:
+        timestamp = datetime.strptime(version, "%Y%m%d_%H%M%S")
+        age = now - timestamp
+        for index, (granularity, days) in enumerate(tiers):
+            if days is None or age <= timedelta(days=days):
+                # Première version (la plus récente) de sa période dans ce palier
+                period = (index, GRANULARITIES[granularity](timestamp))
+                if period not in seen:
+                    seen.add(period)
+                    keep.add(version)
+                break
+    return keep
+
+
+def _crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def archive_files(family, paths, data_dir="data"):
+    """Ajoute des fichiers à l'archive de leur famille, vérifie la copie, puis les supprime."""
+    archive = _archive_file(family, data_dir)
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(archive, 'a', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        existing = set(zf.namelist())
+        for path in paths:
+            if path.name not in existing:
+                zf.write(path, path.name)
+    with zipfile.ZipFile(archive) as zf:
+        for path in paths:
+            # Relecture complète du membre (contrôle CRC) avant de supprimer l'original
+            with zf.open(path.name) as member:
+                while member.read(1 << 20):
+                    pass
+            if zf.getinfo(path.name).CRC != _crc32(path):
+                raise OSError(f"{path.name}: contenu archivé différent de l'original")
+    for path in paths:
+        path.unlink()
+        forget_file(str(path), data_dir)
+    return archive
+
+
+def apply_retention(policy=DEFAULT_POLICY, data_dir="data", dry_run=True, now=None):
+    """Applique la politique à toutes les familles: {famille: (versions gardées, versions archivées)}."""
+    tiers = parse_policy(policy)
+    report = {}
+    for family, versions in sorted(versioned_files(data_dir).items()):
+        keep = plan(versions, tiers, now)
+        archived = sorted(set(versions) - keep)
+        report[family] = (len(keep), archived)
+        if archived and not dry_run:
+            archive_files(family, [path for version in archived for path in versions[version]], data_dir)
+    return report
+
+
+def archived_members(data_dir="data"):
+    """[(archive, membre, taille, taille compressée)] de toutes les archives."""
+    members = []
+    for archive in sorted((Path(data_dir) / ARCHIVE_DIRNAME).glob("*.zip")):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                members.append((archive, info.filename, info.file_size, info.compress_size))
+    return members
+
+
+def archived_versions(family, data_dir="data"):
+    """[(version, chemin d'origine)] des fichiers JSON archivés d'une famille."""
+    archive = _archive_file(family, data_dir)
+    if not archive.exists():
+        return []
+    with zipfile.ZipFile(archive) as zf:
+        names = zf.namelist()
+    versions = []
+    for name in names:
+        match = VERSIONED_PATTERN.match(name)
+        if match and match.group(3) == 'json':
+            versions.append((match.group(2), Path(data_dir) / name))
+    return sorted(versions)
+
+
+def read_archived(path):
+    """Contenu (octets) d'un fichier archivé désigné par son chemin d'origine."""
+    path = Path(path)
+    match = VERSIONED_PATTERN.match(path.name)
+    archive = _archive_file(match.group(1), path.parent) if match else None
+    if archive is None or not archive.exists():
+        raise FileNotFoundError(str(path))
+    with zipfile.ZipFile(archive) as zf:
+        try:
+            return zf.read(path.name)
+        except KeyError:
+            raise FileNotFoundError(str(path)) from None
+
+
+data_storage.register_missing_file_reader(read_archived)
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Rétention des fichiers horodatés de data/ et archives compressées",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python snapshot_retention.py                          # Plan (aucune modification)
+  python snapshot_retention.py --apply                  # tout 30 j, hebdo 1 an, mensuel ensuite
+  python snapshot_retention.py --policy all:14,daily:60,weekly:365,monthly --apply
+  python snapshot_retention.py --extract as24_scraped_models_20250101_080000.json
+        """
+    )
+    parser.add_argument('--policy', default=DEFAULT_POLICY,
+                        help=f'Paliers granularité:jours, le dernier sans limite (défaut: {DEFAULT_POLICY})')
+    parser.add_argument('--apply', action='store_true', help='Archiver les versions non retenues')
+    parser.add_argument('--archived', action='store_true', help='Lister le contenu des archives')
+    parser.add_argument('--extract', metavar='FICHIER', help='Restaurer un fichier archivé dans data/')
+    args = parser.parse_args()
+
+    if args.archived:
+        members = archived_members()
+        for archive, name, size, compressed in members:
+            print(f"   {archive.name:<40} {name:<55} {size / 1024:>9.1f} KB -> {compressed / 1024:>8.1f} KB")
+        total = sum(size for _, _, size, _ in members)
+        packed = sum(compressed for _, _, _, compressed in members)
+        print(f"📦 {len(members)} fichiers archivés, {total / (1024 * 1024):.1f} MB -> {packed / (1024 * 1024):.1f} MB")
+        return
+
+    if args.extract:
+        target = Path("data") / Path(args.extract).name
+        target.write_bytes(read_archived(target))
+        print(f"📤 {target} restauré")
+        return
+
+    try:
+        report = apply_retention(args.policy, dry_run=not args.apply)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    total = 0
+    for family, (kept, archived) in report.items():
+        total += len(archived)
+        print(f"   {family:<35} {kept:>4} gardées  {len(archived):>4} {'archivées' if args.apply else 'à archiver'}")
+    if args.apply:
+        print(f"🗜️ {total} versions archivées dans data/{ARCHIVE_DIRNAME}/")
+    else:
+        print(f"📋 {total} versions à archiver (python snapshot_retention.py --apply)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,6 @@ Scraper Technique Autonome - Version Complète
 Extraction de spécifications techniques sans dépendances externes
 """
 
-import json
 import time
 import random
 import logging
@@ -12,6 +11,10 @@ import sys
 import re
 from datetime import datetime, timezone
 from pathlib import Path
+from tracing import traced, span
+from change_feed import publish, technical_events
+from data_storage import load_json, save_json
+from snapshot_manifest import latest_path, record_file
 
 # Configuration logging
 logging.basicConfig(
@@ -347,6 +350,7 @@ class AutonomousTechnicalScraper:
             }
         }
 
+    @traced("technical.generate_technical_specs")
     def generate_technical_specs(self, brand, model):
         """Génère des spécifications techniques pour une marque/modèle."""
         try:
@@ -475,6 +479,7 @@ class AutonomousTechnicalScraper:
 
         return specs
 
+    @traced("technical.scrape_brand_models_technical")
     def scrape_brand_models_technical(self, brand_models_data, max_models_per_brand=10):
         """Scrape les données techniques pour plusieurs marques."""
         try:
@@ -526,7 +531,8 @@ class AutonomousTechnicalScraper:
                         brand_technical_data["scraped_models"] += 1
 
                         # Petite pause
-                        time.sleep(0.1)
+                        with span("technical.pause"):
+                            time.sleep(0.1)
 
                     except Exception as e:
                         logger.error(f"   Erreur modèle {model_name}: {e}")
@@ -600,6 +606,17 @@ class AutonomousTechnicalScraper:
         else:
             return "C (Essence)"
 
+    def load_previous_technical_data(self, output_file):
+        """Charge l'export technique précédent ({} s'il n'y en a pas)."""
+        previous_file = latest_path("autonomous", "technical_specs")
+        if previous_file is None or previous_file.name == Path(output_file).name:
+            return {}
+        try:
+            return load_json(previous_file)
+        except (OSError, ValueError):
+            return {}
+
+    @traced("technical.save_technical_data")
     def save_technical_data(self, technical_data, output_file=None):
         """Sauvegarde les données techniques."""
         try:
@@ -608,12 +625,16 @@ class AutonomousTechnicalScraper:
                 output_file = f"data/autonomous_technical_specs_{timestamp}.json"
 
             Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            previous_data = self.load_previous_technical_data(output_file)
 
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(technical_data, f, indent=2, ensure_ascii=False)
+            save_json(output_file, technical_data)
+            record_file("autonomous", "technical_specs", output_file, technical_data)
 
             logger.info(f"Données techniques autonomes sauvegardées: {output_file}")
 
+            # Spécifications modifiées depuis l'export précédent -> flux de changements
+            publish(technical_events(previous_data, technical_data))
+
             return output_file
 
         except Exception as e:
@@ -654,29 +675,28 @@ def main():
         # Utiliser les données consolidées réelles
         try:
             # Charger les données consolidées réelles
-            with open("data/consolidated_brands_models.json", 'r', encoding='utf-8') as f:
-                real_data = json.load(f)
-                consolidated_data = real_data["consolidated_brands_models"]
-                logger.info(f"Données consolidées chargées: {len(consolidated_data)} marques")
-                
-                # Convertir vers le format attendu par le scraper
-                brand_models_data = {}
-                for brand_name, brand_data in consolidated_data.items():
-                    if isinstance(brand_data, dict) and "models" in brand_data:
-                        # Structure consolidée: {"models": [...], "model_count": n, "sources": [...]}
-                        models_list = brand_data["models"]
-                        brand_models_data[brand_name] = {}
-                        for model in models_list:
-                            brand_models_data[brand_name][model] = {"basic": {"fuel_type": "unknown"}}
-                    else:
-                        # Structure simple: liste de modèles
-                        models_list = brand_data if isinstance(brand_data, list) else []
-                        brand_models_data[brand_name] = {}
-                        for model in models_list:
-                            brand_models_data[brand_name][model] = {"basic": {"fuel_type": "unknown"}}
-                
-                logger.info(f"Formaté pour scraping: {len(brand_models_data)} marques avec modèles")
-                
+            real_data = load_json("data/consolidated_brands_models.json")
+            consolidated_data = real_data["consolidated_brands_models"]
+            logger.info(f"Données consolidées chargées: {len(consolidated_data)} marques")
+            
+            # Convertir vers le format attendu par le scraper
+            brand_models_data = {}
+            for brand_name, brand_data in consolidated_data.items():
+                if isinstance(brand_data, dict) and "models" in brand_data:
+                    # Structure consolidée: {"models": [...], "model_count": n, "sources": [...]}
+                    models_list = brand_data["models"]
+                    brand_models_data[brand_name] = {}
+                    for model in models_list:
+                        brand_models_data[brand_name][model] = {"basic": {"fuel_type": "unknown"}}
+                else:
+                    # Structure simple: liste de modèles
+                    models_list = brand_data if isinstance(brand_data, list) else []
+                    brand_models_data[brand_name] = {}
+                    for model in models_list:
+                        brand_models_data[brand_name][model] = {"basic": {"fuel_type": "unknown"}}
+            
+            logger.info(f"Formaté pour scraping: {len(brand_models_data)} marques avec modèles")
+            
         except Exception as e:
             logger.error(f"Erreur chargement données consolidées: {e}")
             # Utiliser des données de démonstration en cas d'erreur
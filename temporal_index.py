@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Temporal Index - Présence des modèles dans le temps
+Table d'intervalles (source, marque, modèle, first_seen, last_seen) de la base
+data/snapshots.db, mise à jour à chaque snapshot indexé: un modèle présent dans
+deux snapshots consécutifs prolonge son intervalle, un modèle qui réapparaît
+après une absence ouvre un nouvel intervalle. Les questions "quels modèles
+existaient pour la marque X à la date D" ou "quand ce modèle a-t-il disparu"
+sont des requêtes indexées, sans relire les snapshots.
+
+Les dates sont résolues au dernier snapshot de la source à cette date.
+
+Usage:
+    python temporal_index.py at as24 BMW 2025-11-01              # Modèles à une date
+    python temporal_index.py between as24 BMW 2025-10-01 2025-11-01
+    python temporal_index.py model "Model 3" [--source cargurus] # Apparitions / disparitions
+    python temporal_index.py new as24 --since 2025-10-01         # Modèles apparus depuis
+    python temporal_index.py gone cargurus --since 2025-10-01    # Modèles disparus depuis
+    python temporal_index.py rebuild                             # Reconstruire les intervalles
+"""
+
+import argparse
+import re
+import time
+from datetime import datetime
+
+from snapshot_db import SOURCE_PREFIXES, SnapshotStore
+
+
+def parse_when(text):
+    """Date 'YYYY-MM-DD', 'YYYY-MM-DDTHH:MM[:SS]' ou version 'YYYYMMDD_HHMMSS' -> version comparable."""
+    text = text.strip()
+    if re.fullmatch(r"\d{8}_\d{6}", text):
+        return text
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+        # Une date seule désigne la fin de la journée
+        return datetime.strptime(text, "%Y-%m-%d").strftime("%Y%m%d_235959")
+    return datetime.fromisoformat(text.rstrip("Z")).strftime("%Y%m%d_%H%M%S")
+
+
+class TemporalIndex:
+    """Requêtes ponctuelles et par période sur les intervalles de présence."""
+
+    def __init__(self, store):
+        self.store = store
+        self.conn = store.conn
+
+    def sync(self, sources=SOURCE_PREFIXES):
+        """Indexe les snapshots JSON récents (les intervalles suivent)."""
+        for source in sources:
+            self.store.sync(source)
+
+    def version_at(self, source, when):
+        """Dernier snapshot de la source à une date, None s'il n'y en a pas encore."""
+        return self.conn.execute("SELECT MAX(version) FROM timeline WHERE source = ? AND version <= ?",
+                                 (source, parse_when(when))).fetchone()[0]
+
+    def next_version(self, source, version):
+        """Snapshot suivant une version, None si c'est le dernier."""
+        return self.conn.execute("SELECT MIN(version) FROM timeline WHERE source = ? AND version > ?",
+                                 (source, version)).fetchone()[0]
+
+    def models_at(self, source, brand, when):
+        """Modèles d'une marque à une date: (version utilisée, [modèles])."""
+        version = self.version_at(source, when)
+        if version is None:
+            return None, []
+        rows = self.conn.execute(
+            "SELECT name FROM model_intervals WHERE source = ? AND brand = ? AND last_seen >= ? AND first_seen <= ? "
+            "ORDER BY name", (source, brand, version, version))
+        return version, [row['name'] for row in rows]
+
+    def models_between(self, source, brand, start, end):
+        """Modèles présents à un moment de la période: [(modèle, first_seen, last_seen)]."""
+        start_version = self.version_at(source, start) or ""
+        end_version = self.version_at(source, end)
+        if end_version is None:
+            return []
+        return [(row['name'], row['first_seen'], row['last_seen']) for row in self.conn.execute(
+            "SELECT name, first_seen, last_seen FROM model_intervals WHERE source = ? AND brand = ? "
+            "AND last_seen >= ? AND first_seen <= ? ORDER BY name, first_seen",
+            (source, brand, start_version, end_version))]
+
+    def model_history(self, name, source=None):
+        """Intervalles d'un modèle: source, marque, apparition, dernière présence, disparition."""
+        query = "SELECT source, brand, first_seen, last_seen FROM model_intervals WHERE name = ?"
+        params = [name]
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        history = []
+        for row in self.conn.execute(query + " ORDER BY source, brand, first_seen", params).fetchall():
+            entry = dict(row)
+            entry['gone_at'] = self.next_version(row['source'], row['last_seen'])
+            history.append(entry)
+        return history
+
+    def appeared(self, source, since):
+        """Modèles apparus (nouvel intervalle) après une date: [(marque, modèle, version)]."""
+        first = self.conn.execute("SELECT MIN(version) FROM timeline WHERE source = ?", (source,)).fetchone()[0]
+        return [(row['brand'], row['name'], row['first_seen']) for row in self.conn.execute(
+            "SELECT brand, name, first_seen FROM model_intervals WHERE source = ? AND first_seen > ? "
+            "AND first_seen > ? ORDER BY first_seen, brand, name", (source, parse_when(since), first or ""))]
+
+    def disappeared(self, source, since):
+        """Modèles disparus après une date: [(marque, modèle, version de disparition)]."""
+        latest = self.conn.execute("SELECT MAX(version) FROM timeline WHERE source = ?", (source,)).fetchone()[0]
+        since_version = self.version_at(source, since) or ""
+        gone = []
+        for row in self.conn.execute(
+                "SELECT brand, name, last_seen FROM model_intervals WHERE source = ? AND last_seen >= ? "
+                "AND last_seen < ? ORDER BY last_seen, brand, name", (source, since_version, latest or "")):
+            # Un modèle réapparu plus tard n'est pas compté comme disparu
+            reopened = self.conn.execute(
+                "SELECT 1 FROM model_intervals WHERE source = ? AND brand = ? AND name = ? AND first_seen > ?",
+                (source, row['brand'], row['name'], row['last_seen'])).fetchone()
+            if not reopened:
+                gone.append((row['brand'], row['name'], self.next_version(source, row['last_seen'])))
+        return gone
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Présence des modèles dans le temps (index d'intervalles)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python temporal_index.py at as24 BMW 2025-11-01
+  python temporal_index.py between cargurus Tesla 2025-09-01 2025-11-01
+  python temporal_index.py model "Model 3"
+  python temporal_index.py gone cargurus --since 2025-10-01
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    at_parser = subparsers.add_parser('at', help='Modèles d\'une marque à une date')
+    at_parser.add_argument('source', choices=SOURCE_PREFIXES)
+    at_parser.add_argument('brand')
+    at_parser.add_argument('date')
+
+    between_parser = subparsers.add_parser('between', help='Modèles présents pendant une période')
+    between_parser.add_argument('source', choices=SOURCE_PREFIXES)
+    between_parser.add_argument('brand')
+    between_parser.add_argument('start')
+    between_parser.add_argument('end')
+
+    model_parser = subparsers.add_parser('model', help='Apparitions et disparitions d\'un modèle')
+    model_parser.add_argument('name')
+    model_parser.add_argument('--source', choices=SOURCE_PREFIXES)
+
+    for command, help_text in [('new', 'Modèles apparus depuis une date'), ('gone', 'Modèles disparus depuis une date')]:
+        change_parser = subparsers.add_parser(command, help=help_text)
+        change_parser.add_argument('source', choices=SOURCE_PREFIXES)
+        change_parser.add_argument('--since', required=True)
+
+    subparsers.add_parser('rebuild', help='Reconstruire les intervalles depuis les snapshots indexés')
+
+    args = parser.parse_args()
+
+    with SnapshotStore() as store:
+        index = TemporalIndex(store)
+        index.sync([args.source] if getattr(args, 'source', None) else SOURCE_PREFIXES)
+        start = time.perf_counter()
+
+        if args.command == 'rebuild':
+            for source in SOURCE_PREFIXES:
+                with store.conn:
+                    store.rebuild_intervals(source)
+            count = store.conn.execute("SELECT COUNT(*) FROM model_intervals").fetchone()[0]
+            print(f"🔁 {count} intervalles reconstruits")
+        elif args.command == 'at':
+            version, models = index.models_at(args.source, args.brand, args.date)
+            if version is None:
+                print(f"❌ Aucun snapshot {args.source} à cette date")
+            else:
+                print(f"📅 {args.source} {args.brand} au {args.date} (snapshot {version}): {len(models)} modèles")
+                for model in models:
+                    print(f"   • {model}")
+        elif args.command == 'between':
+            rows = index.models_between(args.source, args.brand, args.start, args.end)
+            print(f"📅 {args.source} {args.brand} du {args.start} au {args.end}: {len(rows)} modèles")
+            for name, first_seen, last_seen in rows:
+                print(f"   • {name:<30} {first_seen} → {last_seen}")
+        elif args.command == 'model':
+            history = index.model_history(args.name, args.source)
+            if not history:
+                print(f"❌ Modèle inconnu: {args.name}")
+            for entry in history:
+                gone = f"disparu au snapshot {entry['gone_at']}" if entry['gone_at'] else "toujours présent"
+                print(f"   {entry['source']:<10} {entry['brand']:<20} apparu {entry['first_seen']}, "
+                      f"vu jusqu'au {entry['last_seen']} ({gone})")
+        elif args.command == 'new':
+            rows = index.appeared(args.source, args.since)
+            print(f"🆕 {args.source}: {len(rows)} modèles apparus depuis {args.since}")
+            for brand, name, version in rows:
+                print(f"   + {brand} {name} ({version})")
+        else:
+            rows = index.disappeared(args.source, args.since)
+            print(f"👋 {args.source}: {len(rows)} modèles disparus depuis {args.since}")
+            for brand, name, version in rows:
+                print(f"   - {brand} {name} (absent au snapshot {version})")
+
+        print(f"⏱️ {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
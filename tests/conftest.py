@@ -0,0 +1,6 @@
+"""Configuration pytest: les scripts du projet sont des modules à la racine du dépôt."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
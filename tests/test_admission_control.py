@@ -0,0 +1,22 @@
+"""Arrêt du thread d'échantillonnage de l'admission (admission_control.py)."""
+
+import os
+import threading
+
+from admission_control import AdmissionController
+
+
+def samplers():
+    return [thread for thread in threading.enumerate() if thread.name == "admission-sampler"]
+
+
+def test_close_stops_the_sampler_and_allows_reuse(tmp_path):
+    with AdmissionController(tmp_path / "footprints.json") as controller:
+        for _ in range(3):
+            # Un lot par tour, comme le démon de planification
+            controller.watch("as24", os.getpid())
+            assert len(samplers()) == 1
+            controller.close()
+            assert samplers() == []
+        controller.watch("cguru", os.getpid())
+    assert samplers() == []
@@ -0,0 +1,46 @@
+"""Lecture du flux de changements pendant une écriture (change_feed.py)."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from change_feed import last_sequence, publish, read_events
+
+FEED = Path("data/change_feed.jsonl")
+
+
+def model_added(model):
+    return {"type": "model_added", "source": "as24", "brand": "BMW", "model": model}
+
+
+@pytest.fixture(autouse=True)
+def feed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert publish([model_added(f"X{i}") for i in range(1, 6)]) == 5
+
+
+def append_partial(seq):
+    line = json.dumps({"seq": seq, "ts": "2025-11-13T08:12:00Z", **model_added("iX")}) + "\n"
+    with open(FEED, 'ab') as f:
+        f.write(line[:len(line) // 2].encode())
+    return line[len(line) // 2:]
+
+
+def test_partial_last_line_is_left_for_the_next_poll():
+    rest = append_partial(6)
+    assert [event["seq"] for event in read_events()] == [1, 2, 3, 4, 5]
+    assert [event["seq"] for event in read_events(since=4)] == [5]
+    assert list(read_events(since=5)) == []
+    assert last_sequence() == 5
+
+    with open(FEED, 'ab') as f:
+        f.write(rest.encode())
+    assert [event["model"] for event in read_events(since=5)] == ["iX"]
+    assert last_sequence() == 6
+
+
+def test_publish_drops_a_line_left_by_an_interrupted_writer():
+    append_partial(6)
+    assert publish([model_added("iX2")]) == 6
+    assert [event["model"] for event in read_events(since=4)] == ["X5", "iX2"]
@@ -0,0 +1,96 @@
+"""Détection du format et compression des fichiers JSON (data_storage.py)."""
+
+import gzip
+
+import pytest
+
+import data_storage
+from data_storage import GZIP_MAGIC, ZSTD_MAGIC, configured_compression, decode, detect, load_json, save_json
+
+DOCUMENT = {"metadata": {"source": "as24"}, "brands_models": {"Škoda": ["Octavia", "Fabia"]}}
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(data_storage.COMPRESSION_ENV, raising=False)
+    monkeypatch.setattr(data_storage, "_missing_file_readers", [])
+    monkeypatch.setattr(data_storage, "_warned", set())
+
+
+def test_detect_by_magic_bytes():
+    assert detect(GZIP_MAGIC + b"\x08\x00") == 'gzip'
+    assert detect(ZSTD_MAGIC) == 'zstd'
+    assert detect(b'{"a"') == 'none'
+    assert detect(b"") == 'none'
+
+
+@pytest.mark.parametrize("codec", ['none', 'gzip'])
+def test_round_trip(codec):
+    path = save_json("data/doc.json", DOCUMENT, compression=codec)
+    with open(path, 'rb') as f:
+        assert detect(f.read(4)) == codec
+    assert load_json(path) == DOCUMENT
+
+
+@pytest.mark.skipif(data_storage.zstandard is None, reason="module zstandard absent")
+def test_round_trip_zstd():
+    path = save_json("data/doc.json", DOCUMENT, compression='zstd')
+    with open(path, 'rb') as f:
+        assert detect(f.read(4)) == 'zstd'
+    assert load_json(path) == DOCUMENT
+
+
+def test_codec_follows_environment(monkeypatch):
+    monkeypatch.setenv(data_storage.COMPRESSION_ENV, " GZIP ")
+    path = save_json("data/doc.json", DOCUMENT)
+    with open(path, 'rb') as f:
+        assert f.read(2) == GZIP_MAGIC
+    # Un fichier existant reste lisible quel que soit le réglage courant
+    monkeypatch.setenv(data_storage.COMPRESSION_ENV, "none")
+    assert load_json(path) == DOCUMENT
+
+
+def test_invalid_compression_is_rejected(monkeypatch):
+    monkeypatch.setenv(data_storage.COMPRESSION_ENV, "brotli")
+    with pytest.raises(ValueError):
+        configured_compression()
+
+
+def test_zstd_without_module_falls_back_to_gzip(monkeypatch):
+    monkeypatch.setattr(data_storage, "zstandard", None)
+    monkeypatch.setenv(data_storage.COMPRESSION_ENV, "zstd")
+    assert configured_compression() == 'gzip'
+    with pytest.raises(OSError):
+        decode(ZSTD_MAGIC + b"\x00" * 8)
+
+
+def test_decode_plain_and_gzip():
+    raw = b'{"a": 1}'
+    assert decode(raw) == raw
+    assert decode(gzip.compress(raw)) == raw
+
+
+def test_missing_file_readers():
+    calls = []
+
+    def unknown(path):
+        calls.append(path)
+        raise FileNotFoundError(path)
+
+    def archive(path):
+        return gzip.compress(b'{"archived": true}')
+
+    with pytest.raises(FileNotFoundError):
+        load_json("data/absent.json")
+
+    data_storage.register_missing_file_reader(unknown)
+    data_storage.register_missing_file_reader(unknown)
+    data_storage.register_missing_file_reader(archive)
+    assert load_json("data/absent.json") == {"archived": True}
+    assert calls == ["data/absent.json"]
+
+    # Un fichier présent est lu directement, sans passer par les lecteurs
+    save_json("data/present.json", DOCUMENT)
+    assert load_json("data/present.json") == DOCUMENT
+    assert calls == ["data/absent.json"]
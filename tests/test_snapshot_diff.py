@@ -0,0 +1,57 @@
+"""Différence par jointure de fusion entre deux snapshots (snapshot_diff.py)."""
+
+import io
+import json
+
+import pytest
+
+from snapshot_db import SnapshotStore
+from snapshot_diff import DiffSummary, diff_snapshots, write_json
+
+OLD = {"Audi": ["A3", "Q5"], "BMW": ["X1", "X3", "X5", "i4"], "Dacia": ["Sandero"], "Tesla": ["Model 3"]}
+NEW = {"Alpine": ["A110"], "Audi": ["A3", "Q5"], "BMW": ["X1", "X2", "i5", "X1"], "Tesla": ["Model 3", "Model Y"]}
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with SnapshotStore(tmp_path / "snapshots.db", tmp_path / "data") as store:
+        old_id = store.add("as24", {"metadata": {}, "brands_models": OLD}, "20251101_080000")
+        new_id = store.add("as24", {"metadata": {}, "brands_models": NEW}, "20251113_080000")
+        yield store, old_id, new_id
+
+
+def test_merge_join_reports_changed_brands(snapshots):
+    store, old_id, new_id = snapshots
+    changes = {change['brand']: change for change in diff_snapshots(store, old_id, new_id)}
+    assert list(changes) == ["Alpine", "BMW", "Dacia", "Tesla"]
+    assert changes["Alpine"] == {"brand": "Alpine", "status": "added", "added": ["A110"], "removed": [],
+                                 "old_count": 0, "new_count": 1}
+    assert changes["Dacia"]['status'] == "removed" and changes["Dacia"]['removed'] == ["Sandero"]
+    assert changes["BMW"]['added'] == ["X2", "i5"]
+    assert changes["BMW"]['removed'] == ["X3", "X5", "i4"]
+    assert changes["Tesla"]['added'] == ["Model Y"]
+
+
+def test_unchanged_brands_on_request(snapshots):
+    store, old_id, new_id = snapshots
+    statuses = {change['brand']: change['status']
+                for change in diff_snapshots(store, old_id, new_id, include_unchanged=True)}
+    assert statuses["Audi"] == "unchanged"
+    assert list(statuses) == sorted(statuses)
+
+
+def test_summary_counts_match_brand_counts(snapshots):
+    store, old_id, new_id = snapshots
+    summary = DiffSummary(store, old_id, new_id)
+    out = io.StringIO()
+    write_json(out, "as24", {"version": "20251101_080000"}, {"version": "20251113_080000"},
+               diff_snapshots(store, old_id, new_id, include_unchanged=True), summary)
+    document = json.loads(out.getvalue())
+    totals = document['summary']
+    # Le doublon "X1" de NEW est compté une fois, comme dans les comptes par marque
+    assert totals['current_models'] == sum(change['new_count'] for change in document['brands']) == 8
+    assert totals['previous_models'] == sum(change['old_count'] for change in document['brands']) == 8
+    assert (totals['models_added'], totals['models_removed']) == (4, 4)
+    assert totals['new_brands'] == ["Alpine"] and totals['removed_brands'] == ["Dacia"]
+    assert [change['brand'] for change in totals['significant_changes']] == ["BMW"]
@@ -0,0 +1,39 @@
+"""Empreinte canonique des snapshots et déduplication des écritures (snapshot_io.py)."""
+
+from data_storage import save_json
+from snapshot_io import canonical_hash, load_ledger, record_snapshot, unchanged_snapshot
+
+BRANDS_MODELS = {"BMW": ["X1", "X3", "i4"], "Audi": ["A3", "Q5"]}
+
+
+def snapshot(brands_models, scraped_at="2025-11-13T08:00:00Z"):
+    return {"metadata": {"scraped_at": scraped_at}, "brands_models": brands_models}
+
+
+def test_hash_ignores_brand_and_model_order():
+    reordered = {"Audi": ["Q5", "A3"], "BMW": ["i4", "X1", "X3"]}
+    assert canonical_hash(reordered) == canonical_hash(BRANDS_MODELS)
+
+
+def test_hash_changes_with_content():
+    assert canonical_hash({**BRANDS_MODELS, "BMW": ["X1", "X3"]}) != canonical_hash(BRANDS_MODELS)
+    assert canonical_hash({**BRANDS_MODELS, "Tesla": []}) != canonical_hash(BRANDS_MODELS)
+    # Un modèle déplacé d'une marque à l'autre n'a pas la même empreinte
+    assert canonical_hash({"BMW": ["X1"], "Audi": ["A3", "Q5", "X3", "i4"]}) != canonical_hash(BRANDS_MODELS)
+
+
+def test_unchanged_snapshot_is_not_written_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = "data/as24_scraped_models_20251113_080000.json"
+    document = snapshot(BRANDS_MODELS)
+    assert unchanged_snapshot("as24", document) is None
+    save_json(first, document)
+    record_snapshot("as24", first, document)
+
+    rescraped = snapshot({"Audi": ["Q5", "A3"], "BMW": ["i4", "X3", "X1"]}, "2025-11-14T08:00:00Z")
+    assert unchanged_snapshot("as24", rescraped) == first
+    assert unchanged_snapshot("cargurus", rescraped) is None
+    assert unchanged_snapshot("as24", snapshot({**BRANDS_MODELS, "Tesla": ["Model 3"]})) is None
+
+    statuses = [(entry["status"], entry["file"]) for entry in load_ledger("as24")]
+    assert statuses == [("written", first), ("unchanged", first)]
@@ -0,0 +1,70 @@
+"""Manifeste des fichiers de data/ sous écritures concurrentes (snapshot_manifest.py)."""
+
+import multiprocessing
+import threading
+from pathlib import Path
+
+import pytest
+
+from data_storage import save_json
+from snapshot_manifest import latest_entry, latest_path, load_manifest, record_file
+
+
+def write_snapshot(index, source="as24"):
+    path = f"data/{source}_scraped_models_20251101_{index:06d}.json"
+    document = {"metadata": {}, "brands_models": {"BMW": [f"X{index}"]}}
+    save_json(path, document)
+    return path, document
+
+
+def record_many(indexes):
+    for index in indexes:
+        path, document = write_snapshot(index)
+        record_file("as24", "scraped_models", path, document)
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("data").mkdir()
+
+
+def test_concurrent_threads_lose_no_entry():
+    threads = [threading.Thread(target=record_many, args=(range(t * 10, t * 10 + 10),)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manifest = load_manifest()
+    assert len(manifest["files"]) == 80
+    assert manifest["latest"]["as24/scraped_models"]["version"] == "20251101_000079"
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork indisponible")
+def test_concurrent_processes_lose_no_entry():
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=record_many, args=(range(p * 10, p * 10 + 10),)) for p in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(load_manifest()["files"]) == 40
+
+
+def test_older_version_does_not_replace_latest():
+    record_many([5])
+    record_many([3])
+    assert latest_path("as24", "scraped_models") == Path("data/as24_scraped_models_20251101_000005.json")
+
+
+def test_latest_entry_scans_disk_and_forgets_deleted_files():
+    write_snapshot(1)
+    write_snapshot(2)
+    assert latest_entry("as24", "scraped_models")["version"] == "20251101_000002"
+    assert "data/as24_scraped_models_20251101_000002.json" in load_manifest()["files"]
+
+    record_many([1])
+    Path("data/as24_scraped_models_20251101_000002.json").unlink()
+    assert latest_entry("as24", "scraped_models")["version"] == "20251101_000001"
+    assert latest_entry("cargurus", "scraped_models") is None
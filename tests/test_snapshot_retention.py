@@ -0,0 +1,84 @@
+"""Paliers de rétention et archivage des snapshots (snapshot_retention.py)."""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from data_storage import load_json, save_json
+from snapshot_manifest import load_manifest, record_file
+from snapshot_retention import apply_retention, archived_versions, parse_policy, plan
+
+NOW = datetime(2025, 11, 1)
+
+
+def test_parse_policy():
+    assert parse_policy("all:30,weekly:365,monthly") == [('all', 30), ('weekly', 365), ('monthly', None)]
+    assert parse_policy("daily:7") == [('daily', 7)]
+
+
+@pytest.mark.parametrize("text", ["hourly:3", "weekly:365,all:30", "monthly,all:30", "all:abc"])
+def test_parse_policy_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_policy(text)
+
+
+def test_plan_keeps_one_version_per_period_of_each_tier():
+    versions = [
+        "20251030_120000", "20251029_120000",   # < 30 jours: tout est gardé
+        "20250903_120000", "20250902_120000",   # même semaine ISO: la plus récente
+        "20250825_120000",                      # semaine suivante
+        "20240315_120000", "20240310_120000",   # > 365 jours, même mois
+        "20240201_120000",
+    ]
+    keep = plan(versions, parse_policy("all:30,weekly:365,monthly"), now=NOW)
+    assert keep == {
+        "20251030_120000", "20251029_120000",
+        "20250903_120000", "20250825_120000",
+        "20240315_120000", "20240201_120000",
+    }
+
+
+def test_plan_always_keeps_latest_version():
+    versions = ["20200101_000000", "20190101_000000"]
+    assert plan(versions, parse_policy("all:30"), now=NOW) == {"20200101_000000"}
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("data").mkdir()
+    paths = {}
+    for version in ["20251030_120000", "20250903_120000", "20250902_120000"]:
+        path = f"data/as24_scraped_models_{version}.json"
+        document = {"metadata": {"version": version}, "brands_models": {"BMW": ["X1"]}}
+        save_json(path, document)
+        record_file("as24", "scraped_models", path, document)
+        paths[version] = Path(path)
+    return paths
+
+
+def test_dry_run_leaves_files_in_place(snapshots):
+    report = apply_retention("all:30,weekly:365", now=NOW)
+    assert report == {"as24_scraped_models": (2, ["20250902_120000"])}
+    assert all(path.exists() for path in snapshots.values())
+
+
+def test_archived_files_stay_readable(snapshots):
+    apply_retention("all:30,weekly:365", dry_run=False, now=NOW)
+    archived = snapshots["20250902_120000"]
+
+    assert not archived.exists()
+    assert snapshots["20250903_120000"].exists()
+    assert archived_versions("as24_scraped_models") == [("20250902_120000", archived)]
+    assert str(archived) not in load_manifest()["files"]
+    assert load_json(archived)["metadata"]["version"] == "20250902_120000"
+
+    # Deuxième passage: rien de nouveau à archiver, l'archive reste cohérente
+    assert apply_retention("all:30,weekly:365", dry_run=False, now=NOW) == {"as24_scraped_models": (2, [])}
+    assert load_json(archived)["metadata"]["version"] == "20250902_120000"
+
+
+def test_missing_file_outside_archive_still_raises(snapshots):
+    with pytest.raises(FileNotFoundError):
+        load_json("data/as24_scraped_models_20200101_000000.json")
@@ -0,0 +1,68 @@
+"""Maintenance des intervalles de présence des modèles (snapshot_db.py, temporal_index.py)."""
+
+import pytest
+
+from snapshot_db import SnapshotStore
+from temporal_index import TemporalIndex
+
+V1, V2, V3 = "20251001_080000", "20251008_080000", "20251015_080000"
+
+SNAPSHOTS = {
+    V1: {"BMW": ["X1", "X3"], "Audi": ["A3"]},
+    V2: {"BMW": ["X1"], "Audi": ["A3", "Q5"]},
+    V3: {"BMW": ["X1", "X3"], "Audi": ["A3", "Q5"]},
+}
+
+EXPECTED = [
+    ("Audi", "A3", V1, V3),
+    ("Audi", "Q5", V2, V3),
+    ("BMW", "X1", V1, V3),
+    ("BMW", "X3", V1, V1),
+    ("BMW", "X3", V3, V3),
+]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Le flux de changements est écrit dans data/ du répertoire courant
+    monkeypatch.chdir(tmp_path)
+    with SnapshotStore(tmp_path / "snapshots.db", tmp_path / "data") as store:
+        yield store
+
+
+def add(store, version):
+    store.add("as24", {"metadata": {}, "brands_models": SNAPSHOTS[version]}, version)
+
+
+def intervals(store):
+    return [tuple(row) for row in store.conn.execute(
+        "SELECT brand, name, first_seen, last_seen FROM model_intervals WHERE source = 'as24' "
+        "ORDER BY brand, name, first_seen")]
+
+
+def test_intervals_extend_and_reopen(store):
+    for version in (V1, V2, V3):
+        add(store, version)
+    assert intervals(store) == EXPECTED
+
+
+def test_out_of_order_snapshot_rebuilds_intervals(store):
+    for version in (V1, V3, V2):
+        add(store, version)
+    assert intervals(store) == EXPECTED
+    store.rebuild_intervals("as24")
+    assert intervals(store) == EXPECTED
+
+
+def test_point_in_time_queries(store):
+    for version in (V1, V2, V3):
+        add(store, version)
+    index = TemporalIndex(store)
+    assert index.models_at("as24", "BMW", "2025-10-10") == (V2, ["X1"])
+    assert index.models_at("as24", "BMW", "2025-09-01") == (None, [])
+    assert index.models_between("as24", "BMW", "2025-10-02", "2025-10-09") == [("X1", V1, V3), ("X3", V1, V1)]
+    assert [(h['first_seen'], h['last_seen'], h['gone_at']) for h in index.model_history("X3")] == \
+        [(V1, V1, V2), (V3, V3, None)]
+    # X3 a disparu puis est revenu: il n'est pas compté comme disparu
+    assert index.disappeared("as24", "2025-10-01") == []
+    assert index.appeared("as24", "2025-10-01") == [("Audi", "Q5", V2), ("BMW", "X3", V3)]
@@ -0,0 +1,86 @@
+"""Reprise des baux expirés de la file de travail (work_queue.py)."""
+
+import time
+
+from brand_timings import ATTEMPTS_COLUMN
+from data_storage import load_json
+from work_queue import WorkQueue, run_worker
+
+LEASE = 0.2
+TIMING = [1.0, 1, 0.0, None]
+
+
+def make_queue(tmp_path, brands=("BMW", "Audi"), max_attempts=3):
+    queue = WorkQueue(tmp_path / "queue.db", lease_seconds=LEASE, max_attempts=max_attempts)
+    expected = {brand: float(len(brands) - i) for i, brand in enumerate(brands)}
+    run_id = queue.create_run("mock", [(brand, {"brand": brand}) for brand in brands], expected=expected)
+    return queue, run_id
+
+
+def test_lease_follows_expected_duration(tmp_path):
+    queue, run_id = make_queue(tmp_path)
+    assert queue.lease("w1", run_id=run_id)['brand'] == "BMW"
+    assert queue.lease("w2", run_id=run_id)['brand'] == "Audi"
+    assert queue.lease("w3", run_id=run_id) is None
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue, run_id = make_queue(tmp_path, brands=("BMW",))
+    stale = queue.lease("crashed", run_id=run_id)
+    assert queue.lease("w2", run_id=run_id) is None
+
+    time.sleep(LEASE * 1.5)
+    reclaimed = queue.lease("w2", run_id=run_id)
+    assert reclaimed['id'] == stale['id']
+    assert reclaimed['attempts'] == 2
+
+    # Le worker arrêté revient: son bail ne vaut plus rien
+    assert not queue.heartbeat(stale)
+    assert not queue.complete(stale, ["X1"], TIMING)
+    assert queue.complete(reclaimed, ["X1", "X3"], TIMING)
+    assert queue.status(run_id) == {'done': 1}
+    brands_models, timings = queue.results(run_id)
+    assert brands_models["BMW"] == ["X1", "X3"]
+    assert timings["BMW"][ATTEMPTS_COLUMN] == 2
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    queue, run_id = make_queue(tmp_path, brands=("BMW",))
+    task = queue.lease("w1", run_id=run_id)
+    for _ in range(3):
+        time.sleep(LEASE * 0.5)
+        assert queue.heartbeat(task)
+    assert queue.lease("w2", run_id=run_id) is None
+    assert queue.complete(task, ["X5"], TIMING)
+
+
+def test_failed_task_is_retried_and_counts_attempts(tmp_path):
+    queue, run_id = make_queue(tmp_path, brands=("BMW",))
+    queue.fail(queue.lease("w1", run_id=run_id), RuntimeError("timeout"))
+    retry = queue.lease("w2", run_id=run_id)
+    assert queue.complete(retry, ["X1"], TIMING)
+    assert queue.results(run_id)[1]["BMW"] == [1.0, 2, 0.0, None]
+
+
+def test_task_fails_after_max_attempts(tmp_path):
+    queue, run_id = make_queue(tmp_path, brands=("BMW",), max_attempts=2)
+    for attempt in (1, 2):
+        assert queue.lease(f"crashing-{attempt}", run_id=run_id)['attempts'] == attempt
+        time.sleep(LEASE * 1.5)
+    assert queue.lease("w3", run_id=run_id) is None
+    assert queue.status(run_id) == {'failed': 1}
+
+
+def test_run_is_assembled_when_last_task_exhausts_its_attempts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queue, run_id = make_queue(tmp_path, max_attempts=1)
+    assert queue.complete(queue.lease("w1", run_id=run_id), ["X1"], TIMING)
+    queue.lease("crashed", run_id=run_id)
+    time.sleep(LEASE * 1.5)
+
+    # Le nouveau worker n'a rien à scraper mais assemble le snapshot
+    assert run_worker(queue, "mock", "w2", run_id=run_id) == 0
+    run = queue.runs(run_id=run_id)[0]
+    assert queue.status(run_id) == {'done': 1, 'failed': 1}
+    assert run['finalized_at'] is not None
+    assert load_json(run['output_file'])["brands_models"] == {"BMW": ["X1"], "Audi": []}
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Tracing léger des chemins critiques - Format Chrome Trace Event
+Mesure où passe le temps de chaque scraper (navigation, sélection, attente,
+extraction des options, pause de politesse, sauvegarde) et des étapes de
+consolidation / spécifications techniques.
+
+Activation (désactivé par défaut, coût quasi nul):
+    ALLCARS_TRACE=logs/traces python autoscout24_scraper.py --test
+    ALLCARS_TRACE=logs/traces python update_all.py        # propagé aux sous-processus
+
+Chaque processus écrit logs/traces/trace_<script>_<pid>.json au fil de l'eau
+(par lots de FLUSH_EVERY événements, à la fin de chaque étape du pipeline et à
+la sortie): la mémoire reste bornée pour les longues exécutions (démon) et un
+processus tué garde ses événements déjà écrits. Le fichier est un tableau
+d'événements (format "JSON Array" du Trace Event), lisible même sans le "]"
+final. Les fichiers se chargent dans chrome://tracing ou https://ui.perfetto.dev
+
+Fusion de plusieurs fichiers en un seul:
+    python tracing.py merge logs/traces -o logs/trace_full.json
+"""
+
+import argparse
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+TRACE_ENV = "ALLCARS_TRACE"
+
+# Décalage pour convertir perf_counter() en temps epoch (fusion multi-processus)
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+_NULL_SPAN = nullcontext()
+
+# Événements gardés en mémoire avant d'être ajoutés au fichier de trace
+FLUSH_EVERY = 1000
+
+
+class _TraceState:
+    """État global du traceur (un par processus)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.output_dir = None
+        self.output_file = None
+        self.events = []
+        self.lock = threading.Lock()
+        self.registered = False
+
+
+_state = _TraceState()
+
+
+def enable_tracing(output_dir="logs/traces"):
+    """Active le tracing pour ce processus et ses sous-processus."""
+    _state.enabled = True
+    _state.output_dir = Path(output_dir)
+    os.environ[TRACE_ENV] = str(output_dir)
+    if not _state.registered:
+        atexit.register(save_trace)
+        _state.registered = True
+
+
+def is_enabled():
+    """Indique si le tracing est actif."""
+    return _state.enabled
+
+
+def _now_us():
+    return (_EPOCH_OFFSET + time.perf_counter()) * 1_000_000
+
+
+def _record(name, category, start_us, end_us, args):
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": round(start_us, 3),
+        "dur": round(end_us - start_us, 3),
+        "pid": os.getpid(),
+        "tid": threading.get_ident()
+    }
+    if args:
+        event["args"] = {key: str(value) for key, value in args.items()}
+    with _state.lock:
+        _state.events.append(event)
+        full = len(_state.events) >= FLUSH_EVERY
+    if full:
+        flush_trace()
+
+
+@contextmanager
+def _span(name, category, args):
+    start = _now_us()
+    try:
+        yield
+    finally:
+        _record(name, category, start, _now_us(), args)
+
+
+def span(name, category="allcars", **args):
+    """Context manager qui enregistre une durée. Sans effet si le tracing est inactif."""
+    if not _state.enabled:
+        return _NULL_SPAN
+    return _span(name, category, args)
+
+
+def traced(name=None, category="allcars"):
+    """Décorateur qui trace chaque appel de la fonction décorée."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            start = _now_us()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(span_name, category, start, _now_us(), None)
+
+        return wrapper
+    return decorator
+
+
+def _trace_file():
+    script = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+    return _state.output_dir / f"trace_{script}_{os.getpid()}.json"
+
+
+def flush_trace():
+    """Ajoute les événements en mémoire au fichier de trace du processus (créé au premier appel)."""
+    with _state.lock:
+        events, _state.events = _state.events, []
+        if not events:
+            return None
+        try:
+            if _state.output_file is None:
+                output_file = _trace_file()
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                process_name = {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "args": {"name": f"{Path(sys.argv[0]).name} ({os.getpid()})"}
+                }
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write("[\n" + json.dumps(process_name, ensure_ascii=False))
+                _state.output_file = output_file
+            with open(_state.output_file, 'a', encoding='utf-8') as f:
+                f.write("".join(",\n" + json.dumps(event, ensure_ascii=False) for event in events))
+            return str(_state.output_file)
+        except OSError:
+            return None
+
+
+def save_trace():
+    """Écrit les derniers événements et termine le tableau JSON (à la sortie du processus)."""
+    flush_trace()
+    if _state.output_file is None:
+        return None
+    try:
+        with open(_state.output_file, 'a', encoding='utf-8') as f:
+            f.write("\n]\n")
+        return str(_state.output_file)
+    except OSError:
+        return None
+
+
+def load_events(trace_file):
+    """Événements d'un fichier de trace (tableau, éventuellement non terminé, ou objet "traceEvents")."""
+    with open(trace_file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        # Processus interrompu: tableau sans "]" final
+        data = json.loads(text.rstrip().rstrip(',') + "]")
+    return data if isinstance(data, list) else data.get("traceEvents", [])
+
+
+def merge_traces(input_path, output_file):
+    """Fusionne plusieurs fichiers de trace en un seul fichier chargeable."""
+    input_path = Path(input_path)
+    files = sorted(input_path.glob("trace_*.json")) if input_path.is_dir() else [input_path]
+    merged = []
+    for trace_file in files:
+        merged.extend(load_events(trace_file))
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": merged, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    return len(files), len(merged)
+
+
+def summarize_trace(input_path, top=20):
+    """Affiche le temps total par nom de span (agrégé sur tous les fichiers)."""
+    input_path = Path(input_path)
+    files = sorted(input_path.glob("trace_*.json")) if input_path.is_dir() else [input_path]
+    totals = {}
+    for trace_file in files:
+        for event in load_events(trace_file):
+            if event.get("ph") != "X":
+                continue
+            total, count = totals.get(event["name"], (0.0, 0))
+            totals[event["name"]] = (total + event["dur"], count + 1)
+
+    print(f"{'Span':<50} | {'Calls':>6} | {'Total':>10} | {'Mean':>9}")
+    print("-" * 84)
+    for span_name, (total, count) in sorted(totals.items(), key=lambda x: x[1][0], reverse=True)[:top]:
+        print(f"{span_name:<50} | {count:>6} | {total / 1e6:>9.2f}s | {total / count / 1e3:>7.1f}ms")
+
+
+# Activation automatique via variable d'environnement (propagée aux sous-processus)
+if os.environ.get(TRACE_ENV):
+    enable_tracing(os.environ[TRACE_ENV])
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="Outils de trace (format Chrome Trace Event)",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    merge_parser = subparsers.add_parser('merge', help='Fusionner les fichiers de trace')
+    merge_parser.add_argument('input', help='Dossier de traces ou fichier')
+    merge_parser.add_argument('-o', '--output', default='logs/trace_merged.json',
+                              help='Fichier de sortie')
+
+    summary_parser = subparsers.add_parser('summary', help='Résumé du temps par span')
+    summary_parser.add_argument('input', help='Dossier de traces ou fichier')
+    summary_parser.add_argument('--top', type=int, default=20, help='Nombre de spans affichés')
+
+    args = parser.parse_args()
+
+    if args.command == 'merge':
+        files_count, events_count = merge_traces(args.input, args.output)
+        print(f"✅ {files_count} fichiers fusionnés ({events_count} événements): {args.output}")
+    elif args.command == 'summary':
+        summarize_trace(args.input, args.top)
+
+
+if __name__ == "__main__":
+    main()
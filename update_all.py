@@ -2,24 +2,61 @@
 """
 Main Orchestrator Script - Automobile Data Update System
 Handles parallel execution of AS24 and CarGurus scrapers with consolidation
+Menu options are stage selections of the pipeline DAG (see pipeline_dag.py)
 """
 
+import argparse
+import contextlib
 import subprocess
 import sys
 import time
-import json
 import os
 from pathlib import Path
 from datetime import datetime
-import concurrent.futures
 import threading
 
+from tracing import span
+from pipeline_dag import PipelineDAG, build_stages, DEFAULT_BUDGET, PIPELINE_STAGES, SCRAPER_STAGES
+from build_cache import BuildCache
+from inprocess_runner import InProcessRunner
+from progress_channel import ProgressServer, ProgressDashboard
+from eta_estimator import ETAEstimator
+from admission_control import AdmissionController
+from snapshot_manifest import file_stats, latest_path
+
+# Menu options as stage selections of the pipeline DAG
+MENU_SELECTIONS = {
+    "0": ("🔄 Starting COMPLETE UPDATE (parallel + consolidation)", SCRAPER_STAGES + ['consolidation']),
+    "1": ("🇪🇺 Starting AutoScout24 ONLY update", ['as24']),
+    "2": ("🇺🇸 Starting CarGurus ONLY update", ['cguru']),
+    "3": ("🇧🇬 Starting Auto-Data ONLY update", ['autodata']),
+    "4": ("🌍 Starting Carfolio ONLY update", ['carfolio']),
+    "5": ("🔄 Starting AS24 + CarGurus update (no auto-data)", ['as24', 'cguru']),
+    "6": ("🔄 Starting AS24 + Auto-Data update (no car-gurus)", ['as24', 'autodata']),
+    "7": ("🔄 Starting CarGurus + Auto-Data update (no as24)", ['cguru', 'autodata']),
+    "8": ("🔄 Starting AS24 + Carfolio update (no others)", ['as24', 'carfolio']),
+    "9": ("🔄 Starting CarGurus + Carfolio update (no others)", ['cguru', 'carfolio']),
+    "10": ("🔄 Starting Auto-Data + Carfolio update (no others)", ['autodata', 'carfolio']),
+    "11": ("🔄 Starting ALL FOUR sources update (no consolidation)", SCRAPER_STAGES),
+    "12": ("🔗 Starting CONSOLIDATION ONLY", ['consolidation']),
+    "14": ("🚀 Starting FULL PIPELINE (sources → consolidation → technical → analysis)",
+           [spec['name'] for spec in PIPELINE_STAGES]),
+}
+
 class AutoScoutOrchestrator:
     """Main orchestrator for automotive data updates."""
     
-    def __init__(self):
+    def __init__(self, budget=None, force=False, in_process=False, admission=True):
         self.start_time = None
         self.results = {}
+        self.budget = budget or DEFAULT_BUDGET
+        self.build_cache = BuildCache(force=force)
+        self.in_process = in_process
+        self.progress = None
+        self.eta = None
+        self.eta_accuracy = []
+        self.admission = AdmissionController() if admission else None
+        self.peak_concurrency = 0
     
     def display_banner(self):
         """Display the main banner."""
@@ -47,38 +84,47 @@ class AutoScoutOrchestrator:
         print("  11. 🔄 Update ALL FOUR sources (NO consolidation)")
         print("  12. 🔗 Consolidate data ONLY")
         print("  13. 📊 Show stored statistics + Quit")
+        print("  14. 🚀 Full pipeline (sources → consolidation → technical → analysis)")
         print()
     
-    def run_scraper(self, script_name, description):
+    def run_scraper(self, script_name, description, stage_name=None):
         """Run a single scraper with timing - no live output to avoid encoding issues."""
         print(f"🚀 Starting: {description}")
         start_time = time.time()
         
         try:
             # Run the scraper script (no live output to avoid encoding issues)
-            result = subprocess.run([
-                sys.executable, script_name
-            ], capture_output=True, text=True, timeout=3600, encoding='utf-8', errors='replace')
+            with span(f"orchestrator.{script_name}"):
+                process = subprocess.Popen([
+                    sys.executable, script_name
+                ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace')
+                self.watch(stage_name, process)
+                try:
+                    stdout, stderr = process.communicate(timeout=3600)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                    raise
             
             duration = time.time() - start_time
             
-            if result.returncode == 0:
+            if process.returncode == 0:
                 print(f"✅ {description} completed in {duration:.1f}s")
                 return {
                     'success': True,
                     'duration': duration,
-                    'output': result.stdout,
+                    'output': stdout,
                     'error': None
                 }
             else:
                 print(f"❌ {description} failed after {duration:.1f}s")
-                if result.stderr:
-                    print(f"Error: {result.stderr}")
+                if stderr:
+                    print(f"Error: {stderr}")
                 return {
                     'success': False,
                     'duration': duration,
-                    'output': result.stdout,
-                    'error': result.stderr
+                    'output': stdout,
+                    'error': stderr
                 }
                 
         except subprocess.TimeoutExpired:
@@ -98,95 +144,50 @@ class AutoScoutOrchestrator:
                 'error': str(e)
             }
     
-    def run_consolidation(self):
-        """Run the consolidation script."""
-        return self.run_scraper(
-            'consolidate_brands_models.py',
-            '🔗 Data Consolidation'
-        )
+    def run_stage(self, spec):
+        """Run one pipeline stage: scrapers with live progress, other stages with captured output."""
+        if spec['name'] in SCRAPER_STAGES:
+            return self.run_parallel_scraper(spec['script'], spec['description'], spec['emoji'], spec['name'])
+        return self.run_scraper(spec['script'], f"{spec['emoji']} {spec['description']}", spec['name'])
     
-    def run_as24_only(self):
-        """Run only AutoScout24 scraper."""
-        return self.run_scraper(
-            'autoscout24_scraper.py',
-            '🇪🇺 AutoScout24 (EU Market)'
-        )
-    
-    def run_cguru_only(self):
-        """Run only CarGurus scraper."""
-        return self.run_scraper(
-            'car_gurus_scraper.py',
-            '🇺🇸 CarGurus (US Market)'
-        )
-    
-    def run_auto_data_only(self):
-        """Run only Auto-Data scraper."""
-        return self.run_scraper(
-            'autodata_scraper.py',
-            '🇧🇬 Auto-Data (Technical Specs)'
-        )
-
-    def run_carfolio_only(self):
-        """Run only Carfolio scraper."""
-        return self.run_scraper(
-            'carfolio_scraper.py',
-            '🌍 Carfolio (Global Brands/Models)'
-        )
+    def watch(self, stage_name, process):
+        """Measure the memory and CPU of a stage process for admission control."""
+        if self.admission and stage_name:
+            self.admission.watch(stage_name, process.pid)
     
-    def run_parallel_scraper(self, script_name, source_name, source_emoji):
-        """Run a single scraper and return result with progress tracking via progress files."""
-        print(f"🚀 {source_emoji} Starting: {source_name}")
+    def run_parallel_scraper(self, script_name, source_name, source_emoji, source_id=None):
+        """Run a single scraper and return result with live progress from its event stream."""
+        if self.progress is None:
+            # Standalone call: temporary progress channel for this scraper only
+            with ProgressServer() as self.progress:
+                try:
+                    return self.run_parallel_scraper(script_name, source_name, source_emoji, source_id)
+                finally:
+                    self.progress = None
+
+        source_id = source_id or Path(script_name).stem
+        dashboard = self.progress.dashboard
+        dashboard.log(f"🚀 {source_emoji} Starting: {source_name}")
+        dashboard.register(source_id, source_name, source_emoji)
         start_time = time.time()
         
-        # Create progress file for this scraper
-        progress_file = f"progress_{source_name.replace(' ', '_').replace('(', '').replace(')', '').replace('-', '').lower()}.txt"
-        Path(".").mkdir(exist_ok=True)
-        
-        # Remove old progress file if exists
-        if os.path.exists(progress_file):
-            os.remove(progress_file)
-        
         try:
-            # Run the scraper script
+            # Run the scraper script, progress events arrive on the progress channel
             process = subprocess.Popen([
                 sys.executable, script_name
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+               env={**os.environ, **self.progress.env_for(source_id)})
+            self.watch(source_id, process)
             
-            # Monitor progress by reading the progress file
-            last_lines = set()
-            
-            while process.poll() is None:
-                try:
-                    if os.path.exists(progress_file):
-                        with open(progress_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            lines = f.readlines()
-                            
-                            # Show new progress lines
-                            for line in lines:
-                                line = line.strip()
-                                if line and line not in last_lines:
-                                    print(f"  {source_emoji} {line}")
-                                    last_lines.add(line)
-                    
-                    time.sleep(1)  # Check every second
-                except Exception:
-                    pass  # Ignore any reading errors
-                
-            # Wait for process to complete
-            process.wait()
+            with span(f"orchestrator.{script_name}"):
+                process.wait()
+            self.progress.drain(source_id)
             duration = time.time() - start_time
-            
-            # Read final results
-            final_output = ""
-            if os.path.exists(progress_file):
-                try:
-                    with open(progress_file, 'r', encoding='utf-8', errors='replace') as f:
-                        final_output = f.read()
-                except:
-                    pass
+            final_output = '\n'.join(dashboard.messages(source_id))
+            dashboard.finish(source_id, process.returncode == 0)
             
             if process.returncode == 0:
-                print(f"  ✅ {source_name} completed in {duration:.1f}s")
+                dashboard.log(f"  ✅ {source_name} completed in {duration:.1f}s")
                 return {
                     'success': True,
                     'duration': duration,
@@ -194,7 +195,7 @@ class AutoScoutOrchestrator:
                     'error': None
                 }
             else:
-                print(f"  ❌ {source_name} failed after {duration:.1f}s")
+                dashboard.log(f"  ❌ {source_name} failed after {duration:.1f}s")
                 return {
                     'success': False,
                     'duration': duration,
@@ -203,224 +204,39 @@ class AutoScoutOrchestrator:
                 }
                 
         except Exception as e:
-            print(f"  💥 {source_name} failed with exception: {e}")
+            dashboard.finish(source_id, False)
+            dashboard.log(f"  💥 {source_name} failed with exception: {e}")
             return {
                 'success': False,
                 'duration': 0,
                 'output': '',
                 'error': str(e)
             }
-        finally:
-            # Clean up progress file
-            if os.path.exists(progress_file):
-                os.remove(progress_file)
-    
-    def run_parallel_update(self):
-        """Run all four scrapers in parallel, then consolidate."""
-        print("🚀 Starting PARALLEL UPDATE (all four sources)...")
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            # Submit all four scraper jobs
-            future_as24 = executor.submit(
-                self.run_parallel_scraper,
-                'autoscout24_scraper.py',
-                'AutoScout24 (EU Market)',
-                '🇪🇺'
-            )
-            future_cguru = executor.submit(
-                self.run_parallel_scraper,
-                'car_gurus_scraper.py',
-                'CarGurus (US Market)',
-                '🇺🇸'
-            )
-            future_autodata = executor.submit(
-                self.run_parallel_scraper,
-                'autodata_scraper.py',
-                'Auto-Data (Technical Specs)',
-                '🇧🇬'
-            )
-            future_carfolio = executor.submit(
-                self.run_parallel_scraper,
-                'carfolio_scraper.py',
-                'Carfolio (Global Brands/Models)',
-                '🌍'
-            )
-
-            print("⚡ Running AS24, CarGurus, Auto-Data, and Carfolio in parallel...")
-            print("⏳ Processing... (progress will be shown at the end)")
-
-            # Wait for all four to complete
-            as24_result = future_as24.result()
-            cguru_result = future_cguru.result()
-            autodata_result = future_autodata.result()
-            carfolio_result = future_carfolio.result()
-
-        # Store results
-        self.results = {
-            'as24': as24_result,
-            'cguru': cguru_result,
-            'autodata': autodata_result,
-            'carfolio': carfolio_result
-        }
-
-        # Show completion summary
-        if (as24_result['success'] and cguru_result['success'] and
-            autodata_result['success'] and carfolio_result['success']):
-            print("✅ All four scrapers completed successfully!")
-            print("🔄 Starting consolidation...")
-            consolidation_result = self.run_consolidation()
-            self.results['consolidation'] = consolidation_result
-            return True
-        else:
-            print("❌ One or more scrapers failed!")
-            return False
     
-    def run_both_no_consolidation(self):
-        """Run AS24 and CarGurus without consolidation (old method for backward compatibility)."""
-        print("🚀 Starting AS24 + CarGurus update (no consolidation)...")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future_as24 = executor.submit(self.run_as24_only)
-            future_cguru = executor.submit(self.run_cguru_only)
-            
-            print("⚡ Running AS24 and CarGurus in parallel...")
-            
-            as24_result = future_as24.result()
-            cguru_result = future_cguru.result()
-        
-        self.results = {
-            'as24': as24_result,
-            'cguru': cguru_result
-        }
-        
-        return as24_result['success'] and cguru_result['success']
-    
-    def run_as24_autodata_no_consolidation(self):
-        """Run AS24 and Auto-Data without consolidation."""
-        print("🚀 Starting AS24 + Auto-Data update (no consolidation)...")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future_as24 = executor.submit(self.run_as24_only)
-            future_autodata = executor.submit(self.run_auto_data_only)
-            
-            print("⚡ Running AS24 and Auto-Data in parallel...")
-            
-            as24_result = future_as24.result()
-            autodata_result = future_autodata.result()
-        
-        self.results = {
-            'as24': as24_result,
-            'autodata': autodata_result
-        }
-        
-        return as24_result['success'] and autodata_result['success']
-    
-    def run_cguru_autodata_no_consolidation(self):
-        """Run CarGurus and Auto-Data without consolidation."""
-        print("🚀 Starting CarGurus + Auto-Data update (no consolidation)...")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future_cguru = executor.submit(self.run_cguru_only)
-            future_autodata = executor.submit(self.run_auto_data_only)
-            
-            print("⚡ Running CarGurus and Auto-Data in parallel...")
-            
-            cguru_result = future_cguru.result()
-            autodata_result = future_autodata.result()
-        
-        self.results = {
-            'cguru': cguru_result,
-            'autodata': autodata_result
-        }
-        
-        return cguru_result['success'] and autodata_result['success']
-    
-    def run_as24_carfolio_no_consolidation(self):
-        """Run AS24 and Carfolio without consolidation."""
-        print("🚀 Starting AS24 + Carfolio update (no consolidation)...")
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future_as24 = executor.submit(self.run_as24_only)
-            future_carfolio = executor.submit(self.run_carfolio_only)
-
-            print("⚡ Running AS24 and Carfolio in parallel...")
-
-            as24_result = future_as24.result()
-            carfolio_result = future_carfolio.result()
-
-        self.results = {
-            'as24': as24_result,
-            'carfolio': carfolio_result
-        }
-
-        return as24_result['success'] and carfolio_result['success']
-
-    def run_cguru_carfolio_no_consolidation(self):
-        """Run CarGurus and Carfolio without consolidation."""
-        print("🚀 Starting CarGurus + Carfolio update (no consolidation)...")
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future_cguru = executor.submit(self.run_cguru_only)
-            future_carfolio = executor.submit(self.run_carfolio_only)
-
-            print("⚡ Running CarGurus and Carfolio in parallel...")
-
-            cguru_result = future_cguru.result()
-            carfolio_result = future_carfolio.result()
-
-        self.results = {
-            'cguru': cguru_result,
-            'carfolio': carfolio_result
-        }
-
-        return cguru_result['success'] and carfolio_result['success']
-
-    def run_autodata_carfolio_no_consolidation(self):
-        """Run Auto-Data and Carfolio without consolidation."""
-        print("🚀 Starting Auto-Data + Carfolio update (no consolidation)...")
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future_autodata = executor.submit(self.run_auto_data_only)
-            future_carfolio = executor.submit(self.run_carfolio_only)
-
-            print("⚡ Running Auto-Data and Carfolio in parallel...")
-
-            autodata_result = future_autodata.result()
-            carfolio_result = future_carfolio.result()
-
-        self.results = {
-            'autodata': autodata_result,
-            'carfolio': carfolio_result
-        }
-
-        return autodata_result['success'] and carfolio_result['success']
-
-    def run_all_four_no_consolidation(self):
-        """Run all four scrapers without consolidation."""
-        print("🚀 Starting ALL FOUR sources update (no consolidation)...")
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            future_as24 = executor.submit(self.run_as24_only)
-            future_cguru = executor.submit(self.run_cguru_only)
-            future_autodata = executor.submit(self.run_auto_data_only)
-            future_carfolio = executor.submit(self.run_carfolio_only)
-
-            print("⚡ Running AS24, CarGurus, Auto-Data, and Carfolio in parallel...")
-
-            as24_result = future_as24.result()
-            cguru_result = future_cguru.result()
-            autodata_result = future_autodata.result()
-            carfolio_result = future_carfolio.result()
-
-        self.results = {
-            'as24': as24_result,
-            'cguru': cguru_result,
-            'autodata': autodata_result,
-            'carfolio': carfolio_result
-        }
-
-        return (as24_result['success'] and cguru_result['success'] and
-                autodata_result['success'] and carfolio_result['success'])
+    def run_stages(self, stage_names):
+        """Run a selection of pipeline stages, each one as soon as its inputs are ready."""
+        self.eta = ETAEstimator(stage_names)
+        # Sampler thread stopped after each run (the scheduler daemon runs one batch after another)
+        admission_context = self.admission or contextlib.nullcontext()
+        with ProgressServer(ProgressDashboard(eta=self.eta)) as self.progress, admission_context:
+            runner_context = InProcessRunner(progress=self.progress) if self.in_process else contextlib.nullcontext()
+            with runner_context as runner:
+                if runner:
+                    # Scrapers in a process pool, results handed to consolidation in memory
+                    run_stage = self.build_cache.wrap(runner.stage_runner(self.run_stage), bypass=runner.has_pending_inputs)
+                else:
+                    run_stage = self.build_cache.wrap(self.run_stage)
+                if self.admission:
+                    # Start stages only while measured memory / CPU headroom allows
+                    run_stage = self.admission.track(run_stage)
+                dag = PipelineDAG(build_stages(self.eta.track(run_stage)), self.budget, self.admission).select(stage_names)
+                print(f"⚡ Pipeline{' (in-process)' if runner else ''}: {' → '.join(dag.order)}")
+                print(f"⏱️ Estimated duration: {self.eta.describe()}")
+                self.results = dag.run()
+                self.peak_concurrency = dag.peak_concurrency
+        self.progress = None
+        self.eta_accuracy = self.eta.log_accuracy()
+        return all(result['success'] for result in self.results.values())
     
     def show_statistics(self):
         """Display stored statistics from consolidated data."""
@@ -432,10 +248,8 @@ class AutoScoutOrchestrator:
         
         if consolidated_file.exists():
             try:
-                with open(consolidated_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                metadata = data.get('metadata', {})
+                # Stats sidecar written with the file (full parse only if it is missing or stale)
+                metadata = file_stats(consolidated_file).get('metadata', {})
                 stats = metadata.get('statistics', {})
                 
                 print(f"📅 Last Update: {metadata.get('consolidated_at', 'Unknown')}")
@@ -462,33 +276,14 @@ class AutoScoutOrchestrator:
             print("❌ No consolidated data found!")
             print("💡 Run option 0 or 4 to create consolidated data")
         
-        # Show latest individual scraper results
-        data_dir = Path("data")
+        # Show latest individual scraper results (data/manifest.json and stats sidecars)
         print(f"\n📁 RECENT DATA FILES:")
-        
-        # Show recent AS24 files
-        as24_files = list(data_dir.glob("as24_scraped_models_*.json"))
-        if as24_files:
-            latest_as24 = max(as24_files, key=lambda x: x.stat().st_mtime)
-            print(f"🇪🇺 Latest AS24: {latest_as24.name}")
-        
-        # Show recent CarGurus files
-        cguru_files = list(data_dir.glob("cargurus_scraped_models_*.json"))
-        if cguru_files:
-            latest_cguru = max(cguru_files, key=lambda x: x.stat().st_mtime)
-            print(f"🇺🇸 Latest CarGurus: {latest_cguru.name}")
-        
-        # Show recent Auto-Data files
-        autodata_files = list(data_dir.glob("autodata_scraped_models_*.json"))
-        if autodata_files:
-            latest_autodata = max(autodata_files, key=lambda x: x.stat().st_mtime)
-            print(f"🇧🇬 Latest Auto-Data: {latest_autodata.name}")
-
-        # Show recent Carfolio files
-        carfolio_files = list(data_dir.glob("carfolio_scraped_models_*.json"))
-        if carfolio_files:
-            latest_carfolio = max(carfolio_files, key=lambda x: x.stat().st_mtime)
-            print(f"🌍 Latest Carfolio: {latest_carfolio.name}")
+        for prefix, label in [('as24', "🇪🇺 Latest AS24"), ('cargurus', "🇺🇸 Latest CarGurus"),
+                              ('autodata', "🇧🇬 Latest Auto-Data"), ('carfolio', "🌍 Latest Carfolio")]:
+            latest = latest_path(prefix, "scraped_models")
+            if latest:
+                stats = file_stats(latest)
+                print(f"{label}: {latest.name} ({stats.get('brands', 0)} brands, {stats.get('models', 0)} models)")
         
         print("=" * 50)
     
@@ -506,12 +301,25 @@ class AutoScoutOrchestrator:
         for task_name, result in self.results.items():
             if result:
                 status = "✅ SUCCESS" if result['success'] else "❌ FAILED"
+                if result.get('cached'):
+                    status = "⚡ CACHED"
                 duration = result.get('duration', 0)
-                print(f"{task_name.upper():<15} | {status:<10} | {duration:>6.1f}s")
+                peak = f" | peak RSS {result['peak_rss_mb']:>6.0f} MB" if 'peak_rss_mb' in result else ""
+                print(f"{task_name.upper():<15} | {status:<10} | {duration:>6.1f}s{peak}")
         
         print("-" * 60)
         print(f"{'TOTAL':<15} | {'COMPLETED':<10} | {total_duration:>6.1f}s")
+        if self.peak_concurrency:
+            print(f"{'CONCURRENCY':<15} | {'MAX':<10} | {self.peak_concurrency:>6} stages")
+        saved = sum(result.get('saved', 0) for result in self.results.values() if result)
+        if saved:
+            print(f"{'CACHE':<15} | {'SAVED':<10} | {saved:>6.1f}s")
+        overhead = [result['overhead'] for result in self.results.values() if result and 'overhead' in result]
+        if overhead:
+            print(f"{'OVERHEAD':<15} | {'IN-PROCESS':<10} | {sum(overhead):>6.1f}s")
         print("=" * 60)
+        for line in self.eta_accuracy:
+            print(line)
     
     def run(self):
         """Main execution loop."""
@@ -521,80 +329,16 @@ class AutoScoutOrchestrator:
             self.display_menu()
             
             try:
-                choice = input("💡 Select option (0-13): ").strip()
+                choice = input("💡 Select option (0-14): ").strip()
                 
                 if not choice:
                     choice = "0"  # Default option
                 
-                if choice == "0":
-                    print("\n🔄 Starting COMPLETE UPDATE (parallel + consolidation)...")
-                    self.start_time = time.time()
-                    success = self.run_parallel_update()
-
-                elif choice == "1":
-                    print("\n🇪🇺 Starting AutoScout24 ONLY update...")
-                    self.start_time = time.time()
-                    result = self.run_as24_only()
-                    success = result['success']
-
-                elif choice == "2":
-                    print("\n🇺🇸 Starting CarGurus ONLY update...")
-                    self.start_time = time.time()
-                    result = self.run_cguru_only()
-                    success = result['success']
-
-                elif choice == "3":
-                    print("\n🇧🇬 Starting Auto-Data ONLY update...")
-                    self.start_time = time.time()
-                    result = self.run_auto_data_only()
-                    success = result['success']
-
-                elif choice == "4":
-                    print("\n🌍 Starting Carfolio ONLY update...")
-                    self.start_time = time.time()
-                    result = self.run_carfolio_only()
-                    success = result['success']
-
-                elif choice == "5":
-                    print("\n🔄 Starting AS24 + CarGurus update (no auto-data)...")
-                    self.start_time = time.time()
-                    success = self.run_both_no_consolidation()
-
-                elif choice == "6":
-                    print("\n🔄 Starting AS24 + Auto-Data update (no car-gurus)...")
-                    self.start_time = time.time()
-                    success = self.run_as24_autodata_no_consolidation()
-
-                elif choice == "7":
-                    print("\n🔄 Starting CarGurus + Auto-Data update (no as24)...")
-                    self.start_time = time.time()
-                    success = self.run_cguru_autodata_no_consolidation()
-
-                elif choice == "8":
-                    print("\n🔄 Starting AS24 + Carfolio update (no others)...")
-                    self.start_time = time.time()
-                    success = self.run_as24_carfolio_no_consolidation()
-
-                elif choice == "9":
-                    print("\n🔄 Starting CarGurus + Carfolio update (no others)...")
-                    self.start_time = time.time()
-                    success = self.run_cguru_carfolio_no_consolidation()
-
-                elif choice == "10":
-                    print("\n🔄 Starting Auto-Data + Carfolio update (no others)...")
-                    self.start_time = time.time()
-                    success = self.run_autodata_carfolio_no_consolidation()
-
-                elif choice == "11":
-                    print("\n🔄 Starting ALL FOUR sources update (no consolidation)...")
-                    self.start_time = time.time()
-                    success = self.run_all_four_no_consolidation()
-
-                elif choice == "12":
-                    print("\n🔗 Starting CONSOLIDATION ONLY...")
+                if choice in MENU_SELECTIONS:
+                    label, stage_names = MENU_SELECTIONS[choice]
+                    print(f"\n{label}...")
                     self.start_time = time.time()
-                    result = self.run_consolidation()
-                    success = result['success']
+                    success = self.run_stages(stage_names)
 
                 elif choice == "13":
                     print("\n👋 Showing statistics and exiting...")
@@ -602,7 +346,7 @@ class AutoScoutOrchestrator:
                     return
 
                 else:
-                    print("❌ Invalid option! Please choose 0-13.")
+                    print("❌ Invalid option! Please choose 0-14.")
                     continue
                 
                 # Display summary if we had results
@@ -630,7 +374,31 @@ class AutoScoutOrchestrator:
 
 def main():
     """Main entry point."""
-    orchestrator = AutoScoutOrchestrator()
+    parser = argparse.ArgumentParser(description="Automobile Data Update System")
+    parser.add_argument('--stages', metavar='LIST',
+                        help='Run these stages without the menu (e.g. as24,cguru,consolidation)')
+    parser.add_argument('--max-browsers', type=int, default=DEFAULT_BUDGET['browser'],
+                        help='Maximum number of scrapers running at the same time')
+    parser.add_argument('--max-cpu', type=int, default=DEFAULT_BUDGET['cpu'],
+                        help='Maximum number of CPU stages running at the same time')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-run stages even when their inputs are unchanged')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Run scrapers in a process pool and hand results to consolidation in memory')
+    parser.add_argument('--no-admission', action='store_true',
+                        help='Start stages up to the static budget without checking memory / CPU headroom')
+    args = parser.parse_args()
+    
+    orchestrator = AutoScoutOrchestrator(budget={'browser': args.max_browsers, 'cpu': args.max_cpu},
+                                         force=args.force, in_process=args.in_process,
+                                         admission=not args.no_admission)
+    
+    if args.stages:
+        orchestrator.start_time = time.time()
+        success = orchestrator.run_stages([name.strip() for name in args.stages.split(',') if name.strip()])
+        orchestrator.display_summary()
+        sys.exit(0 if success else 1)
+    
     orchestrator.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Work Queue - File de travail partagée pour le scraping des marques
+Une exécution ("run") découpe le scraping d'une source en une tâche par marque,
+stockée dans une base SQLite (data/work_queue.db, ou un volume partagé entre
+plusieurs machines). Des workers, sur une ou plusieurs machines, prennent une
+tâche sous bail (lease), la scrapent avec leur navigateur et écrivent le
+résultat dans la base. Un bail expiré (worker arrêté ou bloqué) est repris par
+un autre worker. Quand toutes les tâches sont terminées, le dernier worker
+assemble le snapshot standard *_scraped_models_*.json.
+
+Les tâches sont ordonnées par durée attendue décroissante (historique
+brand_timings), comme pour le scraping parallèle.
+
+Chaque scraper expose queue_items(), queue_worker() et assemble(); la source
+"mock" simule un site local pour tester la file sans navigateur. Le volume
+partagé doit supporter les verrous POSIX (SQLite).
+
+Usage:
+    python work_queue.py enqueue as24 [--max-brands N]     # Créer une exécution
+    python work_queue.py worker as24                       # Worker (autant que de navigateurs)
+    python work_queue.py status                            # Avancement des exécutions
+    python work_queue.py finalize RUN_ID                   # Assembler le snapshot manuellement
+    python work_queue.py demo --workers 3                  # Test local: site simulé + 3 workers
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from brand_timings import ATTEMPTS_COLUMN, TIMING_COLUMNS, expected_durations
+
+QUEUE_DB = Path("data/work_queue.db")
+
+# Durée d'un bail; le worker le prolonge tant qu'il travaille sur la tâche
+LEASE_SECONDS = 120
+HEARTBEAT_INTERVAL = 30
+# Tentatives avant d'abandonner une marque
+MAX_ATTEMPTS = 3
+# Attente d'un worker quand toutes les tâches restantes sont sous bail
+POLL_INTERVAL = 5
+
+# Source -> module du scraper et préfixe des snapshots
+QUEUE_SOURCES = {
+    'as24': {'module': 'autoscout24_scraper', 'prefix': 'as24'},
+    'cguru': {'module': 'car_gurus_scraper', 'prefix': 'cargurus'},
+    'autodata': {'module': 'autodata_scraper', 'prefix': 'autodata'},
+    'mock': {'module': __name__, 'prefix': 'mock'},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finalized_at REAL,
+    output_file TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    brand TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    priority INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    models TEXT,
+    timing TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks(run_id, status, priority);
+"""
+
+
+class WorkQueue:
+    """File de tâches SQLite avec baux: chaque opération est une transaction courte."""
+
+    def __init__(self, db_path=QUEUE_DB, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Transaction(conn)
+
+    def create_run(self, source, items, expected=None):
+        """Crée une exécution: items = [(marque, payload)], ordonnés par durée attendue décroissante."""
+        run_id = f"{source}-{datetime.now().strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        expected = expected or {}
+        default = max(expected.values()) if expected else 0
+        # Marques inconnues d'abord (durée incertaine), puis les plus longues
+        ranked = sorted(range(len(items)), key=lambda i: -expected.get(items[i][0], default))
+        priority = {index: rank for rank, index in enumerate(ranked)}
+        with self._connect() as conn:
+            conn.execute("INSERT INTO runs (run_id, source, created_at) VALUES (?, ?, ?)",
+                         (run_id, source, time.time()))
+            conn.executemany(
+                "INSERT INTO tasks (run_id, brand, position, priority, payload) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, brand, i, priority[i], json.dumps(payload, ensure_ascii=False))
+                 for i, (brand, payload) in enumerate(items)]
+            )
+        return run_id
+
+    def lease(self, worker_id, source=None, run_id=None):
+        """Prend la prochaine tâche disponible (en attente ou bail expiré); None s'il n'y en a pas."""
+        now = time.time()
+        filters, params = ["r.finalized_at IS NULL"], []
+        if source:
+            filters.append("r.source = ?")
+            params.append(source)
+        if run_id:
+            filters.append("r.run_id = ?")
+            params.append(run_id)
+
+        with self._connect() as conn:
+            # Bail expiré après la dernière tentative: la marque est abandonnée
+            conn.execute("UPDATE tasks SET status = 'failed', error = 'lease expired' "
+                         "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                         (now, self.max_attempts))
+            row = conn.execute(
+                f"SELECT t.*, r.source FROM tasks t JOIN runs r ON r.run_id = t.run_id "
+                f"WHERE {' AND '.join(filters)} "
+                f"AND (t.status = 'pending' OR (t.status = 'leased' AND t.lease_expires < ?)) "
+                f"ORDER BY r.created_at, t.priority LIMIT 1",
+                params + [now]
+            ).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            conn.execute("UPDATE tasks SET status = 'leased', lease_owner = ?, lease_token = ?, "
+                         "lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                         (worker_id, token, now + self.lease_seconds, row['id']))
+
+        task = dict(row)
+        if task['status'] == 'leased':
+            print(f"♻️ {worker_id}: lease of {task['brand']} reclaimed from {task['lease_owner']}")
+        task.update(lease_token=token, lease_owner=worker_id, attempts=task['attempts'] + 1,
+                    payload=json.loads(task['payload']))
+        return task
+
+    def heartbeat(self, task):
+        """Prolonge le bail; False si la tâche a été reprise par un autre worker."""
+        with self._connect() as conn:
+            updated = conn.execute("UPDATE tasks SET lease_expires = ? WHERE id = ? AND lease_token = ? "
+                                   "AND status = 'leased'",
+                                   (time.time() + self.lease_seconds, task['id'], task['lease_token'])).rowcount
+        return updated == 1
+
+    def complete(self, task, models, timing):
+        """Enregistre le résultat; False si le bail a été perdu (résultat ignoré)."""
+        if timing:
+            # Tentatives = baux accordés pour la marque, reprises après échec ou expiration comprises
+            timing = list(timing)
+            timing[ATTEMPTS_COLUMN] = task['attempts']
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE tasks SET status = 'done', models = ?, timing = ?, lease_expires = NULL "
+                "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (json.dumps(models, ensure_ascii=False), json.dumps(timing), task['id'], task['lease_token'])
+            ).rowcount
+        return updated == 1
+
+    def fail(self, task, error):
+        """Rend la tâche (nouvelle tentative) ou l'abandonne après MAX_ATTEMPTS."""
+        status = 'failed' if task['attempts'] >= self.max_attempts else 'pending'
+        with self._connect() as conn:
+            conn.execute("UPDATE tasks SET status = ?, error = ?, lease_expires = NULL "
+                         "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                         (status, str(error), task['id'], task['lease_token']))
+
+    def status(self, run_id):
+        """Nombre de tâches par statut."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM tasks WHERE run_id = ? GROUP BY status",
+                                (run_id,)).fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def is_complete(self, run_id):
+        """Vrai quand il ne reste aucune tâche en attente ou sous bail."""
+        counts = self.status(run_id)
+        return not counts.get('pending') and not counts.get('leased')
+
+    def has_work(self, source=None, run_id=None):
+        """Vrai s'il reste des tâches non terminées (éventuellement sous bail ailleurs)."""
+        return any(not self.is_complete(run['run_id']) for run in self.runs(source, run_id, open_only=True))
+
+    def runs(self, source=None, run_id=None, open_only=False):
+        """Exécutions, des plus anciennes aux plus récentes."""
+        query, params = "SELECT * FROM runs WHERE 1 = 1", []
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        if run_id:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        if open_only:
+            query += " AND finalized_at IS NULL"
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query + " ORDER BY created_at", params)]
+
+    def results(self, run_id):
+        """({marque: modèles}, {marque: timing}) dans l'ordre de la liste des marques."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT brand, status, models, timing FROM tasks WHERE run_id = ? "
+                                "ORDER BY position", (run_id,)).fetchall()
+        brands_models, timings = {}, {}
+        for row in rows:
+            # Une marque abandonnée apparaît sans modèles, comme une erreur de scraping
+            brands_models[row['brand']] = json.loads(row['models']) if row['models'] else []
+            if row['timing']:
+                timings[row['brand']] = json.loads(row['timing'])
+        return brands_models, timings
+
+    def claim_finalization(self, run_id):
+        """Réserve l'assemblage d'une exécution terminée (un seul worker l'obtient)."""
+        with self._connect() as conn:
+            return conn.execute("UPDATE runs SET finalized_at = ? WHERE run_id = ? AND finalized_at IS NULL",
+                                (time.time(), run_id)).rowcount == 1
+
+    def record_output(self, run_id, output_file):
+        """Enregistre le snapshot produit, ou libère la réservation si l'écriture a échoué."""
+        with self._connect() as conn:
+            if output_file:
+                conn.execute("UPDATE runs SET output_file = ? WHERE run_id = ?", (str(output_file), run_id))
+            else:
+                conn.execute("UPDATE runs SET finalized_at = NULL WHERE run_id = ?", (run_id,))
+
+
+class _Transaction:
+    """Connexion en transaction BEGIN IMMEDIATE (verrou d'écriture pris dès le début)."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+        return False
+
+
+def source_module(source):
+    """Module fournissant queue_items(), queue_worker(), assemble() et save() pour une source."""
+    if source not in QUEUE_SOURCES:
+        raise ValueError(f"Source non supportée par la file de travail: {source} "
+                         f"(disponibles: {', '.join(QUEUE_SOURCES)})")
+    return importlib.import_module(QUEUE_SOURCES[source]['module'])
+
+
+def enqueue(queue, source, max_brands=None, data_dir="data"):
+    """Crée une exécution pour une source: une tâche par marque."""
+    items = source_module(source).queue_items(max_brands)
+    expected = expected_durations(QUEUE_SOURCES[source]['prefix'], data_dir)
+    return queue.create_run(source, items, expected)
+
+
+def finalize(queue, run_id, output_file=None):
+    """Assemble et écrit le snapshot d'une exécution terminée; retourne le fichier écrit ou None."""
+    run = queue.runs(run_id=run_id)
+    if not run or not queue.is_complete(run_id) or not queue.claim_finalization(run_id):
+        return None
+    module = source_module(run[0]['source'])
+    brands_models, timings = queue.results(run_id)
+    try:
+        output_file = module.save(module.assemble(brands_models, timings), output_file)
+    except Exception as e:
+        print(f"💥 {run_id}: snapshot assembly failed: {e}")
+        output_file = None
+    queue.record_output(run_id, output_file)
+    if output_file:
+        print(f"📦 {run_id}: {len(brands_models)} brands assembled into {output_file}")
+    return output_file
+
+
+class _Heartbeat:
+    """Prolonge le bail d'une tâche en arrière-plan pendant son traitement."""
+
+    def __init__(self, queue, task):
+        self.queue = queue
+        self.task = task
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        interval = min(HEARTBEAT_INTERVAL, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            if not self.queue.heartbeat(self.task):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join(timeout=2)
+        return False
+
+
+def run_worker(queue, source, worker_id=None, run_id=None, headless=True, crash_after=None):
+    """Boucle d'un worker: bail, scraping, résultat, jusqu'à ce que la source n'ait plus de tâches."""
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    module = source_module(source)
+    scraper = None
+    processed = 0
+    print(f"👷 {worker_id}: waiting for {source} tasks")
+
+    try:
+        while True:
+            task = queue.lease(worker_id, source, run_id)
+            if task is None:
+                if not queue.has_work(source, run_id):
+                    # La dernière tâche a pu être abandonnée par lease() (bail expiré sans tentative
+                    # restante): personne ne l'a terminée, l'exécution est assemblée ici
+                    for run in queue.runs(source, run_id, open_only=True):
+                        finalize(queue, run['run_id'])
+                    break
+                # Tâches restantes sous bail ailleurs: attendre leur fin ou leur expiration
+                time.sleep(min(POLL_INTERVAL, queue.lease_seconds / 2))
+                continue
+
+            if crash_after is not None and processed >= crash_after:
+                # Test de reprise de bail: arrêt brutal avec une tâche sous bail
+                print(f"💥 {worker_id}: simulated crash holding {task['brand']}")
+                os._exit(1)
+
+            if scraper is None:
+                # Navigateur démarré seulement s'il y a du travail
+                scraper = module.queue_worker(headless)
+            try:
+                with _Heartbeat(queue, task):
+                    models, timing = scraper.scrape_queue_item(task['payload'])
+                if not queue.complete(task, models, timing):
+                    print(f"⚠️ {worker_id}: lease of {task['brand']} lost, result discarded")
+            except Exception as e:
+                print(f"❌ {worker_id}: {task['brand']} failed (attempt {task['attempts']}): {e}")
+                queue.fail(task, e)
+            processed += 1
+
+            if queue.is_complete(task['run_id']):
+                finalize(queue, task['run_id'])
+    finally:
+        if scraper is not None:
+            scraper.close()
+
+    print(f"✅ {worker_id}: {processed} tasks processed")
+    return processed
+
+
+# --- Source simulée (test local de la file sans navigateur) -----------------
+
+MOCK_SITE_ENV = "ALLCARS_MOCK_SITE"
+MOCK_BRANDS = [f"Brand{i:03d}" for i in range(1, 41)]
+
+
+class _MockSiteHandler(BaseHTTPRequestHandler):
+    """Site simulé: /brand/<nom> retourne les modèles après une latence aléatoire, parfois une erreur 503."""
+
+    error_rate = 0.1
+
+    def do_GET(self):
+        brand = self.path.rsplit('/', 1)[-1]
+        time.sleep(random.uniform(0.05, 0.3))
+        if random.random() < self.error_rate:
+            self.send_response(503)
+            self.end_headers()
+            return
+        models = [f"{brand} Model {i}" for i in range(1, 2 + sum(map(ord, brand)) % 7)]
+        body = json.dumps({"models": models}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockScraper:
+    """Worker de la source simulée: une requête HTTP par marque."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def scrape_queue_item(self, item):
+        start = time.perf_counter()
+        with urllib.request.urlopen(f"{self.base_url}/brand/{item['brand']}", timeout=10) as response:
+            models = json.load(response)["models"]
+        return models, [round(time.perf_counter() - start, 3), 1, 0.0, "mock"]
+
+    def close(self):
+        pass
+
+
+def queue_items(max_brands=None):
+    """Tâches de la source simulée."""
+    brands = MOCK_BRANDS[:max_brands] if max_brands else MOCK_BRANDS
+    return [(brand, {"brand": brand}) for brand in brands]
+
+
+def queue_worker(headless=True):
+    """Worker de la source simulée (URL du site dans ALLCARS_MOCK_SITE)."""
+    return MockScraper(os.environ[MOCK_SITE_ENV])
+
+
+def assemble(brands_models, timing_rows):
+    """Snapshot de la source simulée, au format des scrapers."""
+    return {
+        "metadata": {
+            "scraped_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+            "source": "Mock site",
+            "total_brands": len(brands_models),
+            "total_models": sum(len(models) for models in brands_models.values()),
+            "brands_with_models": len([b for b, models in brands_models.items() if models]),
+            "brands_without_models": len([b for b, models in brands_models.items() if not models])
+        },
+        "brands_models": brands_models,
+        "brand_timings": {"columns": TIMING_COLUMNS, "rows": timing_rows}
+    }
+
+
+def save(result_data, output_file=None):
+    """Écrit le snapshot de la source simulée."""
+    if not output_file:
+        output_file = f"data/mock_scraped_models_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(result_data, f, indent=2, ensure_ascii=False)
+    return output_file
+
+
+def demo(workers, crash_workers=1, lease_seconds=3):
+    """Site simulé + plusieurs processus workers; certains s'arrêtent brutalement pour tester la reprise."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _MockSiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "work_queue.db"
+        queue = WorkQueue(db_path, lease_seconds=lease_seconds)
+        run_id = enqueue(queue, 'mock', data_dir=tmp_dir)
+        print(f"🗂️ {run_id}: {len(MOCK_BRANDS)} tasks, {workers} workers ({crash_workers} will crash)")
+
+        env = {**os.environ, MOCK_SITE_ENV: f"http://127.0.0.1:{server.server_address[1]}"}
+        processes = []
+        for i in range(workers):
+            cmd = [sys.executable, os.path.abspath(__file__), '--db', str(db_path), 'worker', 'mock',
+                   '--lease', str(lease_seconds), '--id', f"worker-{i + 1}"]
+            if i < crash_workers:
+                cmd += ['--crash-after', '3']
+            processes.append(subprocess.Popen(cmd, env=env, cwd=tmp_dir))
+        for process in processes:
+            process.wait()
+
+        counts = queue.status(run_id)
+        run = queue.runs(run_id=run_id)[0]
+        print(f"📊 {run_id}: {counts}")
+        if run['output_file']:
+            with open(Path(tmp_dir) / run['output_file'], 'r', encoding='utf-8') as f:
+                metadata = json.load(f)['metadata']
+            print(f"✅ Snapshot assembled: {metadata['total_brands']} brands, {metadata['total_models']} models")
+        else:
+            print("❌ Snapshot not assembled")
+    server.shutdown()
+    return bool(run['output_file'])
+
+
+def main():
+    """Fonction principale avec gestion d'arguments."""
+    parser = argparse.ArgumentParser(
+        description="File de travail partagée pour le scraping des marques",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python work_queue.py enqueue as24                      # Une tâche par marque AS24
+  python work_queue.py worker as24                       # Sur chaque machine / navigateur
+  python work_queue.py --db /mnt/shared/queue.db worker cguru
+  python work_queue.py demo --workers 4                  # Test local sans navigateur
+        """
+    )
+    parser.add_argument('--db', default=str(QUEUE_DB), help='Base SQLite de la file (volume partagé)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='Créer une exécution pour une source')
+    enqueue_parser.add_argument('source', choices=list(QUEUE_SOURCES))
+    enqueue_parser.add_argument('--max-brands', type=int, metavar='N')
+
+    worker_parser = subparsers.add_parser('worker', help='Traiter les tâches d\'une source')
+    worker_parser.add_argument('source', choices=list(QUEUE_SOURCES))
+    worker_parser.add_argument('--run', help='Limiter à une exécution')
+    worker_parser.add_argument('--id', help='Identifiant du worker (défaut: machine-pid)')
+    worker_parser.add_argument('--lease', type=float, default=LEASE_SECONDS, help='Durée du bail (secondes)')
+    worker_parser.add_argument('--no-headless', dest='headless', action='store_false', help='Afficher le navigateur')
+    worker_parser.add_argument('--crash-after', type=int, help=argparse.SUPPRESS)
+
+    subparsers.add_parser('status', help='Avancement des exécutions')
+
+    finalize_parser = subparsers.add_parser('finalize', help='Assembler le snapshot d\'une exécution terminée')
+    finalize_parser.add_argument('run_id')
+    finalize_parser.add_argument('--output', help='Fichier de sortie')
+
+    demo_parser = subparsers.add_parser('demo', help='Test local avec un site simulé')
+    demo_parser.add_argument('--workers', type=int, default=3)
+    demo_parser.add_argument('--crash-workers', type=int, default=1)
+
+    args = parser.parse_args()
+
+    if args.command == 'demo':
+        sys.exit(0 if demo(args.workers, args.crash_workers) else 1)
+
+    queue = WorkQueue(args.db, lease_seconds=getattr(args, 'lease', LEASE_SECONDS))
+
+    if args.command == 'enqueue':
+        run_id = enqueue(queue, args.source, args.max_brands)
+        print(f"🗂️ {run_id}: {sum(queue.status(run_id).values())} tasks queued")
+    elif args.command == 'worker':
+        run_worker(queue, args.source, args.id, args.run, args.headless, args.crash_after)
+    elif args.command == 'finalize':
+        if not finalize(queue, args.run_id, args.output):
+            print(f"❌ {args.run_id}: not complete or already finalized ({queue.status(args.run_id)})")
+    else:
+        for run in queue.runs():
+            counts = queue.status(run['run_id'])
+            state = Path(run['output_file']).name if run['output_file'] else (
+                "assembling" if run['finalized_at'] else "running")
+            print(f"{run['run_id']:<40} | " + " ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+                  + f" | {state}")
+
+
+if __name__ == "__main__":
+    main()